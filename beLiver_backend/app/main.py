@@ -1,11 +1,8 @@
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
-from models import Base
-from core.db import engine
 from api.main import router as api_router 
 
+# 資料表由 database/schema.sql 建立，不在 import 時 create_all
 app = FastAPI()
 
 app.include_router(api_router)
-
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, Boolean, ForeignKey, TIMESTAMP, Numeric
+from sqlalchemy import Column, Integer, String, Text, Date, Boolean, ForeignKey, TIMESTAMP, Numeric, Index
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 
@@ -19,6 +19,9 @@ class User(Base):
 
 class Project(Base):
     __tablename__ = 'projects'
+    __table_args__ = (
+        Index('ix_projects_user_id_start_time_end_time', 'user_id', 'start_time', 'end_time'),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
@@ -38,6 +41,9 @@ class Project(Base):
 
 class Milestone(Base):
     __tablename__ = 'milestones'
+    __table_args__ = (
+        Index('ix_milestones_project_id_end_time', 'project_id', 'end_time'),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
@@ -53,6 +59,10 @@ class Milestone(Base):
 
 class Task(Base):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        Index('ix_tasks_due_date_milestone_id', 'due_date', 'milestone_id'),
+        Index('ix_tasks_milestone_id_is_completed', 'milestone_id', 'is_completed'),
+    )
 
     id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False)
@@ -67,6 +77,9 @@ class Task(Base):
 
 class File(Base):
     __tablename__ = 'files'
+    __table_args__ = (
+        Index('ix_files_project_id', 'project_id'),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
@@ -78,6 +91,9 @@ class File(Base):
 
 class ChatHistory(Base):
     __tablename__ = 'chat_histories'
+    __table_args__ = (
+        Index('ix_chat_histories_project_id_user_id_timestamp', 'project_id', 'user_id', 'timestamp'),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'))
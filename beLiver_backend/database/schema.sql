@@ -58,3 +58,11 @@ CREATE TABLE chat_histories (
     sender VARCHAR(50) NOT NULL,
     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+
+-- 熱門查詢 index
+CREATE INDEX ix_projects_user_id_start_time_end_time ON projects (user_id, start_time, end_time);
+CREATE INDEX ix_milestones_project_id_end_time ON milestones (project_id, end_time);
+CREATE INDEX ix_tasks_due_date_milestone_id ON tasks (due_date, milestone_id);
+CREATE INDEX ix_tasks_milestone_id_is_completed ON tasks (milestone_id, is_completed);
+CREATE INDEX ix_files_project_id ON files (project_id);
+CREATE INDEX ix_chat_histories_project_id_user_id_timestamp ON chat_histories (project_id, user_id, timestamp);
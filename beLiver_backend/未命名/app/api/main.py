@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.routes import auth, user, task, file, assistant, project
+from app.api.routes import auth, user, task, file, assistant, project, metrics
 
 router = APIRouter()
 
@@ -9,3 +9,4 @@ router.include_router(task.router, tags=["Tasks"])
 router.include_router(file.router, tags=["File"])
 router.include_router(assistant.router, tags=["Assistant"])
 router.include_router(project.router, tags=["Project"])
+router.include_router(metrics.router, tags=["Metrics"])
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
+from sqlalchemy import select, delete, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
+from typing import Optional
+import base64
+import uuid
 from pydantic import BaseModel
-from app.core.db import get_db
+from app.core.db import get_async_db
+from app.core.responses import FastJSONResponse
 from app.models import User, Project, ChatHistory, File
 from app.crud.crud_user import get_current_user
+from app.core.query_budget import query_budget
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.crud.crud_version import bump_project_versions, get_project_version
 
 router = APIRouter(tags=["Assistant"])
 
@@ -18,21 +26,24 @@ class MessageResponse(BaseModel):
     timestamp: str
 
 @router.post("/assistant/message", response_model=MessageResponse)
-def handle_message(
+@query_budget(4)
+async def handle_message(
     payload: MessageRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
-        user_id = payload.user_id
-        project_id = payload.project_id
-    except:
+        user_id = uuid.UUID(payload.user_id)
+        project_id = uuid.UUID(payload.project_id)
+    except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user_id or project_id format")
 
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="User not authorized")
 
-    project = db.query(Project).filter_by(id=project_id, user_id=user_id).first()
+    project = (await db.execute(
+        select(Project).filter_by(id=project_id, user_id=user_id)
+    )).scalars().first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -45,6 +56,7 @@ def handle_message(
     )
     db.add(user_message)
 
+    # 目前是固定回覆；接上模型時用 Depends(get_llm)，會和 PDF 轉專案共用 LLM 回應快取
     reply_text = "Ok, got it. Adjusting your schedule..."
     reply_message = ChatHistory(
         user_id=user_id,
@@ -54,85 +66,120 @@ def handle_message(
         timestamp=datetime.now(timezone.utc)
     )
     db.add(reply_message)
-    db.commit()
+    # 對話不影響 /projects，只更新專案的版本號
+    await bump_project_versions(db, [project_id], owners=False)
+    await db.commit()
 
     return {
         "reply": reply_text,
         "timestamp": reply_message.timestamp.isoformat()
     }
 
+def encode_history_cursor(timestamp: datetime, message_id: uuid.UUID) -> str:
+    raw = f"{timestamp.isoformat()}|{message_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    timestamp, message_id = raw.split("|")
+    return datetime.fromisoformat(timestamp), uuid.UUID(message_id)
+
 @router.get("/assistant/history")
-def get_project_history(
+@query_budget(4)
+async def get_project_history(
+    request: Request,
     projectId: str = Query(..., description="Project ID"),
+    limit: int = Query(50, ge=1, le=200, description="Messages per page"),
+    before: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        project_id = projectId
+        project_id = uuid.UUID(projectId)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid projectId format")
 
-    project = db.query(Project).filter_by(id=project_id, user_id=current_user.id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    cursor = None
+    if before:
+        try:
+            cursor = decode_history_cursor(before)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    chat_logs = (
-        db.query(ChatHistory)
+    # 查專案版本號同時確認專案屬於目前使用者；沒變就回 304，不查訊息與檔案
+    version = await get_project_version(db, current_user.id, project_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    # 每一頁（limit、before 不同）是不同的內容，各自有自己的 ETag
+    # 游標重新編碼後才放進 ETag（原字串可能夾帶 base64 以外的字元）
+    etag = make_etag("history", project_id, version, limit, encode_history_cursor(*cursor) if cursor else "latest")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # keyset 分頁：從最新的訊息往回載入，(timestamp, id) 決定順序
+    query = (
+        select(ChatHistory.id, ChatHistory.sender, ChatHistory.message, ChatHistory.timestamp)
         .filter_by(project_id=project_id, user_id=current_user.id)
-        .order_by(ChatHistory.timestamp.asc())
-        .all()
+        .order_by(ChatHistory.timestamp.desc(), ChatHistory.id.desc())
+        .limit(limit + 1)
     )
-
+    if cursor:
+        cursor_timestamp, cursor_id = cursor
+        query = query.filter(or_(
+            ChatHistory.timestamp < cursor_timestamp,
+            and_(ChatHistory.timestamp == cursor_timestamp, ChatHistory.id < cursor_id)
+        ))
+
+    chat_logs = (await db.execute(query)).all()
+    has_more = len(chat_logs) > limit
+    chat_logs = chat_logs[:limit]
+    next_cursor = encode_history_cursor(chat_logs[-1].timestamp, chat_logs[-1].id) if has_more else None
+
+    # 每頁內仍依時間先後排列，前端把舊的一頁接在上方即可
     messages = [
-        {
-            "sender": chat.sender,
-            "text": chat.message,
-            "timestamp": chat.timestamp.isoformat()
-        }
-        for chat in chat_logs
+        {"sender": chat.sender, "text": chat.message, "timestamp": chat.timestamp}
+        for chat in reversed(chat_logs)
     ]
 
-    files = (
-        db.query(File)
+    uploaded_files = (await db.execute(
+        select(File.url.label("file_url"), File.name.label("file_name"))
         .filter_by(project_id=project_id)
-        .all()
-    )
-
-    uploaded_files = [
-        {
-            "file_url": f"{file.url}",
-            "file_name": file.name
-        }
-        for file in files
-    ]
+    )).all()
 
-    return {
+    return set_etag(FastJSONResponse({
         "project_id": projectId,
         "messages": messages,
-        "uploaded_files": uploaded_files
-    }
+        "uploaded_files": uploaded_files,
+        "next_cursor": next_cursor
+    }), etag)
     
 @router.delete("/assistant/history")
-def reset_assistant_history(
+@query_budget(4)
+async def reset_assistant_history(
     projectId: str = Query(..., description="Project ID like proj01"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        project_id= projectId
+        project_id = uuid.UUID(projectId)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid projectId format")
 
-    project = db.query(Project).filter_by(id=project_id, user_id=current_user.id).first()
+    project = (await db.execute(
+        select(Project).filter_by(id=project_id, user_id=current_user.id)
+    )).scalars().first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    db.query(ChatHistory).filter_by(project_id=project_id, user_id=current_user.id).delete()
+    await db.execute(
+        delete(ChatHistory).filter_by(project_id=project_id, user_id=current_user.id)
+    )
+    await bump_project_versions(db, [project_id], owners=False)
 
     # ⚠️ Optional：刪除草稿檔案
     # db.query(File).filter_by(project_id=project_id_int, is_draft=True).delete()
 
-    db.commit()
+    await db.commit()
 
     return {
         "message": "Assistant history reset successfully",
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
-from app.core.db import get_db
-from app.utils import verify_password, hash_password, create_jwt_token
+from app.core.db import get_async_db
+from app.utils import verify_password_async, hash_password_async, password_needs_rehash, create_jwt_token, PasswordHasherBusy
 from dotenv import load_dotenv
 from app.models import User
+from app.core.query_budget import query_budget
 
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -13,8 +15,13 @@ router = APIRouter(tags=["Auth"])
 security = HTTPBearer()
 
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+
 @router.post("/auth/register")
-def register_user(payload: dict, db: Session = Depends(get_db)):
+@query_budget(3)
+async def register_user(payload: dict, db: AsyncSession = Depends(get_async_db)):
     name = payload.get("name")
     email = payload.get("email")
     password = payload.get("password")
@@ -25,16 +32,20 @@ def register_user(payload: dict, db: Session = Depends(get_db)):
     if not email or not name:
         raise HTTPException(status_code=400, detail="Name and email are required")
 
-    existing_user = db.query(User).filter(User.email == email).first()
+    existing_user = (await db.execute(select(User).filter(User.email == email))).scalars().first()
     if existing_user:
         raise HTTPException(status_code=409, detail="Email already registered")
 
-    hashed = hash_password(password)
+    # bcrypt 是 CPU 密集運算，交給專用的 executor
+    try:
+        hashed = await hash_password_async(password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
 
     new_user = User(email=email, name=name, hashed_password=hashed)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)  # 讓 new_user.id 可用
+    await db.commit()
+    await db.refresh(new_user)  # 讓 new_user.id 可用
 
     token = create_jwt_token({"sub": email})
 
@@ -47,16 +58,30 @@ def register_user(payload: dict, db: Session = Depends(get_db)):
 
 
 @router.post("/auth/login")
-def login_user(payload: dict, db: Session = Depends(get_db)):
+@query_budget(2)
+async def login_user(payload: dict, db: AsyncSession = Depends(get_async_db)):
     email = payload.get("email")
     password = payload.get("password")
 
     if not email or not password:
         raise HTTPException(status_code=400, detail="Email and password required")
 
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
+    user = (await db.execute(select(User).filter(User.email == email))).scalars().first()
+    try:
+        if not user or not await verify_password_async(password, user.hashed_password):
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+
+    # BCRYPT_ROUNDS 調整後，登入成功時順便用新的 cost 重新雜湊
+    # 密碼已驗證過，executor 忙碌時跳過就好，下次登入再重新雜湊
+    if password_needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await hash_password_async(password)
+        except PasswordHasherBusy:
+            pass
+        else:
+            await db.commit()
 
     token = create_jwt_token({"sub": user.email})
 
@@ -1,55 +1,117 @@
 import os
-from fastapi import APIRouter, UploadFile, HTTPException, File, Form, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, UploadFile, HTTPException, File, Form, Depends, BackgroundTasks
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.core.db import get_db
+from app.core.db import get_async_db, get_async_session_factory
 from app.crud.crud_user import get_current_user
-from app.models import File as FileModel, Project, User
+from app.models import File as FileModel, Project, User, IngestionJob
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
+from app.core.config import UPLOAD_DIR, MAX_UPLOAD_FILE_BYTES, MAX_UPLOAD_REQUEST_BYTES
+from app.core.query_budget import query_budget
+from app.crud.crud_version import bump_project_versions
+from app.services.upload_store import store_upload, UploadTooLarge
+from app.services.ingestion import run_ingestion_job
+from app.services.llm import get_llm
 
 
 router = APIRouter(tags=["File"])
 
-UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 @router.post("/upload")
+@query_budget(5)  # 使用者、專案、專案版本號、files 與 ingestion_jobs 各一個 INSERT（多個檔案也是同一個 INSERT）
 async def upload_files(
+    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
     projectId: Optional[uuid.UUID] = Form(None),
+    ingest: bool = Form(False),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    session_factory = Depends(get_async_session_factory),
+    llm = Depends(get_llm)
 ):
     project_db_id = None
 
     if projectId:
-        project = db.query(Project).filter_by(id=projectId, user_id=current_user.id).first()
+        project = (await db.execute(
+            select(Project).filter_by(id=projectId, user_id=current_user.id)
+        )).scalars().first()
         if not project:
             raise HTTPException(status_code=404, detail="Project not found or not owned by user")
         project_db_id = project.id
 
     saved_files = []
-    for file in files:
-        file_path = os.path.join(UPLOAD_DIR, file.filename)
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-
-        db_file = FileModel(
-            name=file.filename,
-            url=f"/{UPLOAD_DIR}/{file.filename}",
-            project_id=project_db_id
-        )
-        db.add(db_file)
-        saved_files.append({
-            "file_url": f"/{UPLOAD_DIR}/{file.filename}",
-            "file_name": file.filename
-        })
-
-    db.commit()
+    jobs = []
+    request_bytes_left = MAX_UPLOAD_REQUEST_BYTES
+    try:
+        for file in files:
+            filename = os.path.basename(file.filename)
+            # 相同內容只存一份 blob；中途失敗留下的 blob 沒有 File 引用，交給背景 sweep 清掉
+            blob = await store_upload(
+                file, max_bytes=min(MAX_UPLOAD_FILE_BYTES, request_bytes_left), upload_dir=UPLOAD_DIR
+            )
+            request_bytes_left -= blob["size"]
+
+            db_file = FileModel(
+                id=uuid.uuid4(),
+                name=filename,
+                url=blob["url"],
+                project_id=project_db_id,
+                sha256=blob["sha256"],
+                size=blob["size"]
+            )
+            db.add(db_file)
+            # ingest=true 時 PDF 交給背景工作轉成專案，用 /ingestion_jobs/{job_id} 查進度
+            if ingest and filename.lower().endswith(".pdf"):
+                job = IngestionJob(id=uuid.uuid4(), user_id=current_user.id, file_id=db_file.id, status="pending")
+                jobs.append(job)
+            saved_files.append({
+                "file_url": blob["url"],
+                "file_name": filename,
+                "size": blob["size"],
+                "sha256": blob["sha256"],
+                "deduplicated": blob["deduplicated"]
+            })
+    except UploadTooLarge as e:
+        limit = "per-file" if e.limit == MAX_UPLOAD_FILE_BYTES else "per-request"
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {limit} limit of {e.limit} bytes")
+
+    db.add_all(jobs)
+    if project_db_id:
+        # /assistant/history 會列出專案的檔案
+        await bump_project_versions(db, [project_db_id], owners=False)
+    await db.commit()
+
+    for job in jobs:
+        background_tasks.add_task(run_ingestion_job, job.id, session_factory, llm)
 
     return {
         "project_id": projectId,
-        "files": saved_files
+        "files": saved_files,
+        "jobs": [{"job_id": str(job.id), "status": job.status} for job in jobs]
+    }
+
+
+@router.get("/ingestion_jobs/{job_id}")
+@query_budget(2)
+async def get_ingestion_job(
+    job_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    job = (await db.execute(
+        select(IngestionJob).filter_by(id=job_id, user_id=current_user.id)
+    )).scalars().first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+
+    return {
+        "job_id": str(job.id),
+        "status": job.status,
+        "error": job.error,
+        "project_ids": job.project_ids or [],
+        "created_at": job.created_at,
+        "finished_at": job.finished_at
     }
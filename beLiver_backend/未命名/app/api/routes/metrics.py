@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.metrics import registry
+from app.core.pool_metrics import pool_metrics_snapshot
+from app.crud.crud_user import principal_cache
+from app.services.pdf_extract import page_cache
+from app.services.llm import response_cache
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    # Prometheus 抓取用；每個 worker 各自一份，和 /metrics/pool 一樣
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@router.get("/metrics/pool")
+def get_pool_metrics():
+    # 每個 worker 各自回報（含 pid），多 worker 時需分別抓取
+    return pool_metrics_snapshot()
+
+@router.get("/metrics/cache")
+def get_cache_metrics():
+    return {
+        "principal": principal_cache.stats(),
+        "page_text": page_cache.stats(),
+        "llm_response": response_cache.stats(),
+    }
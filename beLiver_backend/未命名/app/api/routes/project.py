@@ -1,16 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from typing import List
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi.responses import JSONResponse
-from app.core.db import get_db 
+from app.core.db import get_async_db
 from app.crud.crud_user import get_current_user
 from app.schemas.project import *
 from app.crud.crud_project import *
 from app.models import User
+from app.core.query_budget import query_budget
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.crud.crud_version import get_milestone_version, get_user_version
 
 
 router = APIRouter(tags=["Project"])
@@ -24,11 +27,23 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
 
 
 @router.get("/projects", response_model=List[ProjectSchema])
-def get_all_projects(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@query_budget(3)
+async def get_all_projects(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     try:
-        projects = get_all_projects_with_progress(db)
+        # 版本號沒變就回 304，不必重算每個專案的進度
+        etag = make_etag("projects", current_user.id, await get_user_version(db, current_user.id))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        projects = await get_all_projects_with_progress(db, current_user.id)
         if not projects:
             return JSONResponse(status_code=404, content={"detail": "No projects found"})
+        set_etag(response, etag)
         return projects
 
     except SQLAlchemyError as e:
@@ -38,78 +53,108 @@ def get_all_projects(current_user: User = Depends(get_current_user), db: Session
 
 
 @router.get("/project_detail", response_model=ProjectDetailSchema)
-def get_project_detail(
+@query_budget(3)
+async def get_project_detail(
     project_id: uuid.UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    project_detail = get_project_detail_from_db(db, current_user.id, project_id)
+    # 專案列本身就帶版本號；版本沒變就回 304，不查里程碑彙總
+    project = await get_owned_project(db, current_user.id, project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    etag = make_etag("project", project_id, project.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    project_detail = await get_project_detail_from_db(db, current_user.id, project_id, project=project)
     if not project_detail:
         raise HTTPException(status_code=404, detail="Project not found")
+    set_etag(response, etag)
     return project_detail
 
 
 @router.get("/milestone_detail", response_model=MilestoneDetailSchema)
-def get_milestone_detail(
+@query_budget(4)
+async def get_milestone_detail(
     project_id: uuid.UUID,
     milestone_id: uuid.UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    milestone_detail = get_milestone_detail_from_db(db, current_user.id, project_id, milestone_id)
+    # 里程碑與任務的寫入都會更新所屬專案的版本號；先確認里程碑存在，If-None-Match: * 才不會對不存在的里程碑回 304
+    version = await get_milestone_version(db, current_user.id, project_id, milestone_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Milestone not found")
+    etag = make_etag("milestone", milestone_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    milestone_detail = await get_milestone_detail_from_db(db, current_user.id, project_id, milestone_id)
     if not milestone_detail:
         raise HTTPException(status_code=404, detail="Milestone not found")
+    set_etag(response, etag)
     return milestone_detail
 
 
 @router.put("/project_detail", response_model=UpdateProjectResponse)
-def update_project_detail(
+@query_budget(5)
+async def update_project_detail(
     payload: UpdateProjectRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return update_project(db, payload)
+    return await update_project(db, payload)
 
 
 @router.put("/milestone_detail", response_model=UpdateMilestoneResponse)
-def update_milestone_detail(
+@query_budget(5)
+async def update_milestone_detail(
     payload: UpdateMilestoneRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return update_milestone(db, payload)
+    return await update_milestone(db, payload)
 
 
 @router.delete("/project")
-def delete_project(
+@query_budget(9)
+async def delete_project(
     project_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return delete_project_in_db(db, current_user.id, project_id)
+    return await delete_project_in_db(db, current_user.id, project_id)
 
 
 @router.post("/task", response_model=CreateTaskResponse)
-def create_task(
+@query_budget(7)
+async def create_task(
     payload: CreateTaskRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return create_new_task(db, payload)
+    return await create_new_task(db, payload)
 
 
 @router.put("/task", response_model=UpdateTaskResponse)
-def update_task(
+@query_budget(6)
+async def update_task(
     payload: UpdateTaskRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return update_existing_task(db, payload)
+    return await update_existing_task(db, payload)
 
 @router.delete("/task")
-def delete_task(
+@query_budget(6)
+async def delete_task(
     task_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return delete_existing_task(db, task_id)
+    return await delete_existing_task(db, task_id)
@@ -1,87 +1,231 @@
 from fastapi import APIRouter, HTTPException, Depends, Query, Path, Body
-from sqlalchemy.orm import Session
-from datetime import datetime
-from app.models import Task, Project, User, Milestone
-from app.core.db import get_db
+from sqlalchemy import and_, func, literal_column, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from app.models import DailyWorkload, Task, Project, User, Milestone
+from app.core.db import get_async_db
+from app.core.responses import FastJSONResponse
 from app.crud.crud_user import get_current_user
+from app.core.query_budget import query_budget
+from app.crud.crud_version import bump_project_versions, projects_of_milestones, projects_of_tasks
+from app.schemas.project import BulkUpdateTasksRequest
+from app.services import workload_rollup
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
 
 router = APIRouter(tags=["Tasks"])
 
+# 一次最多查的天數（daily_loading 的長度上限、/tasks 區間查詢的上限）
+MAX_CALENDAR_DAYS = 366
+
+
+def _owned_tasks(*columns):
+    # 任務 → 里程碑 → 專案 一次 join，相關欄位直接一起取出，不逐筆 lazy load
+    return (
+        select(*columns)
+        .join(Milestone, Task.milestone_id == Milestone.id)
+        .join(Project, Milestone.project_id == Project.id)
+    )
+
+
 @router.get("/tasks")
-def get_tasks_by_date(
-    date: str = Query(..., description="YYYY-MM-DD"),
+@query_budget(2)
+async def get_tasks_by_date(
+    date: str | None = Query(None, description="YYYY-MM-DD"),
+    start_date: str | None = Query(None, description="Start Date: YYYY-MM-DD (with end_date instead of date)"),
+    end_date: str | None = Query(None, description="End Date: YYYY-MM-DD"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
+    if date is None:
+        if start_date is None or end_date is None:
+            raise HTTPException(status_code=400, detail="Provide either date or start_date and end_date.")
+        return await _get_tasks_in_range(start_date, end_date, current_user, db)
+
     try:
         date_obj = datetime.strptime(date, "%Y-%m-%d").date()
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
     
-    tasks = (
-        db.query(Task)
-        .join(Milestone, Task.milestone_id == Milestone.id) 
-        .join(Project, Milestone.project_id == Project.id)
+    # 只取需要的欄位並直接命名成回應的 key，不建立 ORM 物件、也不逐列組 dict
+    rows = await db.execute(
+        _owned_tasks(
+            Task.id.label("task_id"),
+            Task.title.label("task_title"),
+            Task.description,
+            Task.estimated_loading,
+            Task.is_completed.label("isCompleted"),
+            Milestone.project_id,
+        )
         .filter(Project.user_id == current_user.id)
         .filter(Task.due_date == date_obj)
-        .all()
     )
 
-    result = []
-    for task in tasks:
-        result.append({
-            "task_id": task.id,
-            "task_title": task.title,
-            "description": task.description,
-            "estimated_loading": float(task.estimated_loading),
-            "isCompleted": task.is_completed,
-            "project_id": task.milestone.project_id if task.milestone else None
-        })
+    return FastJSONResponse(rows.all())
+
+
+async def _get_tasks_in_range(start_date: str, end_date: str, current_user: User, db: AsyncSession):
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+
+    if end < start:
+        raise HTTPException(status_code=400, detail="End date must be after start date.")
+
+    days = (end - start).days + 1
+    if days > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range must be at most {MAX_CALENDAR_DAYS} days.")
+
+    # 週 / 月檢視一次查完整個區間，不必每天各打一次 /tasks
+    rows = await db.execute(
+        _owned_tasks(
+            Task.due_date,
+            Task.id.label("task_id"),
+            Task.title.label("task_title"),
+            Task.description,
+            Task.estimated_loading,
+            Task.is_completed.label("isCompleted"),
+            Milestone.project_id,
+            Milestone.id.label("milestone_id"),
+            Milestone.name.label("milestone_name"),
+            Project.name.label("project_name"),
+        )
+        .filter(Project.user_id == current_user.id)
+        .filter(Task.due_date.between(start, end))
+        .order_by(Task.due_date, Task.title)
+    )
+
+    # 每一天都有一個 key（沒有任務就是空陣列），依日期排序
+    by_day = {(start + timedelta(days=i)).isoformat(): [] for i in range(days)}
+    for row in rows:
+        task = row._asdict()
+        by_day[task.pop("due_date").isoformat()].append(task)
 
-    return result
+    return FastJSONResponse({
+        "start_date": start_date,
+        "end_date": end_date,
+        "days": by_day,
+    })
 
 @router.patch("/tasks/{task_id}")
-def update_task_status(
+@query_budget(7)
+async def update_task_status(
     task_id: uuid.UUID = Path(..., description="Task ID"),
     body: dict = Body(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     is_completed = body.get("isCompleted")
 
     if is_completed is None:
         raise HTTPException(status_code=400, detail="Missing 'isCompleted' in body")
 
-    task = (
-        db.query(Task)
+    # 鎖住任務列：每日負荷彙總的差額由讀到的舊值算出，併發的同一個修改不能各算一次
+    task = (await db.execute(
+        select(Task)
         .join(Milestone, Task.milestone_id == Milestone.id) 
         .join(Project, Milestone.project_id == Project.id)
         .filter(Project.user_id == current_user.id)
         .filter(Task.id == task_id)
-        .first()
-    )
+        .with_for_update(of=Task)
+    )).scalars().first()
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found or not authorized")
 
     task.is_completed = is_completed
-    db.commit()
-    db.refresh(task)
+    await bump_project_versions(db, projects_of_milestones([task.milestone_id]))
+    await db.commit()
+    await db.refresh(task)
 
     return {
         "task_id": task.id,
         "isCompleted": task.is_completed
     }
-    
+
+
+# PATCH /tasks 一次最多改幾個任務
+MAX_BULK_TASKS = 1000
+
+
+@router.patch("/tasks")
+@query_budget(7)
+async def update_tasks_bulk(
+    payload: BulkUpdateTasksRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    values = {}
+    if payload.isCompleted is not None:
+        values["is_completed"] = payload.isCompleted
+    if payload.due_date is not None:
+        values["due_date"] = payload.due_date
+    if not values:
+        raise HTTPException(status_code=400, detail="Provide 'isCompleted' and/or 'due_date'.")
+    if len(payload.task_ids) > MAX_BULK_TASKS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_TASKS} tasks per request.")
+    if not payload.task_ids:
+        return FastJSONResponse([])
+
+    # 只改自己的任務，且只改值真的不同的（已經是目標值的不算在回應裡）
+    owned_milestones = (
+        select(Milestone.id)
+        .join(Project, Milestone.project_id == Project.id)
+        .filter(Project.user_id == current_user.id)
+    )
+    changing = and_(
+        Task.id.in_(payload.task_ids),
+        Task.milestone_id.in_(owned_milestones),
+        or_(*(getattr(Task, column).is_distinct_from(value) for column, value in values.items())),
+    )
+    dialect = db.get_bind().dialect.name
+
+    # 先鎖住要改的任務（SQLite 沒有 FOR UPDATE，會忽略），之後扣掉、UPDATE、加回都用同一組 id：
+    # 否則併發的修改會讓「扣掉的」和「加回的」不是同一批任務，每日負荷彙總就對不上
+    locked_ids = (await db.execute(select(Task.id).filter(changing).with_for_update())).scalars().all()
+    if not locked_ids:
+        await db.commit()
+        return FastJSONResponse([])
+    locked = Task.id.in_(locked_ids)
+
+    # Core UPDATE 不會觸發 ORM 事件，每日負荷彙總先扣掉舊值、改完再加回新值
+    await db.execute(workload_rollup.tasks_statement(dialect, locked, sign=-1))
+    rows = (await db.execute(
+        update(Task)
+        .where(locked)
+        .values(**values)
+        .returning(Task.id.label("task_id"), Task.is_completed.label("isCompleted"), Task.due_date)
+        .execution_options(synchronize_session=False)
+    )).all()
+    await db.execute(workload_rollup.tasks_statement(dialect, locked, sign=1))
+    await bump_project_versions(db, projects_of_tasks(locked_ids))
+    await db.commit()
+
+    return FastJSONResponse(rows)
+
+
+def _project_overlaps(dialect: str, start: datetime, end: datetime):
+    """Projects whose [start_time, end_time] overlaps [start, end]."""
+    conditions = [Project.start_time <= end, Project.end_time >= start]
+    if dialect == "postgresql":
+        # 對應 migration 0006 的 GiST index（user_id, tsrange）；LEAST / GREATEST 讓結束早於開始的資料也能建 index
+        span = func.tsrange(func.least(Project.start_time, Project.end_time),
+                            func.greatest(Project.start_time, Project.end_time), literal_column("'[]'"))
+        window = func.tsrange(start, end, literal_column("'[]'"))
+        conditions += [Project.end_time.isnot(None), span.op("&&", is_comparison=True)(window)]
+    return and_(*conditions)
+
+
 @router.get("/calendar_projects")
-def get_projects_in_range(
+@query_budget(3)
+async def get_projects_in_range(
     start_date: str = Query(..., description="Start Date: YYYY-MM-DD"),
     end_date: str = Query(..., description="End Date: YYYY-MM-DD"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         start = datetime.strptime(start_date, "%Y-%m-%d")
@@ -92,21 +236,36 @@ def get_projects_in_range(
     if end < start:
         raise HTTPException(status_code=400, detail="End date must be after start date.")
 
-    projects = (
-        db.query(Project)
+    days = (end - start).days + 1
+    if days > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range must be at most {MAX_CALENDAR_DAYS} days.")
+
+    # 欄位名稱就是回應的 key，專案列不另外組 dict、原樣回傳
+    projects = (await db.execute(
+        select(
+            Project.name.label("project_name"),
+            Project.id.label("project_id"),
+            Project.start_time,
+            Project.end_time,
+        )
         .filter(Project.user_id == current_user.id)
-        .filter(Project.start_time <= end)
-        .filter(Project.end_time >= start)
-        .all()
+        .filter(_project_overlaps(db.get_bind().dialect.name, start, end))
+    )).all()
+    # 每天負荷直接讀彙總表（app/services/workload_rollup.py），不必加總使用者的任務
+    daily_loading = await db.execute(
+        select(DailyWorkload.day, DailyWorkload.total_loading)
+        .filter(DailyWorkload.user_id == current_user.id)
+        .filter(DailyWorkload.day.between(start.date(), end.date()))
     )
 
-    result = []
-    for p in projects:
-        result.append({
-            "project_name": p.name,
-            "project_id": p.id,
-            "start_time": p.start_time.isoformat(),
-            "end_time": p.end_time.isoformat() if p.end_time else None,
-        })
-        
-    return result
\ No newline at end of file
+    loading = [0.0] * days
+    for day, total_loading in daily_loading:
+        loading[(day - start.date()).days] = float(total_loading)
+
+    return FastJSONResponse({
+        "start_date": start_date,
+        "end_date": end_date,
+        "projects": projects,
+        # 第 i 個元素是 start_date + i 天到期任務的 estimated_loading 總和
+        "daily_loading": loading,
+    })
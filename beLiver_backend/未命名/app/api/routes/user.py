@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends
 from app.crud.crud_user import get_current_user
+from app.core.query_budget import query_budget
 
 router = APIRouter(tags=["User"])
 
 @router.get("/user/profile")
+@query_budget(1)
 def get_user_profile(current_user = Depends(get_current_user)):
     return {
         "user_id": current_user.id,
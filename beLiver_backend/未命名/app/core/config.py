@@ -1 +1,54 @@
-# 環境設定
\ No newline at end of file
+# 環境設定
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+# DB 連線池（每個 uvicorn worker 各自一份，總連線數 = workers * (size + overflow)）
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # 秒，避免拿到被 DB / proxy 關掉的舊連線
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", "true")
+
+# get_current_user 的使用者快取（以 token 的 sub / email 為 key）
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
+# 密碼雜湊（bcrypt）：獨立的 thread pool，不和其他 sync route 搶 FastAPI threadpool
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))  # 排隊超過就回 503
+
+# 上傳檔案：邊讀邊寫入磁碟，超過上限就中止（413）
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_UPLOAD_FILE_BYTES = int(os.getenv("MAX_UPLOAD_FILE_BYTES", str(512 * 1024 * 1024)))
+MAX_UPLOAD_REQUEST_BYTES = int(os.getenv("MAX_UPLOAD_REQUEST_BYTES", str(1024 * 1024 * 1024)))
+
+# 上傳內容以 sha256 去重存放；背景定期清掉沒有 File 引用的 blob
+BLOB_GC_INTERVAL = float(os.getenv("BLOB_GC_INTERVAL", "3600"))  # 秒，0 表示不啟動
+BLOB_GC_GRACE = float(os.getenv("BLOB_GC_GRACE", "3600"))  # 比這更新的 blob 不清，避免刪到還沒 commit 的上傳
+
+# PDF 轉專案：頁面文字抽取走 process pool，LLM 非同步呼叫
+GEMINI_KEY = os.getenv("GEMINI_KEY")
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # gemini | fake（本機開發 / 測試用）
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-1.5-flash")
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "2"))
+# 已解析過的 PDF 頁面文字快取（依檔案 sha256 + 頁碼），重新處理同一份文件不必再解析
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", os.path.join("cache", "pages"))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# 大文件分段送 LLM（map-reduce）：超過 LLM_CHUNK_CHARS 字就切段，同時最多 LLM_MAX_CONCURRENCY 個請求
+LLM_CHUNK_CHARS = int(os.getenv("LLM_CHUNK_CHARS", "30000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+# LLM 回應快取（key：模型 + prompt 版本 + 輸入 hash），存磁碟，重啟後仍有效
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join("cache", "llm"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 0 表示不快取
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+# 每個 route 的 SQL 數上限（@query_budget）：off | log | raise（測試）
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off")
@@ -1,8 +1,11 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
 from dotenv import load_dotenv
-from typing import Generator
+from typing import AsyncGenerator, Generator
+from app.core.config import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+from app.core.pool_metrics import TimedQueuePool, TimedAsyncAdaptedQueuePool, register_engine
 
 load_dotenv()
 
@@ -16,15 +19,38 @@ if not all([DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT]):
     raise Exception("Database config incomplete! Please check your .env file.")
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL)
+POOL_OPTIONS = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+engine = create_engine(DATABASE_URL, poolclass=TimedQueuePool, **POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# 非同步連線：API routes 使用，等待 DB 時不會佔住 threadpool
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=TimedAsyncAdaptedQueuePool, **POOL_OPTIONS)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+register_engine("sync", engine)
+register_engine("async", async_engine.sync_engine)
+
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
-  
\ No newline at end of file
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_async_session_factory() -> async_sessionmaker:
+    # 背景工作在 request 結束後才跑，需要自己開 session
+    return AsyncSessionLocal
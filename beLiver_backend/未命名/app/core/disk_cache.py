@@ -0,0 +1,113 @@
+# 磁碟快取：zlib 壓縮後一個 key 一個檔案，重啟後仍在，超過容量依 LRU 刪除
+#   <root>/ab/<key>   key 需為檔名安全的字串（例如 sha256 開頭）
+# 記憶體裡只放 key → 檔案大小 的 OrderedDict，查找 O(1)；最近使用順序存在檔案 mtime
+# 檔案開頭 8 bytes 是到期時間（epoch 秒，0 表示不過期）
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+
+class DiskCache:
+    """Persistent LRU cache of compressed bytes, bounded by total size on disk."""
+
+    def __init__(self, root: str, max_bytes: int, ttl: float | None = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._index: OrderedDict[str, int] | None = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def _load_index(self):
+        # 第一次使用時掃描一次，依 mtime 還原 LRU 順序
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                stat = os.stat(os.path.join(dirpath, name))
+                entries.append((stat.st_mtime, name, stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((name, size) for _, name, size in entries)
+        self._bytes = sum(size for _, _, size in entries)
+        self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            size = self._index.get(key)
+            if size is None:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    (expires_at,) = struct.unpack("!d", f.read(8))
+                    if expires_at and expires_at < time.time():
+                        raise KeyError(key)
+                    data = zlib.decompress(f.read())
+                os.utime(path)
+            except (FileNotFoundError, KeyError, struct.error, zlib.error):
+                # 過期、被外部刪掉或寫壞了，當作沒快取
+                del self._index[key]
+                self._bytes -= size
+                self.misses += 1
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                return None
+            self._index.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def set(self, key: str, value: bytes):
+        expires_at = time.time() + self.ttl if self.ttl else 0
+        data = struct.pack("!d", expires_at) + zlib.compress(value)
+        path = self._path(key)
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._bytes += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index or ()),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,32 @@
+# 條件式 GET：ETag 由版本號組成（app.crud.crud_version），
+# If-None-Match 相同時只查版本號就回 304，不跑組回應的查詢
+from fastapi import Request, Response
+
+# 回應格式改變時改這個前綴，讓舊的 ETag 全部失效
+ETAG_PREFIX = "v1"
+
+
+def make_etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in (ETAG_PREFIX, *parts)) + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match 用弱比較：忽略 W/ 前綴
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return etag in candidates
+
+
+def set_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    # 可以快取，但每次都要帶 If-None-Match 回來確認
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def not_modified(etag: str) -> Response:
+    return set_etag(Response(status_code=304), etag)
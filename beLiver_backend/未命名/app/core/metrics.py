@@ -0,0 +1,199 @@
+# Request / DB 監控：每個 route 的延遲、SQL 數與 DB 時間，輸出 Prometheus 文字格式
+#   MetricsMiddleware     每個 HTTP request 開一份 RequestStats（contextvar）
+#   SQLAlchemy 事件       所有 Engine 的 SQL 都記到目前 request 的 RequestStats
+# 數字是每個 worker process 各自一份（和 pool_metrics 一樣）
+import contextvars
+import threading
+import time
+from collections import Counter, defaultdict
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core import query_budget
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds", "done", "call_sites")
+
+    def __init__(self, call_sites: Counter | None = None):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.done = False  # response 已送完；之後的 SQL 屬於 background task
+        self.call_sites = call_sites  # 檢查 query budget 時才記錄每個 SQL 的呼叫位置
+
+
+current_request: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar("current_request", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = defaultdict(int)  # (method, route, status) -> count
+        self.errors = defaultdict(int)  # (method, route) -> count
+        self.latency = {}
+        self.db_statements = {}
+        self.db_seconds = {}
+        self.statements_outside_request = 0
+        self.db_seconds_outside_request = 0.0
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            self.requests[(method, route, status)] += 1
+            if status >= 500:
+                self.errors[key] += 1
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.db_statements.setdefault(key, Histogram(STATEMENT_BUCKETS)).observe(stats.statements)
+            self.db_seconds.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(stats.db_seconds)
+
+    def record_statement(self, seconds: float):
+        stats = current_request.get()
+        if stats is not None and not stats.done:
+            stats.statements += 1
+            stats.db_seconds += seconds
+        else:
+            # 背景工作（上傳後的 PDF 轉專案、blob sweep）
+            with self._lock:
+                self.statements_outside_request += 1
+                self.db_seconds_outside_request += seconds
+
+    def _histogram_lines(self, name: str, histograms: dict) -> list[str]:
+        lines = []
+        for (method, route), histogram in sorted(histograms.items()):
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f"{name}_bucket{{{_labels(method=method, route=route, le=bound)}}} {count}")
+            lines.append(f"{name}_bucket{{{_labels(method=method, route=route, le='+Inf')}}} {histogram.count}")
+            lines.append(f"{name}_sum{{{_labels(method=method, route=route)}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{_labels(method=method, route=route)}}} {histogram.count}")
+        return lines
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP http_requests_in_flight Requests currently being handled.",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}",
+                "# HELP http_requests_total Finished requests by route and status.",
+                "# TYPE http_requests_total counter",
+                *(f"http_requests_total{{{_labels(method=m, route=r, status=s)}}} {n}"
+                  for (m, r, s), n in sorted(self.requests.items())),
+                "# HELP http_request_errors_total Requests that ended in a 5xx or an unhandled exception.",
+                "# TYPE http_request_errors_total counter",
+                *(f"http_request_errors_total{{{_labels(method=m, route=r)}}} {n}"
+                  for (m, r), n in sorted(self.errors.items())),
+                "# HELP http_request_duration_seconds Time until the last response byte was sent.",
+                "# TYPE http_request_duration_seconds histogram",
+                *self._histogram_lines("http_request_duration_seconds", self.latency),
+                "# HELP http_request_db_statements SQL statements executed per request.",
+                "# TYPE http_request_db_statements histogram",
+                *self._histogram_lines("http_request_db_statements", self.db_statements),
+                "# HELP http_request_db_duration_seconds Time spent executing SQL per request.",
+                "# TYPE http_request_db_duration_seconds histogram",
+                *self._histogram_lines("http_request_db_duration_seconds", self.db_seconds),
+                "# HELP db_statements_outside_request_total SQL statements run by background work.",
+                "# TYPE db_statements_outside_request_total counter",
+                f"db_statements_outside_request_total {self.statements_outside_request}",
+                "# HELP db_duration_outside_request_seconds_total Time spent in SQL by background work.",
+                "# TYPE db_duration_outside_request_seconds_total counter",
+                f"db_duration_outside_request_seconds_total {self.db_seconds_outside_request}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request.get()
+    if stats is not None and stats.call_sites is not None and not stats.done:
+        stats.call_sites[query_budget.call_site()] += 1
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    registry.record_statement(time.perf_counter() - conn.info["query_started"].pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # 失敗的 SQL 沒有 after_cursor_execute，把開始時間清掉
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        registry.record_statement(time.perf_counter() - started.pop())
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per-request timing and DB counters, grouped by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(Counter() if query_budget.enabled() else None)
+        token = current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+        finished = None
+
+        async def send_with_status(message):
+            nonlocal status, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body"):
+                # background task 在送完 response 之後才跑，不算進這個 request
+                finished = time.perf_counter()
+                stats.done = True
+            await send(message)
+
+        registry.request_started()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            registry.request_finished(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                (finished or time.perf_counter()) - started,
+                stats,
+            )
+            current_request.reset(token)
+        if stats.call_sites is not None:
+            query_budget.check(scope["method"], route, stats.statements, stats.call_sites)
@@ -0,0 +1,118 @@
+# DB 連線池監控：checkout 次數、等待時間、連線建立 / 關閉（churn）
+import os
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+    """Counters for one engine's pool, updated from pool events."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def _incr(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def attach(self, engine) -> "PoolMetrics":
+        self.pool = engine.pool
+        engine.pool.metrics = self
+        event.listen(engine, "checkout", lambda *a: self._incr("checkouts"))
+        event.listen(engine, "checkin", lambda *a: self._incr("checkins"))
+        event.listen(engine, "connect", lambda *a: self._incr("connects"))
+        event.listen(engine, "close", lambda *a: self._incr("closes"))
+        event.listen(engine, "close_detached", lambda *a: self._incr("closes"))
+        event.listen(engine, "invalidate", lambda *a: self._incr("invalidations"))
+        event.listen(engine, "soft_invalidate", lambda *a: self._incr("invalidations"))
+        return self
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+        pool = self.pool
+        if isinstance(pool, QueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+
+class _TimedPoolMixin:
+    """Measures how long each checkout waits for a free connection."""
+
+    metrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - started)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.pool = pool
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+def register_engine(name: str, engine) -> PoolMetrics:
+    metrics = PoolMetrics(name).attach(engine)
+    pool_metrics[name] = metrics
+    return metrics
+
+
+def pool_metrics_snapshot() -> dict:
+    return {
+        "pid": os.getpid(),
+        "pools": {name: metrics.snapshot() for name, metrics in pool_metrics.items()},
+    }
@@ -0,0 +1,69 @@
+# 每個 route 宣告 SQL 數上限，抓出迴圈裡查詢（N+1）的退化
+#   @router.get("/tasks")
+#   @query_budget(2)
+#   async def get_tasks_by_date(...)
+# QUERY_BUDGET_MODE：off（不檢查）| log（超過時 warning，附上發出查詢的程式位置）| raise（測試用，直接丟例外）
+# 數的是 MetricsMiddleware 記到 RequestStats 的 SQL（含取得目前使用者的查詢，不含 background task）
+import logging
+import os
+import sys
+from collections import Counter
+
+from app.core.config import QUERY_BUDGET_MODE
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_SKIP_DIRS = (os.path.join(_APP_DIR, "core") + os.sep,)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(limit: int):
+    """Declare the most SQL statements one request to this endpoint may run."""
+    def decorator(endpoint):
+        endpoint.query_budget = limit
+        return endpoint
+    return decorator
+
+
+def enabled() -> bool:
+    return QUERY_BUDGET_MODE != "off"
+
+
+def _frames():
+    frame = sys._getframe(1)
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+    # AsyncSession 的 SQL 在 greenlet 裡執行，呼叫端的 coroutine 在 parent greenlet 上
+    greenlet = sys.modules.get("greenlet")
+    current = greenlet.getcurrent() if greenlet else None
+    while current is not None and current.parent is not None:
+        frame = current.parent.gr_frame
+        while frame is not None:
+            yield frame
+            frame = frame.f_back
+        current = current.parent
+
+
+def call_site() -> str:
+    """Innermost frame in app code (outside app/core) that led to the current statement."""
+    for frame in _frames():
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and not filename.startswith(_SKIP_DIRS):
+            return f"{os.path.relpath(filename, os.path.dirname(_APP_DIR.rstrip(os.sep)))}:{frame.f_lineno} ({frame.f_code.co_name})"
+    return "<unknown>"
+
+
+def check(method: str, route, statements: int, call_sites: Counter | None):
+    limit = getattr(getattr(route, "endpoint", None), "query_budget", None)
+    if limit is None or statements <= limit:
+        return
+    sites = "\n".join(f"  {count} x {site}" for site, count in (call_sites or Counter()).most_common())
+    message = f"{method} {route.path} ran {statements} SQL statements (budget {limit}):\n{sites}"
+    if QUERY_BUDGET_MODE == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
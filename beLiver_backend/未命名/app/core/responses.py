@@ -0,0 +1,45 @@
+# JSON 回應：orjson 直接序列化，不經過 jsonable_encoder + json.dumps
+# datetime / date / UUID 由 orjson 原生處理（ISO 8601、帶 '-' 的字串，和 jsonable_encoder 相同）
+# SQLAlchemy 的 Row 輸出成物件：orjson 只能把 tuple 輸出成陣列，所以序列化時每列仍會轉成一個 dict，
+# 省下的是 ORM 物件、route 裡的逐列組裝與 jsonable_encoder；欄位名稱每個清單只取一次
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.engine import Row, RowMapping
+
+
+def _default(value):
+    if isinstance(value, Row):
+        return dict(zip(value._fields, value))
+    if isinstance(value, RowMapping):
+        return dict(value)
+    if isinstance(value, Decimal):
+        # Numeric 欄位（estimated_loading）輸出成數字，和原本 float(...) 一致
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _rows_to_dicts(content):
+    # 同一個查詢結果的 Row 欄位相同：_fields 只取一次（Row._asdict() / _fields 每次呼叫都重建，清單很長時是主要成本）
+    if isinstance(content, list) and content and isinstance(content[0], Row):
+        fields = content[0]._fields
+        return [dict(zip(fields, row, strict=True)) for row in content]
+    if isinstance(content, dict):
+        return {key: _rows_to_dicts(value) for key, value in content.items()}
+    return content
+
+
+def dumps(content) -> bytes:
+    """Serialize ``content``; lists of Rows (top level or dict values) are expected to come from one result."""
+    return orjson.dumps(_rows_to_dicts(content), default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
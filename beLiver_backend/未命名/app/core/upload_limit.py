@@ -0,0 +1,52 @@
+# 上傳 request 的大小上限：在 Starlette 解析 multipart（把整個 body 暫存到磁碟）之前就擋掉
+#   Content-Length 超過上限 -> 不讀 body 直接回 413
+#   沒有 Content-Length（chunked）-> 邊收邊計數，超過就中斷解析回 413
+# route 內的 per-file / per-request 檢查（upload_store）仍然保留，這裡只是提早拒絕
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+from app.core import config
+
+# multipart 的 boundary 與每個 part 的 header 不算在檔案大小內，給一點餘裕
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _limit() -> int:
+    return config.MAX_UPLOAD_REQUEST_BYTES + MULTIPART_OVERHEAD_BYTES
+
+
+def _too_large(limit: int) -> str:
+    return f"Upload exceeds the per-request limit of {limit} bytes"
+
+
+class UploadLimitMiddleware:
+    def __init__(self, app, paths=("/upload",)):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        limit = _limit()
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse(status_code=413, content={"detail": _too_large(config.MAX_UPLOAD_REQUEST_BYTES)},
+                                    headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # FastAPI 解析 body 時遇到 HTTPException 會原樣往外丟
+                    raise HTTPException(status_code=413, detail=_too_large(config.MAX_UPLOAD_REQUEST_BYTES))
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,63 +1,109 @@
 # crud/crud_project.py
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func, case, and_, insert, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from app.schemas.project import *
 from typing import Optional
 from app.models import Project as ProjectModel, Milestone as MilestoneModel, Task as TaskModel
+from app.models import File as FileModel, ChatHistory as ChatHistoryModel
+from app.crud.crud_version import bump_project_versions, bump_user_versions, projects_of_milestones
+from app.services.workload_rollup import remove_project_statement, task_rows_upsert
+from app.services.project_tree import flatten_project_tree
 from fastapi import HTTPException
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
 
-def get_all_projects_with_progress(db: Session):
-    projects = db.query(ProjectModel).all()
-    result = []
+def projects_with_progress_query(user_id: uuid.UUID):
+    # 每個專案最新的里程碑（end_time 最大）
+    # 子查詢內先限定使用者的專案：PostgreSQL 不會把外層的 user_id 條件推進 window function，否則會掃整張 milestones
+    latest_milestone = (
+        select(
+            MilestoneModel.id.label("milestone_id"),
+            MilestoneModel.project_id.label("project_id"),
+            func.row_number().over(
+                partition_by=MilestoneModel.project_id,
+                order_by=MilestoneModel.end_time.desc()
+            ).label("rank")
+        )
+        .join(ProjectModel, MilestoneModel.project_id == ProjectModel.id)
+        .filter(ProjectModel.user_id == user_id)
+        .subquery()
+    )
 
-    for project in projects:
-        milestone = (
-            db.query(MilestoneModel)
-            .filter(MilestoneModel.project_id == project.id)
-            .order_by(MilestoneModel.end_time.desc())
-            .first()
+    # 一次查詢：專案 + 最新里程碑的完成 / 總任務數
+    return (
+        select(
+            ProjectModel.id,
+            ProjectModel.name,
+            ProjectModel.due_date,
+            ProjectModel.current_milestone,
+            func.count(TaskModel.id).label("total_tasks"),
+            func.coalesce(func.sum(case((TaskModel.is_completed == True, 1), else_=0)), 0).label("completed_tasks")
         )
-        progress = 0.0
-        if milestone and milestone.tasks:
-            progress = sum(task.is_completed for task in milestone.tasks) / len(milestone.tasks)
-
-        result.append({
-            "project_id": str(project.id),
-            "project_name": project.name,
-            "due_date": project.due_date,
-            "progress": progress,
-            "current_milestone": project.current_milestone or ""
-        })
-
-    return result
-
-def get_project_detail_from_db(db: Session, user_id: str, project_id: uuid.UUID) -> Optional[ProjectDetailSchema]:
-    project = db.query(ProjectModel).filter(
+        .outerjoin(latest_milestone, and_(
+            latest_milestone.c.project_id == ProjectModel.id,
+            latest_milestone.c.rank == 1
+        ))
+        .outerjoin(TaskModel, TaskModel.milestone_id == latest_milestone.c.milestone_id)
+        .filter(ProjectModel.user_id == user_id)
+        .group_by(ProjectModel.id, ProjectModel.name, ProjectModel.due_date, ProjectModel.current_milestone)
+    )
+
+
+async def get_all_projects_with_progress(db: AsyncSession, user_id: uuid.UUID):
+    rows = await db.execute(projects_with_progress_query(user_id))
+
+    return [
+        {
+            "project_id": str(row.id),
+            "project_name": row.name,
+            "due_date": row.due_date,
+            "progress": row.completed_tasks / row.total_tasks if row.total_tasks else 0.0,
+            "current_milestone": row.current_milestone or ""
+        }
+        for row in rows
+    ]
+
+async def get_owned_project(db: AsyncSession, user_id: str, project_id: uuid.UUID) -> Optional[ProjectModel]:
+    return (await db.execute(select(ProjectModel).filter(
         ProjectModel.id == project_id,
         ProjectModel.user_id == user_id
-    ).first()
+    ))).scalars().first()
+
+async def get_project_detail_from_db(db: AsyncSession, user_id: str, project_id: uuid.UUID,
+                                     project: Optional[ProjectModel] = None) -> Optional[ProjectDetailSchema]:
+    # 呼叫端已經查過專案（例如為了 ETag）就直接傳進來，不再查一次
+    if project is None:
+        project = await get_owned_project(db, user_id, project_id)
 
     if not project:
         return None
 
-    milestones = db.query(MilestoneModel).filter(
-        MilestoneModel.project_id == project_id
-    ).all()
-
-    milestone_summaries = []
-    for ms in milestones:
-        progress = 0.0
-        if ms.tasks:
-            progress = sum(task.is_completed for task in ms.tasks) / len(ms.tasks)
+    # 一次 GROUP BY 算出每個里程碑的完成 / 總任務數
+    milestones = await db.execute(
+        select(
+            MilestoneModel.id,
+            MilestoneModel.name,
+            MilestoneModel.end_time,
+            func.count(TaskModel.id).label("total_tasks"),
+            func.coalesce(func.sum(case((TaskModel.is_completed == True, 1), else_=0)), 0).label("completed_tasks")
+        )
+        .outerjoin(TaskModel, TaskModel.milestone_id == MilestoneModel.id)
+        .filter(MilestoneModel.project_id == project_id)
+        .group_by(MilestoneModel.id, MilestoneModel.name, MilestoneModel.end_time)
+        .order_by(MilestoneModel.end_time)
+    )
 
-        milestone_summaries.append(MilestoneSummarySchema(
+    milestone_summaries = [
+        MilestoneSummarySchema(
             milestone_id=str(ms.id),
             milestone_name=ms.name,
             ddl=ms.end_time,
-            progress=progress
-        ))
+            progress=ms.completed_tasks / ms.total_tasks if ms.total_tasks else 0.0
+        )
+        for ms in milestones
+    ]
 
     return ProjectDetailSchema(
         project_name=project.name,
@@ -68,17 +114,17 @@ def get_project_detail_from_db(db: Session, user_id: str, project_id: uuid.UUID)
         milestones=milestone_summaries
     )
 
-def get_milestone_detail_from_db(db: Session, user_id: str, project_id: uuid.UUID, milestone_id: uuid.UUID) -> Optional[MilestoneDetailSchema]:
-    milestone = (
-        db.query(MilestoneModel)
+async def get_milestone_detail_from_db(db: AsyncSession, user_id: str, project_id: uuid.UUID, milestone_id: uuid.UUID) -> Optional[MilestoneDetailSchema]:
+    milestone = (await db.execute(
+        select(MilestoneModel)
         .join(ProjectModel)
+        .options(selectinload(MilestoneModel.tasks))
         .filter(
             MilestoneModel.id == milestone_id,
             MilestoneModel.project_id == project_id,
             ProjectModel.user_id == user_id
         )
-        .first()
-    )
+    )).scalars().first()
 
     if not milestone:
         return None
@@ -102,8 +148,10 @@ def get_milestone_detail_from_db(db: Session, user_id: str, project_id: uuid.UUI
         tasks=tasks
     )
 
-def update_project(db: Session, payload: UpdateProjectRequest) -> UpdateProjectResponse:
-    project = db.query(ProjectModel).filter(ProjectModel.id == payload.project_id).first()
+async def update_project(db: AsyncSession, payload: UpdateProjectRequest) -> UpdateProjectResponse:
+    project = (await db.execute(
+        select(ProjectModel).filter(ProjectModel.id == payload.project_id)
+    )).scalars().first()
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -113,7 +161,8 @@ def update_project(db: Session, payload: UpdateProjectRequest) -> UpdateProjectR
     project.start_time = payload.changed_project_start_time
     project.end_time = payload.changed_project_end_time
 
-    db.commit()
+    await bump_project_versions(db, [project.id])
+    await db.commit()
 
     return UpdateProjectResponse(
         status="success",
@@ -125,11 +174,11 @@ def update_project(db: Session, payload: UpdateProjectRequest) -> UpdateProjectR
         }
     )
 
-def update_milestone(db: Session, payload: UpdateMilestoneRequest) -> UpdateMilestoneResponse:
-    milestone = db.query(MilestoneModel).filter(
+async def update_milestone(db: AsyncSession, payload: UpdateMilestoneRequest) -> UpdateMilestoneResponse:
+    milestone = (await db.execute(select(MilestoneModel).filter(
         MilestoneModel.id == payload.milestone_id,
         MilestoneModel.project_id == payload.project_id
-    ).first()
+    ))).scalars().first()
 
     if not milestone:
         raise HTTPException(status_code=404, detail="Milestone not found")
@@ -138,7 +187,8 @@ def update_milestone(db: Session, payload: UpdateMilestoneRequest) -> UpdateMile
     milestone.start_time = payload.changed_milestone_start_time
     milestone.end_time = payload.changed_milestone_end_time
 
-    db.commit()
+    await bump_project_versions(db, [milestone.project_id])
+    await db.commit()
 
     return UpdateMilestoneResponse(
         status="success",
@@ -149,24 +199,32 @@ def update_milestone(db: Session, payload: UpdateMilestoneRequest) -> UpdateMile
         }
     )
 
-def delete_project_in_db(db: Session, user_id: str, project_id: uuid.UUID) -> dict:
-    project = db.query(ProjectModel).filter(
+async def delete_project_in_db(db: AsyncSession, user_id: str, project_id: uuid.UUID) -> dict:
+    project = (await db.execute(select(ProjectModel).filter(
         ProjectModel.id == project_id,
         ProjectModel.user_id == user_id
-    ).first()
+    ))).scalars().first()
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    db.delete(project)
-    db.commit()
+    # 用整批 DELETE 取代 ORM cascade（cascade 會逐一載入每個里程碑的任務）
+    # tasks.milestone_id 是 ON DELETE SET NULL，要先自己刪
+    await db.execute(remove_project_statement(db.get_bind().dialect.name, project_id))
+    milestone_ids = select(MilestoneModel.id).filter(MilestoneModel.project_id == project_id)
+    await db.execute(delete(TaskModel).filter(TaskModel.milestone_id.in_(milestone_ids)))
+    for model in (MilestoneModel, FileModel, ChatHistoryModel):
+        await db.execute(delete(model).filter(model.project_id == project_id))
+    await db.execute(delete(ProjectModel).filter(ProjectModel.id == project_id))
+    await bump_user_versions(db, [user_id])
+    await db.commit()
 
     return {"status": "success", "message": "Project successfully deleted"}
 
-def create_new_task(db: Session, payload: CreateTaskRequest) -> CreateTaskResponse:
-    milestone = db.query(MilestoneModel).filter(
+async def create_new_task(db: AsyncSession, payload: CreateTaskRequest) -> CreateTaskResponse:
+    milestone = (await db.execute(select(MilestoneModel).filter(
         MilestoneModel.id == payload.milestone_id
-    ).first()
+    ))).scalars().first()
 
     if not milestone:
         raise HTTPException(status_code=404, detail="Milestone not found")
@@ -179,8 +237,9 @@ def create_new_task(db: Session, payload: CreateTaskRequest) -> CreateTaskRespon
     )
 
     db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    await bump_project_versions(db, [milestone.project_id])
+    await db.commit()
+    await db.refresh(new_task)
 
     return CreateTaskResponse(
         status="success",
@@ -193,15 +252,19 @@ def create_new_task(db: Session, payload: CreateTaskRequest) -> CreateTaskRespon
         }
     )
 
-def update_existing_task(db: Session, payload: UpdateTaskRequest) -> UpdateTaskResponse:
-    task = db.query(TaskModel).filter(TaskModel.id == payload.task_id).first()
+async def update_existing_task(db: AsyncSession, payload: UpdateTaskRequest) -> UpdateTaskResponse:
+    # 鎖住任務列，每日負荷彙總的差額才會以最新的舊值計算（同 PATCH /tasks）
+    task = (await db.execute(
+        select(TaskModel).filter(TaskModel.id == payload.task_id).with_for_update()
+    )).scalars().first()
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
     task.title = payload.changed_name
     task.due_date = payload.changed_ddl
-    db.commit()
+    await bump_project_versions(db, projects_of_milestones([task.milestone_id]))
+    await db.commit()
 
     return UpdateTaskResponse(
         status="success",
@@ -211,15 +274,37 @@ def update_existing_task(db: Session, payload: UpdateTaskRequest) -> UpdateTaskR
         }
     )
 
-def delete_existing_task(db: Session, task_id: uuid.UUID) -> dict:
-    task = db.query(TaskModel).filter(TaskModel.id == task_id).first()
+async def delete_existing_task(db: AsyncSession, task_id: uuid.UUID) -> dict:
+    task = (await db.execute(select(TaskModel).filter(TaskModel.id == task_id).with_for_update())).scalars().first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    db.delete(task)
-    db.commit()
+    await bump_project_versions(db, projects_of_milestones([task.milestone_id]))
+    await db.delete(task)
+    await db.commit()
 
     return {
         "status": "success",
         "message": "Task successfully deleted"
-    }
\ No newline at end of file
+    }
+async def insert_project_tree(db: AsyncSession, user_id: uuid.UUID, projects: list[dict]) -> list[uuid.UUID]:
+    """Bulk-insert projects with nested ``milestones`` / ``tasks``; the caller commits.
+
+    IDs are generated here so each level is a single executemany INSERT
+    instead of one round trip per row. Flattening (ids, links, defaults)
+    is shared with the seed scripts (``app/services/project_tree.py``).
+    """
+    tables = flatten_project_tree(user_id, projects, lambda table: uuid.uuid4())
+    for model, table in ((ProjectModel, "projects"), (MilestoneModel, "milestones"), (TaskModel, "tasks"),
+                         (FileModel, "files"), (ChatHistoryModel, "chat_histories")):
+        if tables[table]:
+            await db.execute(insert(model), tables[table])
+
+    # Core INSERT 不會觸發 ORM 事件，每日負荷彙總自己加
+    statement, params = task_rows_upsert(db.get_bind().dialect.name, tables["tasks"])
+    if params:
+        await db.execute(statement, params)
+
+    if tables["projects"]:
+        await bump_user_versions(db, [user_id])
+    return [row["id"] for row in tables["projects"]]
@@ -1,21 +1,48 @@
 # 使用者table crud
 import os
+import uuid
+from dataclasses import dataclass
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import User
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from app.core.db import get_db
+from app.core.cache import TTLCache
+from app.core.config import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL
+from app.core.db import get_async_db
 
 
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 security = HTTPBearer()
 
-def get_current_user(
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by routes; safe to share across sessions."""
+    id: uuid.UUID
+    name: str
+    email: str
+
+
+# token subject (email) -> Principal；使用者更新 / 刪除時清掉
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    principal_cache.pop(target.email)
+    # email 被改掉時，舊 email 的快取也要清
+    for old_email in inspect(target).attrs.email.history.deleted:
+        principal_cache.pop(old_email)
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     token = credentials.credentials
     try:
@@ -26,11 +53,18 @@ def get_current_user(
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = get_user_by_email(db, email=email)
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    user = await get_user_by_email(db, email=email)
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
 
-    return user
+    principal = Principal(id=user.id, name=user.name, email=user.email)
+    principal_cache.set(email, principal)
+    return principal
 
-def get_user_by_email(db: Session, email: str) -> User | None:
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
+    result = await db.execute(select(User).filter(User.email == email))
+    return result.scalars().first()
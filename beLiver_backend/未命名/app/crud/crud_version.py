@@ -0,0 +1,62 @@
+# 使用者 / 專案的版本號（ETag 用）
+#   users.version：使用者任何專案、里程碑、任務有寫入就 +1（/projects）
+#   projects.version：專案本身、里程碑、任務、對話、檔案有寫入就 +1（/project_detail、/milestone_detail、/assistant/history）
+# 寫入的地方在同一個 transaction 內呼叫 bump_*，和資料一起 commit
+import uuid
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Milestone, Project, Task, User
+
+
+async def get_user_version(db: AsyncSession, user_id: uuid.UUID) -> Optional[int]:
+    return (await db.execute(select(User.version).filter(User.id == user_id))).scalar()
+
+
+async def get_project_version(db: AsyncSession, user_id: uuid.UUID, project_id: uuid.UUID) -> Optional[int]:
+    """None when the project does not exist or belongs to someone else."""
+    return (await db.execute(
+        select(Project.version).filter(Project.id == project_id, Project.user_id == user_id)
+    )).scalar()
+
+
+async def get_milestone_version(db: AsyncSession, user_id: uuid.UUID, project_id: uuid.UUID,
+                                milestone_id: uuid.UUID) -> Optional[int]:
+    """The owning project's version; None unless the milestone exists under the user's ``project_id``."""
+    return (await db.execute(
+        select(Project.version)
+        .join(Milestone, Milestone.project_id == Project.id)
+        .filter(Milestone.id == milestone_id, Project.id == project_id, Project.user_id == user_id)
+    )).scalar()
+
+
+def projects_of_milestones(milestone_ids):
+    return select(Milestone.project_id).filter(Milestone.id.in_(milestone_ids))
+
+
+def projects_of_tasks(task_ids):
+    return projects_of_milestones(select(Task.milestone_id).filter(Task.id.in_(task_ids)))
+
+
+async def bump_user_versions(db: AsyncSession, user_ids):
+    """``user_ids``: a list of ids or a select of them."""
+    await db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(version=User.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def bump_project_versions(db: AsyncSession, project_ids, owners: bool = True):
+    """Bump ``project_ids`` (a list or a select) and, unless ``owners`` is False, their users too."""
+    await db.execute(
+        update(Project)
+        .where(Project.id.in_(project_ids))
+        .values(version=Project.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if owners:
+        await bump_user_versions(db, select(Project.user_id).filter(Project.id.in_(project_ids)))
@@ -1,12 +1,36 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
+from fastapi.datastructures import Default
 from fastapi.openapi.utils import get_openapi
-from app.models import Base
-from app.core.db import engine
 from app.api.main import router as api_router 
+from app.core.config import BLOB_GC_INTERVAL, BLOB_GC_GRACE
+from app.core.db import AsyncSessionLocal
+from app.core.metrics import MetricsMiddleware
+from app.core.responses import FastJSONResponse
+from app.core.upload_limit import UploadLimitMiddleware
+from app.services.upload_store import run_blob_sweeper
 
-app = FastAPI()
 
-app.include_router(api_router)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweeper = None
+    if BLOB_GC_INTERVAL > 0:
+        sweeper = asyncio.create_task(run_blob_sweeper(AsyncSessionLocal, BLOB_GC_INTERVAL, BLOB_GC_GRACE))
+    yield
+    if sweeper:
+        sweeper.cancel()
+        # 等進行中的 sweep 停下來（to_thread 裡的 rename / unlink 做完）才結束
+        with suppress(asyncio.CancelledError):
+            await sweeper
+
 
+# 資料表由 Alembic migration 建立：alembic upgrade head
+# 沒有 response_model 的 route 用 orjson 輸出；包成 Default 讓有 response_model 的 route
+# 仍走 FastAPI 內建的 Pydantic 直接序列化
+app = FastAPI(lifespan=lifespan, default_response_class=Default(FastJSONResponse))
+# 後加的在外層：MetricsMiddleware 也會記到上傳被提早拒絕的 413
+app.add_middleware(UploadLimitMiddleware)
+app.add_middleware(MetricsMiddleware)
 
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+app.include_router(api_router)
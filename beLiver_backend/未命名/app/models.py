@@ -1,11 +1,24 @@
 import uuid
-from sqlalchemy import Column, String, Text, Date, Boolean, ForeignKey, TIMESTAMP, Numeric
+from sqlalchemy import Column, String, Text, Date, Boolean, ForeignKey, TIMESTAMP, Numeric, Index, BigInteger, JSON, Integer
 from sqlalchemy.dialects.postgresql import UUID  # 若你用的是 PostgreSQL
 from sqlalchemy.orm import relationship, declarative_base
-from datetime import datetime
+from datetime import datetime, timezone
+from sqlalchemy.types import TypeDecorator
 from app.core.db import Base
 # Base = declarative_base()
 
+
+class UTCTimestamp(TypeDecorator):
+    """TIMESTAMP (without time zone) holding naive UTC; aware datetimes are converted before binding."""
+    # asyncpg 對 TIMESTAMP 欄位只接受 naive datetime（帶時區會 DataError），psycopg2 / SQLite 則不檢查
+    impl = TIMESTAMP
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
 class User(Base):
     __tablename__ = 'users'
 
@@ -13,6 +26,8 @@ class User(Base):
     name = Column(String(255), nullable=False)
     email = Column(String(255), unique=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
+    # 使用者任何專案 / 里程碑 / 任務有寫入就 +1，/projects 的 ETag 用（app.crud.crud_version）
+    version = Column(BigInteger, nullable=False, default=1, server_default='1')
 
     projects = relationship('Project', back_populates='user', cascade='all, delete-orphan')
     chat_histories = relationship('ChatHistory', back_populates='user', cascade='all, delete-orphan')
@@ -20,16 +35,23 @@ class User(Base):
 
 class Project(Base):
     __tablename__ = 'projects'
+    __table_args__ = (
+        # /projects、/calendar_projects：依使用者 + 時間區間篩選
+        # PostgreSQL 另有 GiST 區間 index ix_projects_user_id_span，只在 migration 0006 建立
+        Index('ix_projects_user_id_start_time_end_time', 'user_id', 'start_time', 'end_time'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     summary = Column(Text)
-    start_time = Column(TIMESTAMP, nullable=False)
-    end_time = Column(TIMESTAMP)
+    start_time = Column(UTCTimestamp, nullable=False)
+    end_time = Column(UTCTimestamp)
     estimated_loading = Column(Numeric(3, 1))
     due_date = Column(Date)
     current_milestone = Column(String(255))
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'))
+    # 專案本身、里程碑、任務、對話、檔案有寫入就 +1，專案底下 GET 的 ETag 用
+    version = Column(BigInteger, nullable=False, default=1, server_default='1')
 
     user = relationship('User', back_populates='projects')
     milestones = relationship('Milestone', back_populates='project', cascade='all, delete-orphan')
@@ -39,12 +61,16 @@ class Project(Base):
 
 class Milestone(Base):
     __tablename__ = 'milestones'
+    __table_args__ = (
+        # 專案底下的里程碑、最新里程碑（end_time 排序）
+        Index('ix_milestones_project_id_end_time', 'project_id', 'end_time'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     summary = Column(Text)
-    start_time = Column(TIMESTAMP, nullable=False)
-    end_time = Column(TIMESTAMP)
+    start_time = Column(UTCTimestamp, nullable=False)
+    end_time = Column(UTCTimestamp)
     estimated_loading = Column(Numeric(3, 1))
     project_id = Column(UUID(as_uuid=True), ForeignKey('projects.id', ondelete='CASCADE'))
 
@@ -54,6 +80,12 @@ class Milestone(Base):
 
 class Task(Base):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # /tasks：依日期找任務再 join 里程碑
+        Index('ix_tasks_due_date_milestone_id', 'due_date', 'milestone_id'),
+        # 里程碑進度：完成 / 總任務數
+        Index('ix_tasks_milestone_id_is_completed', 'milestone_id', 'is_completed'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(255), nullable=False)
@@ -68,24 +100,61 @@ class Task(Base):
 
 class File(Base):
     __tablename__ = 'files'
+    __table_args__ = (
+        Index('ix_files_project_id', 'project_id'),
+        Index('ix_files_sha256', 'sha256'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     url = Column(Text, nullable=False)
     project_id = Column(UUID(as_uuid=True), ForeignKey('projects.id', ondelete='CASCADE'))
+    sha256 = Column(String(64))  # 指向 uploads/blobs 裡的內容；舊資料為 NULL
+    size = Column(BigInteger)
 
     project = relationship('Project', back_populates='files')
 
 
 class ChatHistory(Base):
     __tablename__ = 'chat_histories'
+    __table_args__ = (
+        # /assistant/history：某專案某使用者的對話，依 (timestamp, id) keyset 分頁
+        Index('ix_chat_histories_project_id_user_id_timestamp_id', 'project_id', 'user_id', 'timestamp', 'id'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'))
     project_id = Column(UUID(as_uuid=True), ForeignKey('projects.id', ondelete='CASCADE'))
     message = Column(Text, nullable=False)
     sender = Column(String(50), nullable=False)
-    timestamp = Column(TIMESTAMP, default=datetime.utcnow)
+    timestamp = Column(UTCTimestamp, default=datetime.utcnow)
 
     user = relationship('User', back_populates='chat_histories')
     project = relationship('Project', back_populates='chat_histories')
+
+
+class IngestionJob(Base):
+    __tablename__ = 'ingestion_jobs'
+    __table_args__ = (
+        Index('ix_ingestion_jobs_user_id', 'user_id'),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    file_id = Column(UUID(as_uuid=True), ForeignKey('files.id', ondelete='SET NULL'))
+    status = Column(String(20), nullable=False, default='pending')  # pending | running | succeeded | failed
+    error = Column(Text)
+    project_ids = Column(JSON)
+    created_at = Column(UTCTimestamp, default=datetime.utcnow)
+    finished_at = Column(UTCTimestamp)
+
+
+# 每位使用者每天的任務負荷彙總（負荷熱圖 / 行事曆用），由 app.services.workload_rollup 維護
+class DailyWorkload(Base):
+    __tablename__ = 'daily_workloads'
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    total_loading = Column(Numeric(10, 1), nullable=False, default=0)
+    completed_loading = Column(Numeric(10, 1), nullable=False, default=0)
+    task_count = Column(Integer, nullable=False, default=0)
@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from datetime import datetime, date
 from typing import List
 from typing import Dict
+import uuid
 
 
 class ProjectSchema(BaseModel):
@@ -58,7 +59,7 @@ class MilestoneDetailSchema(BaseModel):
         orm_mode = True
 
 class UpdateProjectRequest(BaseModel):
-    project_id: str
+    project_id: uuid.UUID
     changed_project_summary: str
     changed_name: str
     changed_project_start_time: datetime
@@ -72,8 +73,8 @@ class UpdateProjectResponse(BaseModel):
         orm_mode = True
 
 class UpdateMilestoneRequest(BaseModel):
-    project_id: str
-    milestone_id: str
+    project_id: uuid.UUID
+    milestone_id: uuid.UUID
     changed_milestone_summary: str
     changed_milestone_start_time: datetime
     changed_milestone_end_time: datetime
@@ -86,7 +87,7 @@ class UpdateMilestoneResponse(BaseModel):
         orm_mode = True
 
 class CreateTaskRequest(BaseModel):
-    milestone_id: str
+    milestone_id: uuid.UUID
     ddl: date
     name: str
 
@@ -95,10 +96,15 @@ class CreateTaskResponse(BaseModel):
     task: Dict[str, str | bool | date]
 
 class UpdateTaskRequest(BaseModel):
-    task_id: str
+    task_id: uuid.UUID
     changed_name: str
     changed_ddl: date
 
 class UpdateTaskResponse(BaseModel):
     status: str
-    updated_fields: Dict[str, str | date]
\ No newline at end of file
+    updated_fields: Dict[str, str | date]
+
+class BulkUpdateTasksRequest(BaseModel):
+    task_ids: List[uuid.UUID]
+    isCompleted: bool | None = None
+    due_date: date | None = None
@@ -0,0 +1,311 @@
+# PDF 轉專案：抽取頁面文字 → 組 prompt → 呼叫 LLM → 一次寫入專案 / 里程碑 / 任務
+# 文件太長時改為分段：每段各自抽里程碑（map），再合併成一個專案（reduce）
+import asyncio
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import select
+from app.core import config
+from app.crud.crud_project import insert_project_tree
+from app.models import File as FileModel, IngestionJob
+from app.services.pdf_extract import extract_pages
+from app.services.upload_store import blob_path
+
+logger = logging.getLogger(__name__)
+
+# prompt 內容有改就要改版本號，LLM 快取才不會回傳舊 prompt 的結果
+PROJECT_PROMPT_VERSION = "project-1"
+CHUNK_PROMPT_VERSION = "chunk-1"
+
+# 原 gemini.py 的 prompt，PDF 文字填入 {all_text}
+PROJECT_PROMPT = """
+請閱讀以下 PDF 內容，並依據指定格式進行結構化整理，將專案資訊轉換成 JSON 資料，結構如下：
+- 專案（Project）：包含專案整體資訊。
+- 里程碑（Milestone）：專案中各階段的重要成果與期間。
+- 任務（Task）：從里程碑摘要中推論與拆解出具體工作項目。
+
+請依照以下格式輸出 JSON：
+{{
+  "projects": [
+    {{
+      "name": "...",
+      "summary": "...",
+      "start_time": "...",              ← 根據內容或合理推測填寫（YYYY-MM-DD）
+      "end_time": "...",
+      "due_date": "...",
+      "estimated_loading": ...,         ← 根據整體工作量合理估算（整數小時，例如 20, 40）
+      "current_milestone": "...",
+      "milestones": [
+        {{
+          "name": "...",
+          "summary": "...",
+          "start_time": "...",          ← 根據內容或合理推測填寫（YYYY-MM-DD）
+          "end_time": "...",
+          "estimated_loading": ...,     ← 根據該階段工作項目估算整體工時
+          "tasks": [
+            {{
+              "title": "...",           ← 根據 Milestone summary 合理拆解出工作項目名稱
+              "description": "...",     ← 詳細描述任務內容與預期產出
+              "due_date": "...",        ← 根據任務先後順序與合理排程推估（YYYY-MM-DD）
+              "estimated_loading": ..., ← 根據任務工作量合理估算（整數）
+              "is_completed": false     ← 預設為未完成
+            }}
+          ]
+        }}
+      ]
+    }}
+  ]
+}}
+
+請遵守以下規則：
+1. **所有日期與時間欄位（start_time, end_time, due_date）均需填寫**，不得為 null。
+2. **所有 estimated_loading 請給出合理整數估算**（例如 5, 10, 20），不得為 null。
+3. 每個 Milestone 至少拆解出 **3 項具體任務（tasks）**。
+4. 任務命名與內容應根據里程碑摘要合理拆解，避免過於模糊或重複。
+5. **每個任務的 due_date 請根據邏輯先後順序與工時推論，合理分配至 milestone 結束日前。**
+6. **請僅回傳符合格式的純 JSON 結果，不需額外說明或註解。**
+
+以下為 PDF 內容：
+{all_text}
+"""
+
+
+# 分段模式：每段只抽出該段涵蓋的里程碑，專案層級的欄位由合併時計算
+CHUNK_PROMPT = """
+以下是一份專案文件的第 {index}/{total} 部分。請只根據這一部分的內容，整理出其中的里程碑（Milestone）與任務（Task），
+並依照以下格式輸出 JSON：
+{{
+  "project": {{
+    "name": "...",                      ← 若這部分看得出專案名稱請填寫，否則為 null
+    "summary": "..."                    ← 這部分內容的重點摘要
+  }},
+  "milestones": [
+    {{
+      "name": "...",
+      "summary": "...",
+      "start_time": "...",              ← 根據內容或合理推測填寫（YYYY-MM-DD）
+      "end_time": "...",
+      "estimated_loading": ...,         ← 根據該階段工作項目估算整體工時
+      "tasks": [
+        {{
+          "title": "...",
+          "description": "...",
+          "due_date": "...",            ← 合理分配至 milestone 結束日前（YYYY-MM-DD）
+          "estimated_loading": ...,
+          "is_completed": false
+        }}
+      ]
+    }}
+  ]
+}}
+
+請遵守以下規則：
+1. **所有日期欄位（start_time, end_time, due_date）均需填寫**，不得為 null。
+2. **所有 estimated_loading 請給出合理整數估算**，不得為 null。
+3. 每個 Milestone 至少拆解出 **3 項具體任務（tasks）**。
+4. 若某階段延續自前一部分，請沿用相同的里程碑名稱。
+5. **請僅回傳符合格式的純 JSON 結果，不需額外說明或註解。**
+
+以下為 PDF 內容：
+{all_text}
+"""
+
+
+def build_prompt(pages: list[str]) -> str:
+    return PROJECT_PROMPT.format(all_text="".join(pages))
+
+
+def _split_sections(text: str, max_chars: int) -> list[str]:
+    """Split one oversized page on blank lines, hard-cutting sections that are still too long."""
+    sections, current = [], ""
+    for paragraph in text.split("\n\n"):
+        paragraph += "\n\n"
+        while len(paragraph) > max_chars:
+            sections.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if len(current) + len(paragraph) > max_chars:
+            sections.append(current)
+            current = ""
+        current += paragraph
+    if current:
+        sections.append(current)
+    return [section for section in sections if section]
+
+
+def split_into_chunks(pages: list[str], max_chars: int) -> list[str]:
+    """Pack whole pages into chunks of at most ``max_chars`` characters."""
+    chunks, current = [], []
+    size = 0
+    for page in pages:
+        for part in (_split_sections(page, max_chars) if len(page) > max_chars else [page]):
+            if current and size + len(part) > max_chars:
+                chunks.append("".join(current))
+                current, size = [], 0
+            current.append(part)
+            size += len(part)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _parse_json_object(text: str) -> dict:
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("Model reply contains no JSON object")
+    return json.loads(text[start:end + 1])
+
+
+def merge_chunk_results(results: list[dict]) -> list[dict]:
+    """Reduce per-chunk milestones into the single-project ``projects`` structure."""
+    milestones: dict[str, dict] = {}
+    for result in results:
+        for milestone in result.get("milestones") or []:
+            merged = milestones.get(milestone["name"])
+            if merged is None:
+                milestones[milestone["name"]] = {**milestone, "tasks": list(milestone.get("tasks") or [])}
+                continue
+            # 同一階段跨到下一段：合併期間、工時與任務
+            merged["start_time"] = min(str(merged["start_time"]), str(milestone["start_time"]))
+            merged["end_time"] = max(str(merged["end_time"]), str(milestone["end_time"]))
+            merged["estimated_loading"] = (merged.get("estimated_loading") or 0) + (milestone.get("estimated_loading") or 0)
+            merged["tasks"].extend(milestone.get("tasks") or [])
+    if not milestones:
+        raise ValueError("Model reply has no milestones")
+
+    ordered = sorted(milestones.values(), key=lambda m: str(m["start_time"]))
+    info = [result.get("project") or {} for result in results]
+    end_time = max(str(m["end_time"]) for m in ordered)
+    return [{
+        "name": next((p["name"] for p in info if p.get("name")), ordered[0]["name"]),
+        "summary": next((p["summary"] for p in info if p.get("summary")), None),
+        "start_time": ordered[0]["start_time"],
+        "end_time": end_time,
+        "due_date": end_time,
+        "estimated_loading": sum(m.get("estimated_loading") or 0 for m in ordered),
+        "current_milestone": ordered[0]["name"],
+        "milestones": ordered,
+    }]
+
+
+async def generate_projects(llm, pages: list[str]) -> list[dict]:
+    """Ask the model for the project tree, map-reducing over chunks for long documents."""
+    if sum(len(page) for page in pages) <= config.LLM_CHUNK_CHARS:
+        # 解析得了才寫進回應快取
+        return parse_projects_json(
+            await llm.generate(build_prompt(pages), PROJECT_PROMPT_VERSION, validate=parse_projects_json)
+        )
+
+    chunks = split_into_chunks(pages, config.LLM_CHUNK_CHARS)
+    limit = asyncio.Semaphore(config.LLM_MAX_CONCURRENCY)
+
+    async def extract(index: int, chunk: str) -> dict:
+        async with limit:
+            reply = await llm.generate(
+                CHUNK_PROMPT.format(index=index, total=len(chunks), all_text=chunk), CHUNK_PROMPT_VERSION,
+                validate=_parse_json_object
+            )
+        return _parse_json_object(reply)
+
+    results = await asyncio.gather(*(extract(i, chunk) for i, chunk in enumerate(chunks, 1)))
+    return merge_chunk_results(results)
+
+
+def parse_projects_json(text: str) -> list[dict]:
+    """Pull the ``projects`` list out of a model reply, tolerating ```json fences."""
+    data = _parse_json_object(text)
+    projects = data.get("projects")
+    if not isinstance(projects, list) or not projects:
+        raise ValueError("Model reply has no projects")
+    return projects
+
+
+def _datetime(value) -> datetime:
+    return datetime.fromisoformat(str(value))
+
+
+def _date(value) -> date:
+    return _datetime(value).date()
+
+
+def _loading(value):
+    if value is None:
+        return None
+    # 欄位是 Numeric(3, 1)，超過 99.9 會寫入失敗
+    return min(Decimal(str(value)), Decimal("99.9"))
+
+
+def normalize_projects(projects: list[dict]) -> list[dict]:
+    """Map the model's JSON onto column values for insert_project_tree."""
+    result = []
+    for project in projects:
+        milestones = []
+        for milestone in project.get("milestones") or []:
+            milestones.append({
+                "name": milestone["name"],
+                "summary": milestone.get("summary"),
+                "start_time": _datetime(milestone["start_time"]),
+                "end_time": _datetime(milestone["end_time"]),
+                "estimated_loading": _loading(milestone.get("estimated_loading")),
+                "tasks": [{
+                    "title": task["title"],
+                    "description": task.get("description"),
+                    "due_date": _date(task["due_date"]),
+                    "estimated_loading": _loading(task.get("estimated_loading")),
+                    "is_completed": bool(task.get("is_completed", False)),
+                } for task in milestone.get("tasks") or []],
+            })
+        result.append({
+            "name": project["name"],
+            "summary": project.get("summary"),
+            "start_time": _datetime(project["start_time"]),
+            "end_time": _datetime(project["end_time"]),
+            "due_date": _date(project.get("due_date") or project["end_time"]),
+            "estimated_loading": _loading(project.get("estimated_loading")),
+            "current_milestone": project.get("current_milestone") or (milestones[0]["name"] if milestones else None),
+            "milestones": milestones,
+        })
+    return result
+
+
+async def _finish(session_factory, job_id, **values):
+    async with session_factory() as db:
+        job = await db.get(IngestionJob, job_id)
+        if job is None:
+            return
+        for key, value in values.items():
+            setattr(job, key, value)
+        job.finished_at = datetime.utcnow()
+        await db.commit()
+
+
+async def run_ingestion_job(job_id, session_factory, llm):
+    """Turn the job's uploaded PDF into project rows; progress is kept on the job row."""
+    # 任何失敗（包含讀取工作 / 檔案）都要把工作標成 failed，否則會一直停在 pending / running
+    try:
+        async with session_factory() as db:
+            job = await db.get(IngestionJob, job_id)
+            file = await db.get(FileModel, job.file_id) if job.file_id else None
+            if file is None:
+                raise LookupError("The uploaded file no longer exists")
+            job.status = "running"
+            await db.commit()
+            user_id, sha256 = job.user_id, file.sha256
+
+        pages = await extract_pages(blob_path(sha256), sha256)
+        projects = normalize_projects(await generate_projects(llm, pages))
+
+        # 專案樹與工作狀態同一個 transaction
+        async with session_factory() as db:
+            project_ids = await insert_project_tree(db, user_id, projects)
+            file = await db.get(FileModel, file.id)
+            if file.project_id is None:
+                file.project_id = project_ids[0]
+            job = await db.get(IngestionJob, job_id)
+            job.status = "succeeded"
+            job.project_ids = [str(project_id) for project_id in project_ids]
+            job.finished_at = datetime.utcnow()
+            await db.commit()
+    except Exception as e:
+        logger.exception("Ingestion job %s failed", job_id)
+        await _finish(session_factory, job_id, status="failed", error=str(e))
@@ -0,0 +1,130 @@
+# LLM 呼叫：Gemini（正式）與 FakeModel（本機 / 測試，不連網）
+# get_llm() 回傳的模型外面包一層 CachedModel，相同輸入直接回傳快取的回應
+import asyncio
+import hashlib
+import json
+from anyio import to_thread
+from app.core.config import (
+    GEMINI_KEY, LLM_BACKEND, LLM_MODEL, LLM_CACHE_DIR, LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL
+)
+from app.core.disk_cache import DiskCache
+
+response_cache = DiskCache(LLM_CACHE_DIR, LLM_CACHE_MAX_BYTES, ttl=LLM_CACHE_TTL)
+
+
+class GeminiModel:
+    def __init__(self, model_name: str = LLM_MODEL):
+        import google.generativeai as genai
+
+        genai.configure(api_key=GEMINI_KEY)
+        self.name = model_name
+        self._model = genai.GenerativeModel(model_name=model_name)
+
+    async def generate(self, prompt: str, template_version: str = "", validate=None) -> str:
+        response = await self._model.generate_content_async(prompt)
+        return response.text
+
+
+class FakeModel:
+    """Answers the project prompts with a small fixed tree built from the document text."""
+
+    name = "fake"
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.prompts: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, prompt: str, template_version: str = "", validate=None) -> str:
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        document = prompt.rsplit("以下為 PDF 內容：", 1)[-1]
+        title = next((line.strip() for line in document.splitlines() if line.strip()), "Untitled")
+        milestone = {
+            "name": title[:255],
+            "summary": document.strip()[:200],
+            "start_time": "2025-07-01",
+            "end_time": "2025-07-10",
+            "estimated_loading": 6,
+            "tasks": [
+                {
+                    "title": f"{title} task {i}",
+                    "description": f"Deliverable {i}",
+                    "due_date": f"2025-07-0{i}",
+                    "estimated_loading": 2,
+                    "is_completed": False,
+                }
+                for i in range(1, 4)
+            ],
+        }
+        # 分段 prompt 只回里程碑
+        if '"milestones": [' in prompt and '"projects": [' not in prompt:
+            reply = {"project": {"name": None, "summary": document.strip()[:200]}, "milestones": [milestone]}
+        else:
+            reply = {"projects": [{
+                "name": title[:255],
+                "summary": document.strip()[:200],
+                "start_time": "2025-07-01",
+                "end_time": "2025-07-31",
+                "due_date": "2025-07-31",
+                "estimated_loading": 20,
+                "current_milestone": title[:255],
+                "milestones": [milestone],
+            }]}
+        return "```json\n" + json.dumps(reply, ensure_ascii=False) + "\n```"
+
+
+class CachedModel:
+    """Wraps a model so identical requests are answered from ``cache``.
+
+    The key is the model name, the caller's prompt template version and a
+    hash of the full prompt; bumping the template version invalidates every
+    reply produced by the old template.
+
+    ``validate`` (e.g. the caller's JSON parser) runs before a reply is
+    stored; if it raises, the reply is returned uncached and the error
+    propagates, so a truncated reply is not replayed for the whole TTL.
+    """
+
+    def __init__(self, model, cache: DiskCache):
+        self.model = model
+        self.cache = cache
+        self.name = model.name
+
+    def cache_key(self, prompt: str, template_version: str) -> str:
+        digest = hashlib.sha256()
+        for part in (self.name, template_version, prompt):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    async def generate(self, prompt: str, template_version: str = "", validate=None) -> str:
+        key = self.cache_key(prompt, template_version)
+        cached = await to_thread.run_sync(self.cache.get, key)
+        if cached is not None:
+            return cached.decode()
+
+        reply = await self.model.generate(prompt, template_version)
+        if validate is not None:
+            validate(reply)
+        await to_thread.run_sync(self.cache.set, key, reply.encode())
+        return reply
+
+
+_llm = None
+
+
+def get_llm():
+    global _llm
+    if _llm is None:
+        _llm = FakeModel() if LLM_BACKEND == "fake" else GeminiModel()
+        if LLM_CACHE_MAX_BYTES > 0:
+            _llm = CachedModel(_llm, response_cache)
+    return _llm
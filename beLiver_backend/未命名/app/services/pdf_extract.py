@@ -0,0 +1,98 @@
+# PDF 頁面文字抽取：在 process pool 裡跑，不佔住 event loop 也不受 GIL 限制
+# 這個模組只 import fitz，worker process 啟動時不會載入整個 app
+# 有給 sha256 時先查頁面快取，只解析快取裡沒有的頁
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import fitz  # PyMuPDF
+from anyio import to_thread
+from app.core.config import PDF_EXTRACT_WORKERS, PAGE_CACHE_DIR, PAGE_CACHE_MAX_BYTES
+from app.core.disk_cache import DiskCache
+
+page_cache = DiskCache(PAGE_CACHE_DIR, PAGE_CACHE_MAX_BYTES)
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn：API process 有 DB / anyio 的 thread，fork 不安全
+        _executor = ProcessPoolExecutor(
+            max_workers=PDF_EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def count_pages(path: str) -> int:
+    with fitz.open(path) as doc:
+        return len(doc)
+
+
+def extract_page_range(path: str, start: int, stop: int) -> list[str]:
+    with fitz.open(path) as doc:
+        return [doc.load_page(i).get_text() for i in range(start, stop)]
+
+
+def _missing_ranges(missing: list[int], parts: int) -> list[tuple[int, int]]:
+    """Group missing page numbers into contiguous ranges of at most len/parts pages."""
+    size = -(-len(missing) // parts)
+    ranges = []
+    for page in missing:
+        if ranges and ranges[-1][1] == page and ranges[-1][1] - ranges[-1][0] < size:
+            ranges[-1] = (ranges[-1][0], page + 1)
+        else:
+            ranges.append((page, page + 1))
+    return ranges
+
+
+def _cached_pages(sha256: str) -> list[str | None] | None:
+    count = page_cache.get(f"{sha256}-pages")
+    if count is None:
+        return None
+    return [
+        text.decode() if (text := page_cache.get(f"{sha256}-{i}")) is not None else None
+        for i in range(int(count))
+    ]
+
+
+def _store_pages(sha256: str, pages: dict[int, str], page_count: int):
+    for i, text in pages.items():
+        page_cache.set(f"{sha256}-{i}", text.encode())
+    page_cache.set(f"{sha256}-pages", str(page_count).encode())
+
+
+async def extract_pages(path: str, sha256: str | None = None) -> list[str]:
+    """Return the text of every page, extracted in parallel worker processes.
+
+    ``sha256`` is the file's content hash; when given, pages already in the
+    page cache are not parsed again.
+    """
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+
+    cached = await to_thread.run_sync(_cached_pages, sha256) if sha256 else None
+    if cached is None:
+        cached = [None] * await loop.run_in_executor(executor, count_pages, path)
+    missing = [i for i, text in enumerate(cached) if text is None]
+    if not missing:
+        return cached
+
+    ranges = _missing_ranges(missing, min(PDF_EXTRACT_WORKERS, len(missing)))
+    chunks = await asyncio.gather(*(
+        loop.run_in_executor(executor, extract_page_range, path, start, stop) for start, stop in ranges
+    ))
+    extracted = {
+        page: text for (start, _), chunk in zip(ranges, chunks) for page, text in enumerate(chunk, start)
+    }
+    if sha256:
+        await to_thread.run_sync(_store_pages, sha256, extracted, len(cached))
+
+    return [extracted.get(i, text) for i, text in enumerate(cached)]
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
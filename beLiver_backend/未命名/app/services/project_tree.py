@@ -0,0 +1,51 @@
+# 巢狀專案樹（專案 → 里程碑 → 任務，加上檔案、對話）攤平成每張表的列
+#   crud_project.insert_project_tree（PDF 匯入）與 database/bulk_writer（假資料 COPY）共用：id、外鍵、預設值只在這裡決定
+#   純函式，不碰資料庫
+
+# 依外鍵順序
+TREE_TABLES = ("projects", "milestones", "tasks", "files", "chat_histories")
+
+# 巢狀的子表，不是欄位
+_CHILDREN = {"milestones", "files", "chat_histories", "tasks"}
+
+
+def _columns(row):
+    return {key: value for key, value in row.items() if key not in _CHILDREN}
+
+
+def flatten_project_tree(user_id, projects, new_id):
+    """Turn nested projects (``milestones`` → ``tasks``, ``files``, ``chat_histories``) into per-table rows.
+
+    ``new_id(table)`` returns the primary key for a new row (a UUID, or a
+    reserved SERIAL value from ``database/bulk_writer.reserve_serial_ids``).
+    """
+    tables = {table: [] for table in TREE_TABLES}
+    for project in projects:
+        project_id = project.get("id") or new_id("projects")
+        milestones = project.get("milestones", [])
+        tables["projects"].append({
+            **_columns(project),
+            "id": project_id,
+            "user_id": user_id,
+            "current_milestone": project.get("current_milestone") or (milestones[0]["name"] if milestones else None),
+        })
+        for milestone in milestones:
+            milestone_id = milestone.get("id") or new_id("milestones")
+            tables["milestones"].append({**_columns(milestone), "id": milestone_id, "project_id": project_id})
+            for task in milestone.get("tasks", []):
+                tables["tasks"].append({
+                    "is_completed": False,
+                    **task,
+                    "id": task.get("id") or new_id("tasks"),
+                    "milestone_id": milestone_id,
+                })
+        for file in project.get("files", []):
+            tables["files"].append({**file, "id": file.get("id") or new_id("files"), "project_id": project_id})
+        for message in project.get("chat_histories", []):
+            tables["chat_histories"].append({
+                **message,
+                "id": message.get("id") or new_id("chat_histories"),
+                "user_id": user_id,
+                "project_id": project_id,
+            })
+    return tables
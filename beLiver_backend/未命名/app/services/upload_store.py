@@ -0,0 +1,170 @@
+# 上傳檔案存放：以 SHA-256 為 key 的 content-addressed blob store
+#   <UPLOAD_DIR>/blobs/ab/abcdef...  同樣內容只存一份
+#   <UPLOAD_DIR>/tmp/                串流寫入中的暫存檔
+# 引用數由 files.sha256 計算，沒有任何 File 引用的 blob 由背景 sweep 清掉
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from anyio import to_thread
+from fastapi import UploadFile
+from sqlalchemy import select
+from app.core import config
+from app.core.config import UPLOAD_CHUNK_SIZE
+from app.models import File as FileModel
+
+logger = logging.getLogger(__name__)
+
+
+class UploadTooLarge(Exception):
+    """Raised mid-stream once an upload goes past its byte budget."""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Upload exceeds {limit} bytes")
+        self.limit = limit
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def stream_upload_to_disk(upload: UploadFile, dest_path: str, max_bytes: int) -> tuple[int, str]:
+    """Copy ``upload`` to ``dest_path`` chunk by chunk.
+
+    Returns ``(size, sha256 hex digest)``. Blocking file I/O runs in a worker
+    thread so the event loop keeps serving other requests. Nothing is left at
+    ``dest_path`` if the upload is too large or the copy fails.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    part_path = f"{dest_path}.part"
+    out = await to_thread.run_sync(open, part_path, "wb")
+    try:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            digest.update(chunk)
+            await to_thread.run_sync(out.write, chunk)
+        await to_thread.run_sync(out.close)
+        await to_thread.run_sync(os.replace, part_path, dest_path)
+    except BaseException:
+        out.close()
+        _remove_quietly(part_path)
+        raise
+
+    return size, digest.hexdigest()
+
+
+def blob_path(sha256: str, upload_dir: str | None = None) -> str:
+    return os.path.join(upload_dir or config.UPLOAD_DIR, "blobs", sha256[:2], sha256)
+
+
+def blob_url(sha256: str, upload_dir: str | None = None) -> str:
+    return f"/{upload_dir or config.UPLOAD_DIR}/blobs/{sha256[:2]}/{sha256}"
+
+
+def _commit_blob(tmp_path: str, dest_path: str) -> bool:
+    """Move a finished upload into the store; returns False if it was a duplicate."""
+    try:
+        # 先更新 mtime 再丟掉暫存檔，避免 sweep 在 File row commit 前把它當孤兒刪掉；
+        # sweep 剛好把它移走時 utime 會失敗，改用這份暫存檔補回去
+        os.utime(dest_path)
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        os.replace(tmp_path, dest_path)
+        return True
+    os.remove(tmp_path)
+    return False
+
+
+async def store_upload(upload: UploadFile, max_bytes: int, upload_dir: str | None = None) -> dict:
+    """Stream ``upload`` into the blob store and return its sha256, size and url."""
+    upload_dir = upload_dir or config.UPLOAD_DIR
+    tmp_dir = os.path.join(upload_dir, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+
+    size, sha256 = await stream_upload_to_disk(upload, tmp_path, max_bytes)
+    created = await to_thread.run_sync(_commit_blob, tmp_path, blob_path(sha256, upload_dir))
+    return {
+        "sha256": sha256,
+        "size": size,
+        "url": blob_url(sha256, upload_dir),
+        "deduplicated": not created,
+    }
+
+
+def _list_stale_files(root: str, older_than: float) -> list[str]:
+    stale = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                if os.path.getmtime(path) < older_than:
+                    stale.append(path)
+            except FileNotFoundError:
+                pass
+    return stale
+
+
+def _remove_if_stale(path: str, older_than: float) -> bool:
+    """Delete ``path`` unless it was touched after ``older_than``; safe against concurrent _commit_blob."""
+    # 先改名再檢查 mtime：改名之後重複上傳的 utime 會失敗並自己放回一份，
+    # 改名之前的 utime 則會讓這裡看到新的 mtime 而把檔案放回去（同樣的內容，覆蓋也沒關係）
+    doomed = f"{path}.{uuid.uuid4().hex}.sweep"
+    try:
+        os.rename(path, doomed)
+    except FileNotFoundError:
+        return False
+    if os.path.getmtime(doomed) < older_than:
+        os.remove(doomed)
+        return True
+    os.replace(doomed, path)
+    return False
+
+
+async def sweep_orphan_blobs(session_factory, grace_seconds: float, upload_dir: str | None = None) -> int:
+    """Delete blobs no File row references and leftover temp files.
+
+    Only files older than ``grace_seconds`` are considered, so uploads whose
+    File row is not committed yet are never touched. Returns how many blobs
+    were removed.
+    """
+    upload_dir = upload_dir or config.UPLOAD_DIR
+    older_than = time.time() - grace_seconds
+
+    for path in await to_thread.run_sync(_list_stale_files, os.path.join(upload_dir, "tmp"), older_than):
+        _remove_quietly(path)
+
+    candidates = await to_thread.run_sync(_list_stale_files, os.path.join(upload_dir, "blobs"), older_than)
+    removed = 0
+    for start in range(0, len(candidates), 500):
+        batch = {os.path.basename(path): path for path in candidates[start:start + 500]}
+        async with session_factory() as db:
+            referenced = set((await db.execute(
+                select(FileModel.sha256).filter(FileModel.sha256.in_(batch)).distinct()
+            )).scalars())
+        # 清單是查 DB 之前列的，期間可能有重複上傳 touch 了 blob，刪之前再確認一次
+        orphans = [path for sha256, path in batch.items() if sha256 not in referenced]
+        removed += sum(await to_thread.run_sync(
+            lambda: [_remove_if_stale(path, older_than) for path in orphans]
+        ))
+    return removed
+
+
+async def run_blob_sweeper(session_factory, interval_seconds: float, grace_seconds: float):
+    """Background loop started from the app lifespan."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            removed = await sweep_orphan_blobs(session_factory, grace_seconds)
+            if removed:
+                logger.info("Removed %d orphaned upload blobs", removed)
+        except Exception:
+            logger.exception("Upload blob sweep failed")
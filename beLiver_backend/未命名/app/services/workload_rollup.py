@@ -0,0 +1,253 @@
+# 每位使用者每天的任務負荷彙總（daily_workloads）：畫負荷熱圖 / 行事曆時不必掃描使用者全部任務
+#   ORM 寫入（新增 / 刪除任務、改日期或負荷、勾選完成）：Session 的 after_flush 事件算出差額，
+#     同一個 transaction 內一次 upsert，不必在每個 route 各自處理
+#   Core 整批寫入（insert_project_tree、刪除專案、PATCH /tasks）不會觸發 ORM 事件，
+#     需自己呼叫 task_rows_upsert / remove_project_statement / tasks_statement
+#   COPY 匯入假資料後用 rebuild 重建；check 比對彙總與實際任務
+#
+#   PYTHONPATH=. python -m app.services.workload_rollup check
+#   PYTHONPATH=. python -m app.services.workload_rollup rebuild [--email user1@example.com]
+import argparse
+import sys
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import Date, Integer, Numeric, bindparam, case, delete, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.base import NO_VALUE
+
+from app.core.db import engine
+from app.models import DailyWorkload, Milestone, Project, Task, User
+
+_COLUMNS = ["user_id", "day", "total_loading", "completed_loading", "task_count"]
+_ZERO = Decimal(0)
+_ONE_DECIMAL = Decimal("0.1")  # estimated_loading 是 Numeric(3, 1)
+# INSERT ... SELECT 用 Core 的 Table；ORM entity 在 session.execute 會走 bulk insert 流程
+_TABLE = DailyWorkload.__table__
+
+
+def _insert(dialect: str):
+    return (postgresql if dialect == "postgresql" else sqlite).insert(_TABLE)
+
+
+def _add_on_conflict(stmt):
+    # 已有這一天就加上差額
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id", "day"],
+        set_={
+            "total_loading": _TABLE.c.total_loading + stmt.excluded.total_loading,
+            "completed_loading": _TABLE.c.completed_loading + stmt.excluded.completed_loading,
+            "task_count": _TABLE.c.task_count + stmt.excluded.task_count,
+        },
+    )
+
+
+def _aggregate(sign: int = 1):
+    """(user_id, day, total, completed, count) of tasks grouped by owner and due date."""
+    loading = func.coalesce(Task.estimated_loading, 0)
+    return (
+        select(
+            Project.user_id,
+            Task.due_date,
+            sign * func.coalesce(func.sum(loading), 0),
+            sign * func.coalesce(func.sum(case((Task.is_completed == True, loading), else_=0)), 0),
+            sign * func.count(),
+        )
+        .join(Milestone, Task.milestone_id == Milestone.id)
+        .join(Project, Milestone.project_id == Project.id)
+        .filter(Task.due_date.isnot(None), Project.user_id.isnot(None))
+        .group_by(Project.user_id, Task.due_date)
+    )
+
+
+def delta_upsert_statement(dialect: str):
+    """Executemany upsert; each parameter set is one (milestone_id, day) delta from :func:`delta_params`."""
+    # 任務只知道里程碑，使用者由 INSERT ... SELECT 在 DB 端找出來
+    source = (
+        select(
+            Project.user_id,
+            bindparam("day", type_=Date),
+            bindparam("total", type_=Numeric(10, 1)),
+            bindparam("completed", type_=Numeric(10, 1)),
+            bindparam("count", type_=Integer),
+        )
+        .select_from(Milestone)
+        .join(Project, Milestone.project_id == Project.id)
+        .filter(Milestone.id == bindparam("milestone_id", type_=Milestone.id.type), Project.user_id.isnot(None))
+    )
+    return _add_on_conflict(_insert(dialect).from_select(_COLUMNS, source))
+
+
+def task_state(milestone_id, due_date, estimated_loading, is_completed):
+    """What one task contributes to the rollup, or None if it counts nowhere."""
+    if milestone_id is None or due_date is None:
+        return None
+    loading = Decimal(estimated_loading or 0)
+    return milestone_id, due_date, loading, bool(is_completed)
+
+
+def delta_params(changes) -> list[dict]:
+    """Net per-(milestone, day) deltas for ``changes``: pairs of (before, after) :func:`task_state` values."""
+    deltas = defaultdict(lambda: [_ZERO, _ZERO, 0])
+    for before, after in changes:
+        if before == after:
+            continue
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            milestone_id, day, loading, completed = state
+            delta = deltas[(milestone_id, day)]
+            delta[0] += sign * loading
+            delta[1] += sign * loading if completed else _ZERO
+            delta[2] += sign
+    return [
+        {"milestone_id": milestone_id, "day": day, "total": total, "completed": completed, "count": count}
+        for (milestone_id, day), (total, completed, count) in deltas.items()
+        if total or completed or count
+    ]
+
+
+def task_rows_upsert(dialect: str, rows) -> tuple:
+    """(statement, params) adding Core-inserted task dicts to the rollup; params is empty if nothing to do."""
+    params = delta_params(
+        (None, task_state(row.get("milestone_id"), row.get("due_date"), row.get("estimated_loading"),
+                          row.get("is_completed")))
+        for row in rows
+    )
+    return delta_upsert_statement(dialect), params
+
+
+def tasks_statement(dialect: str, condition, sign: int):
+    """Add (sign=1) or subtract (sign=-1) the tasks matching ``condition`` as they are in the DB right now.
+
+    For Core UPDATE / DELETE: subtract before the statement and add the same tasks back afterwards.
+    """
+    source = _aggregate(sign).filter(condition)
+    return _add_on_conflict(_insert(dialect).from_select(_COLUMNS, source))
+
+
+def remove_project_statement(dialect: str, project_id: uuid.UUID):
+    """Subtract every task of ``project_id``; run before its tasks are deleted."""
+    return tasks_statement(dialect, Project.id == project_id, sign=-1)
+
+
+_TRACKED = ("milestone_id", "due_date", "estimated_loading", "is_completed")
+
+
+def _keep_old_value(task, value, oldvalue, initiator):
+    pass
+
+
+# active_history：commit 後過期的欄位被改時先載入舊值，history 才知道要從哪一天扣掉
+for _name in _TRACKED:
+    event.listen(getattr(Task, _name), "set", _keep_old_value, active_history=True)
+
+
+def _before_state(task):
+    attrs = inspect(task).attrs
+    values = []
+    for name in _TRACKED:
+        history = attrs[name].history
+        if history.deleted:
+            values.append(history.deleted[0])
+        else:
+            # 沒改過的欄位用已載入的值，避免對已刪除的物件再發查詢
+            loaded = attrs[name].loaded_value
+            values.append(getattr(task, name) if loaded is NO_VALUE else loaded)
+    return task_state(*values)
+
+
+def _after_state(task):
+    return task_state(*(getattr(task, name) for name in _TRACKED))
+
+
+@event.listens_for(Session, "before_flush")
+def _load_deleted_tasks(session, flush_context, instances):
+    # 已過期的任務被刪除時，趁資料列還在先載入原本的值
+    for task in session.deleted:
+        if isinstance(task, Task):
+            _before_state(task)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_task_changes(session, flush_context):
+    changes = []
+    for task in session.new:
+        if isinstance(task, Task):
+            changes.append((None, _after_state(task)))
+    for task in session.dirty:
+        if isinstance(task, Task):
+            changes.append((_before_state(task), _after_state(task)))
+    for task in session.deleted:
+        if isinstance(task, Task):
+            changes.append((_before_state(task), None))
+    params = delta_params(changes)
+    if params:
+        connection = session.connection()
+        connection.execute(delta_upsert_statement(connection.dialect.name), params)
+
+
+def rebuild(connection, user_ids=None):
+    """Recompute the rollup from tasks (all users, or only ``user_ids``)."""
+    clear = delete(DailyWorkload)
+    source = _aggregate()
+    if user_ids is not None:
+        clear = clear.filter(DailyWorkload.user_id.in_(user_ids))
+        source = source.filter(Project.user_id.in_(user_ids))
+    connection.execute(clear)
+    connection.execute(_TABLE.insert().from_select(_COLUMNS, source))
+
+
+def check(connection, user_ids=None) -> list[dict]:
+    """Days where the rollup disagrees with the tasks; empty when consistent."""
+    source = _aggregate()
+    stored = select(DailyWorkload.user_id, DailyWorkload.day, DailyWorkload.total_loading,
+                    DailyWorkload.completed_loading, DailyWorkload.task_count)
+    if user_ids is not None:
+        source = source.filter(Project.user_id.in_(user_ids))
+        stored = stored.filter(DailyWorkload.user_id.in_(user_ids))
+
+    def by_day(rows):
+        # 加減後歸零的列等同不存在
+        # SQLite 的 Numeric 是浮點數，比對前取到小數一位
+        return {
+            (user_id, day): (Decimal(total).quantize(_ONE_DECIMAL), Decimal(completed).quantize(_ONE_DECIMAL), count)
+            for user_id, day, total, completed, count in rows
+            if total or completed or count
+        }
+
+    expected = by_day(connection.execute(source))
+    actual = by_day(connection.execute(stored))
+    return [
+        {"user_id": user_id, "day": day, "expected": expected.get((user_id, day)), "actual": actual.get((user_id, day))}
+        for user_id, day in sorted(expected.keys() | actual.keys(), key=lambda key: (str(key[0]), key[1]))
+        if expected.get((user_id, day)) != actual.get((user_id, day))
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild or verify the daily_workloads rollup")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--email", action="append", help="only this user (repeatable)")
+    args = parser.parse_args(argv)
+
+    with engine.begin() as connection:
+        user_ids = None
+        if args.email:
+            user_ids = connection.execute(select(User.id).filter(User.email.in_(args.email))).scalars().all()
+        if args.command == "rebuild":
+            rebuild(connection, user_ids)
+            print("daily_workloads rebuilt")
+            return 0
+        mismatches = check(connection, user_ids)
+
+    for row in mismatches:
+        print(f"{row['user_id']} {row['day']}: expected {row['expected']} actual {row['actual']}")
+    print(f"{len(mismatches)} mismatched day(s)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,28 @@
+import asyncio
 import os
+from datetime import date, datetime
+
 import pytest
+
+# 測試用低 cost 的 bcrypt，需在 import app 之前設定
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("BLOB_GC_INTERVAL", "0")  # 測試裡直接呼叫 sweep，不跑背景 task
+os.environ.setdefault("QUERY_BUDGET_MODE", "raise")  # 超過 @query_budget 的 request 直接讓測試失敗
+
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app import models  # 👈 這裡要 import 整個 models module
-from app.core.db import Base, get_db
+from app.core.db import Base, get_db, get_async_db, get_async_session_factory
 from app.main import app
+from app.models import Milestone, Project, Task, User
+from app.services.llm import FakeModel, get_llm
 
 SQLALCHEMY_TEST_DB_URL = "sqlite:///./test.db"
+SQLALCHEMY_TEST_ASYNC_DB_URL = "sqlite+aiosqlite:///./test.db"
 
 # 確保乾淨環境
 if os.path.exists("test.db"):
@@ -16,6 +30,8 @@ if os.path.exists("test.db"):
 
 engine = create_engine(SQLALCHEMY_TEST_DB_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine(SQLALCHEMY_TEST_ASYNC_DB_URL)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # 建立資料表（前提是 models 有正確匯入）
 Base.metadata.create_all(bind=engine)
@@ -27,12 +43,107 @@ def override_get_db():
     finally:
         db.close()
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_async_session_factory] = lambda: TestingAsyncSessionLocal
+
+# 不呼叫 Gemini，用本機 fake model
+fake_llm = FakeModel()
+app.dependency_overrides[get_llm] = lambda: fake_llm
 
 @pytest.fixture(scope="module")
 def client():
     with TestClient(app) as c:
         yield c
 
+@pytest.fixture(scope="session", autouse=True)
+def cleanup_test_db():
+    # 所有測試模組共用同一個 test.db，全部跑完才刪
+    yield
+    engine.dispose()
     if os.path.exists("test.db"):
         os.remove("test.db")
+
+@pytest.fixture
+def db_session():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def query_counter():
+    """Collects every SQL statement the API sends while the test runs."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def async_session_factory():
+    """Session factory for calling async services directly (own event loop, so no pooling)."""
+    sweep_engine = create_async_engine(SQLALCHEMY_TEST_ASYNC_DB_URL, poolclass=NullPool)
+    yield async_sessionmaker(sweep_engine, expire_on_commit=False)
+    asyncio.run(sweep_engine.dispose())
+
+@pytest.fixture
+def llm():
+    fake_llm.prompts.clear()
+    return fake_llm
+
+
+@pytest.fixture
+def register(client):
+    """``register(email)`` -> auth headers for that user; logs in instead if the email is already registered."""
+    def register(email, name="Tester"):
+        response = client.post("/auth/register", json={"name": name, "email": email, "password": "securepass"})
+        if response.status_code == 409:
+            response = client.post("/auth/login", json={"email": email, "password": "securepass"})
+        assert response.status_code == 200
+        return {"Authorization": f"Bearer {response.json()['token']}"}
+    return register
+
+
+@pytest.fixture
+def add_project(db_session):
+    """``add_project(email, tasks, milestones=None, **fields)`` -> a committed project owned by ``email``.
+
+    ``tasks`` is a list of (title, due_date, estimated_loading[, is_completed]) put under one milestone
+    "M1"; pass ``milestones`` as [(name, end_time, tasks), ...] instead for more. ``fields`` override
+    the project's columns.
+    """
+    def add_project(email, tasks=(), milestones=None, **fields):
+        user = db_session.query(User).filter(User.email == email).first()
+        project = Project(**{
+            "name": "Project",
+            "summary": "summary",
+            "start_time": datetime(2025, 6, 1),
+            "end_time": datetime(2025, 6, 30),
+            "due_date": date(2025, 6, 30),
+            "user_id": user.id,
+            **fields,
+        })
+        db_session.add(project)
+        db_session.flush()
+        for name, end_time, milestone_tasks in milestones or [("M1", datetime(2025, 6, 30), tasks)]:
+            milestone = Milestone(name=name, summary="summary", start_time=datetime(2025, 6, 1), end_time=end_time,
+                                  project_id=project.id)
+            db_session.add(milestone)
+            db_session.flush()
+            for title, due_date, loading, *completed in milestone_tasks:
+                db_session.add(Task(title=title, description=f"{title} description", due_date=due_date,
+                                    estimated_loading=loading, milestone_id=milestone.id,
+                                    is_completed=bool(completed and completed[0])))
+        db_session.commit()
+        return project
+    return add_project
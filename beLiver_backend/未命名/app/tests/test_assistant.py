@@ -0,0 +1,65 @@
+from datetime import date, datetime, timedelta
+
+from app.models import ChatHistory, Project, User
+
+
+def test_history_keyset_pagination(client, db_session):
+    response = client.post("/auth/register", json={
+        "name": "Chatty",
+        "email": "chatty@example.com",
+        "password": "securepass"
+    })
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+    user = db_session.query(User).filter(User.email == "chatty@example.com").first()
+    project = Project(name="Chat", start_time=datetime(2025, 6, 1), due_date=date(2025, 6, 30), user_id=user.id)
+    db_session.add(project)
+    db_session.flush()
+    started = datetime(2025, 6, 1, 9)
+    for i in range(25):
+        # 每兩則訊息同一個時間點，確認 id 能當 tie-breaker
+        db_session.add(ChatHistory(
+            user_id=user.id,
+            project_id=project.id,
+            message=f"message {i}",
+            sender="user",
+            timestamp=started + timedelta(minutes=i // 2)
+        ))
+    db_session.commit()
+
+    pages = []
+    cursor = None
+    while True:
+        params = {"projectId": str(project.id), "limit": 10}
+        if cursor:
+            params["before"] = cursor
+        body = client.get("/assistant/history", params=params, headers=headers).json()
+        pages.append(body["messages"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    # 第一頁是最新的訊息，每頁內依時間先後排列
+    assert pages[0][-1]["text"] == "message 24"
+    texts = [m["text"] for page in reversed(pages) for m in page]
+    assert sorted(texts) == sorted(f"message {i}" for i in range(25))
+    assert len(set(texts)) == 25
+    timestamps = [m["timestamp"] for page in reversed(pages) for m in page]
+    assert timestamps == sorted(timestamps)
+
+
+def test_history_rejects_bad_cursor(client):
+    response = client.post("/auth/login", json={
+        "email": "chatty@example.com",
+        "password": "securepass"
+    })
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+    project_id = client.get("/projects", headers=headers).json()[0]["project_id"]
+
+    response = client.get(
+        "/assistant/history",
+        params={"projectId": project_id, "before": "not-a-cursor"},
+        headers=headers
+    )
+    assert response.status_code == 400
@@ -37,3 +37,53 @@ def test_login_fail(client):
         "password": "wrongpass"
     })
     assert response.status_code == 401
+
+@pytest.mark.order(5)
+def test_login_rehashes_when_cost_changes(client, db_session, monkeypatch):
+    from app import utils
+    from app.models import User
+
+    monkeypatch.setattr(utils, "BCRYPT_ROUNDS", 5)
+    response = client.post("/auth/login", json={
+        "email": "test@example.com",
+        "password": "securepass"
+    })
+    assert response.status_code == 200
+
+    user = db_session.query(User).filter(User.email == "test@example.com").first()
+    assert user.hashed_password.startswith("$2b$05$")
+
+@pytest.mark.order(6)
+def test_login_busy_returns_503(client, monkeypatch):
+    import threading
+    from app import utils
+
+    monkeypatch.setattr(utils, "_password_slots", threading.BoundedSemaphore(1))
+    utils._password_slots.acquire()
+    response = client.post("/auth/login", json={
+        "email": "test@example.com",
+        "password": "securepass"
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+@pytest.mark.order(7)
+def test_login_skips_rehash_when_busy(client, db_session, monkeypatch):
+    from app import utils
+    from app.api.routes import auth
+    from app.models import User
+
+    async def busy(password):
+        raise utils.PasswordHasherBusy()
+
+    # 密碼驗證成功後才滿載：仍然登入成功，舊雜湊留到下次登入再換
+    monkeypatch.setattr(utils, "BCRYPT_ROUNDS", 6)
+    monkeypatch.setattr(auth, "hash_password_async", busy)
+    response = client.post("/auth/login", json={
+        "email": "test@example.com",
+        "password": "securepass"
+    })
+    assert response.status_code == 200
+
+    user = db_session.query(User).filter(User.email == "test@example.com").first()
+    assert not user.hashed_password.startswith("$2b$06$")
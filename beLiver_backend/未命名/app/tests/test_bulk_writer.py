@@ -0,0 +1,61 @@
+import itertools
+
+from database.bulk_writer import count_tree, flatten_project_tree, write_rows
+
+
+class RecordingCursor:
+    """Stands in for a psycopg2 cursor and keeps what COPY would have received."""
+
+    def __init__(self):
+        self.copies = []
+
+    def copy_expert(self, statement, file):
+        body = "".join(iter(lambda: file.read(7), ""))  # 小 buffer，確認分段讀取正確
+        self.copies.append((statement, body))
+
+
+TREE = [{
+    "name": "Launch",
+    "start_time": "2025-07-01 00:00:00",
+    "milestones": [
+        {"name": "Design", "start_time": "2025-07-01", "tasks": [
+            {"title": "Wireframes", "description": "tab\there\nnew line \\ slash"},
+            {"title": "Review", "description": None, "is_completed": True},
+        ]},
+        {"name": "Build", "start_time": "2025-07-10", "tasks": []},
+    ],
+    "chat_histories": [{"sender": "user", "message": "hi"}],
+}]
+
+
+def test_flatten_assigns_keys_and_links_children():
+    counter = itertools.count(1)
+    tables = flatten_project_tree("u1", TREE, lambda table: f"{table}-{next(counter)}")
+
+    assert count_tree(TREE) == {"projects": 1, "milestones": 2, "tasks": 2, "files": 0, "chat_histories": 1}
+    project = tables["projects"][0]
+    assert project["user_id"] == "u1" and project["current_milestone"] == "Design"
+    # 巢狀的子表不會留在列裡（crud_project 直接拿去 INSERT）
+    assert "milestones" not in project and "chat_histories" not in project
+    assert all("tasks" not in m for m in tables["milestones"])
+    assert {m["project_id"] for m in tables["milestones"]} == {project["id"]}
+    assert [t["milestone_id"] for t in tables["tasks"]] == [tables["milestones"][0]["id"]] * 2
+    assert tables["tasks"][0]["is_completed"] is False
+    assert tables["chat_histories"][0]["project_id"] == project["id"]
+
+
+def test_copy_writes_each_table_once_in_text_format():
+    tables = flatten_project_tree("u1", TREE, lambda table: table)
+    cur = RecordingCursor()
+    write_rows(cur, tables)
+
+    statements = [statement for statement, _ in cur.copies]
+    assert [s.split()[1] for s in statements] == ["projects", "milestones", "tasks", "chat_histories"]
+    assert statements[2] == "COPY tasks (id, title, description, milestone_id, is_completed) FROM STDIN"
+
+    tasks_body = cur.copies[2][1]
+    assert tasks_body.splitlines() == [
+        "tasks\tWireframes\ttab\\there\\nnew line \\\\ slash\tmilestones\tFalse",
+        "tasks\tReview\t\\N\tmilestones\tTrue",
+    ]
+
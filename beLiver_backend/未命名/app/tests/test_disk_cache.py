@@ -0,0 +1,49 @@
+import os
+import time
+
+from app.core.disk_cache import DiskCache
+
+
+def test_round_trip_is_compressed(tmp_path):
+    cache = DiskCache(str(tmp_path), 1024 * 1024)
+    text = ("milestone " * 1000).encode()
+    cache.set("ab" + "0" * 62, text)
+
+    assert cache.get("ab" + "0" * 62) == text
+    assert cache.get("missing") is None
+    assert os.path.getsize(tmp_path / "ab" / ("ab" + "0" * 62)) < len(text) // 10
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_evicts_least_recently_used_over_budget(tmp_path):
+    value = os.urandom(400)  # 亂數幾乎壓不小
+    cache = DiskCache(str(tmp_path), 1000)
+    cache.set("k1", value)
+    cache.set("k2", value)
+    cache.get("k1")
+    cache.set("k3", value)
+
+    assert cache.get("k2") is None
+    assert cache.get("k1") == value
+    assert cache.get("k3") == value
+    assert cache.stats()["evictions"] == 1
+    assert not (tmp_path / "k2" / "k2").exists()
+
+
+def test_entries_survive_restart(tmp_path):
+    DiskCache(str(tmp_path), 1024).set("k1", b"page text")
+
+    reopened = DiskCache(str(tmp_path), 1024)
+    assert reopened.get("k1") == b"page text"
+    assert reopened.stats()["entries"] == 1
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = DiskCache(str(tmp_path), 1024, ttl=0.05)
+    cache.set("k1", b"reply")
+    assert cache.get("k1") == b"reply"
+
+    time.sleep(0.1)
+    assert cache.get("k1") is None
+    assert cache.stats()["entries"] == 0
+    assert not (tmp_path / "k1" / "k1").exists()
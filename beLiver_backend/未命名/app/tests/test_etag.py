@@ -0,0 +1,124 @@
+import uuid
+from datetime import date
+
+from starlette.requests import Request
+
+from app.core.etag import etag_matches, make_etag
+
+
+def add_cached_project(add_project, email):
+    project = add_project(email, [("Spec", date(2025, 6, 5), 1)], name="Cached")
+    milestone = project.milestones[0]
+    return project, milestone, milestone.tasks[0]
+
+
+def test_unchanged_resources_return_304(client, register, add_project, query_counter):
+    headers = register("etag@example.com")
+    project, milestone, _ = add_cached_project(add_project, "etag@example.com")
+
+    for url, params in (
+        ("/projects", {}),
+        ("/project_detail", {"project_id": str(project.id)}),
+        ("/milestone_detail", {"project_id": str(project.id), "milestone_id": str(milestone.id)}),
+        ("/assistant/history", {"projectId": str(project.id)}),
+    ):
+        first = client.get(url, headers=headers, params=params)
+        assert first.status_code == 200, url
+        assert first.headers["cache-control"] == "private, no-cache"
+        query_counter.clear()
+        again = client.get(url, headers={**headers, "If-None-Match": first.headers["etag"]}, params=params)
+        assert again.status_code == 304, url
+        assert again.headers["etag"] == first.headers["etag"]
+        assert again.content == b""
+        # 只查版本號（使用者已快取）
+        assert len(query_counter) == 1, url
+
+
+def test_writes_change_the_etag(client, register, add_project):
+    headers = register("etag-writes@example.com")
+    project, milestone, task = add_cached_project(add_project, "etag-writes@example.com")
+    detail = {"project_id": str(project.id)}
+    milestone_detail = {"project_id": str(project.id), "milestone_id": str(milestone.id)}
+    history = {"projectId": str(project.id)}
+
+    projects_tag = client.get("/projects", headers=headers).headers["etag"]
+    detail_tag = client.get("/project_detail", headers=headers, params=detail).headers["etag"]
+    milestone_tag = client.get("/milestone_detail", headers=headers, params=milestone_detail).headers["etag"]
+    history_tag = client.get("/assistant/history", headers=headers, params=history).headers["etag"]
+
+    # 勾選任務：/projects 與專案底下的 GET 都要重新取得
+    assert client.patch(f"/tasks/{task.id}", json={"isCompleted": True}, headers=headers).status_code == 200
+    for url, params, tag in (("/projects", {}, projects_tag), ("/project_detail", detail, detail_tag),
+                             ("/milestone_detail", milestone_detail, milestone_tag)):
+        response = client.get(url, headers={**headers, "If-None-Match": tag}, params=params)
+        assert response.status_code == 200, url
+        assert response.headers["etag"] != tag
+
+    # 對話只影響該專案，不影響 /projects
+    projects_tag = client.get("/projects", headers=headers).headers["etag"]
+    response = client.post("/assistant/message", json={
+        "user_id": str(project.user_id), "project_id": str(project.id), "message": "hi",
+    }, headers=headers)
+    assert response.status_code == 200
+    response = client.get("/assistant/history", headers={**headers, "If-None-Match": history_tag}, params=history)
+    assert response.status_code == 200
+    assert [message["text"] for message in response.json()["messages"]][0] == "hi"
+    assert client.get("/projects", headers={**headers, "If-None-Match": projects_tag}).status_code == 304
+
+
+def test_history_pages_have_their_own_etag(client, register, add_project):
+    headers = register("etag-history@example.com")
+    project, _, _ = add_cached_project(add_project, "etag-history@example.com")
+    for text in ("one", "two"):
+        response = client.post("/assistant/message", json={
+            "user_id": str(project.user_id), "project_id": str(project.id), "message": text,
+        }, headers=headers)
+        assert response.status_code == 200
+
+    first = client.get("/assistant/history", headers=headers, params={"projectId": str(project.id), "limit": 1})
+    tag, cursor = first.headers["etag"], first.json()["next_cursor"]
+    assert cursor
+
+    # 同一個版本號，但是另一頁 / 另一個 limit：內容不同，不能回 304
+    for params in ({"limit": 1, "before": cursor}, {"limit": 2}):
+        response = client.get("/assistant/history", headers={**headers, "If-None-Match": tag},
+                              params={"projectId": str(project.id), **params})
+        assert response.status_code == 200, params
+        assert response.headers["etag"] != tag
+        again = client.get("/assistant/history", headers={**headers, "If-None-Match": response.headers["etag"]},
+                           params={"projectId": str(project.id), **params})
+        assert again.status_code == 304, params
+
+
+def test_other_users_project_is_not_found(client, register, add_project):
+    register("etag-owner@example.com")
+    project, _, _ = add_cached_project(add_project, "etag-owner@example.com")
+    headers = register("etag-stranger@example.com")
+    response = client.get("/project_detail", headers={**headers, "If-None-Match": "*"},
+                          params={"project_id": str(project.id)})
+    assert response.status_code == 404
+
+
+def test_unknown_milestone_is_not_found(client, register, add_project):
+    headers = register("etag-milestone@example.com")
+    project, _, _ = add_cached_project(add_project, "etag-milestone@example.com")
+    register("etag-milestone-other@example.com")
+    _, other_milestone, _ = add_cached_project(add_project, "etag-milestone-other@example.com")
+
+    # 不存在的里程碑、別的專案的里程碑：* 也不能回 304
+    for milestone_id in (uuid.uuid4(), other_milestone.id):
+        response = client.get("/milestone_detail", headers={**headers, "If-None-Match": "*"},
+                              params={"project_id": str(project.id), "milestone_id": str(milestone_id)})
+        assert response.status_code == 404
+
+
+def test_if_none_match_parsing():
+    def request(value):
+        return Request({"type": "http", "headers": [(b"if-none-match", value.encode())]})
+
+    etag = make_etag("project", 1, 2)
+    assert etag_matches(request(etag), etag)
+    assert etag_matches(request(f'"other", W/{etag}'), etag)
+    assert etag_matches(request("*"), etag)
+    assert not etag_matches(request('"v1-project-1-1"'), etag)
+    assert not etag_matches(Request({"type": "http", "headers": []}), etag)
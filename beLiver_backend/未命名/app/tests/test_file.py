@@ -0,0 +1,200 @@
+import asyncio
+import hashlib
+import os
+import time
+
+import pytest
+
+from app import main
+from app.api.routes import file as file_routes
+from app.core import config, upload_limit
+from app.services import upload_store
+
+
+@pytest.fixture
+def headers(register):
+    return register("uploader@example.com")
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_routes, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(upload_store, "UPLOAD_CHUNK_SIZE", 1024)
+    return tmp_path
+
+
+def test_upload_streams_to_disk_with_checksum(client, headers, upload_dir):
+    content = b"%PDF-1.4 " + b"x" * 10_000
+    response = client.post("/upload", files=[("files", ("spec.pdf", content))], headers=headers)
+    assert response.status_code == 200
+
+    saved = response.json()["files"][0]
+    assert saved["size"] == len(content)
+    assert saved["sha256"] == hashlib.sha256(content).hexdigest()
+    assert saved["file_url"] == upload_store.blob_url(saved["sha256"], str(upload_dir))
+    assert open(upload_store.blob_path(saved["sha256"], str(upload_dir)), "rb").read() == content
+
+
+def test_upload_query_count_does_not_grow_with_files(client, headers, upload_dir, add_project, query_counter):
+    project = add_project("uploader@example.com")
+    counts = []
+    for count in (1, 5):
+        query_counter.clear()
+        response = client.post("/upload", files=[("files", (f"note{i}.txt", b"note %d" % i)) for i in range(count)],
+                               data={"projectId": str(project.id)}, headers=headers)
+        assert response.status_code == 200
+        counts.append(len(query_counter))
+    # 每個檔案不會各自多一個查詢（conftest 的 raise 模式也會檢查 @query_budget）
+    assert counts[0] == counts[1]
+
+
+def test_upload_rejects_file_over_limit(client, headers, upload_dir, monkeypatch):
+    monkeypatch.setattr(file_routes, "MAX_UPLOAD_FILE_BYTES", 4096)
+    response = client.post("/upload", files=[("files", ("big.pdf", b"x" * 5000))], headers=headers)
+
+    assert response.status_code == 413
+    assert "per-file" in response.json()["detail"]
+    assert not (upload_dir / "blobs").exists()
+    assert list((upload_dir / "tmp").iterdir()) == []
+
+
+def test_upload_rejects_request_over_limit(client, headers, upload_dir, monkeypatch, async_session_factory):
+    monkeypatch.setattr(file_routes, "MAX_UPLOAD_REQUEST_BYTES", 6000)
+    response = client.post("/upload", files=[
+        ("files", ("a.pdf", b"a" * 4000)),
+        ("files", ("b.pdf", b"b" * 4000)),
+    ], headers=headers)
+
+    assert response.status_code == 413
+    assert "per-request" in response.json()["detail"]
+    assert list((upload_dir / "tmp").iterdir()) == []
+
+    # 第一個檔案的 blob 已寫入但沒有 File 引用，sweep 會清掉
+    sweep = upload_store.sweep_orphan_blobs(async_session_factory, grace_seconds=-1, upload_dir=str(upload_dir))
+    assert asyncio.run(sweep) == 1
+    assert not os.path.exists(upload_store.blob_path(hashlib.sha256(b"a" * 4000).hexdigest(), str(upload_dir)))
+
+
+def test_upload_rejected_by_content_length_before_reading_body(monkeypatch):
+    monkeypatch.setattr(config, "MAX_UPLOAD_REQUEST_BYTES", 6000)
+    monkeypatch.setattr(upload_limit, "MULTIPART_OVERHEAD_BYTES", 0)
+    called, sent = [], []
+
+    async def app(scope, receive, send):
+        called.append(scope)
+
+    async def receive():
+        raise AssertionError("body must not be read")
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/upload", "headers": [(b"content-length", b"6001")]}
+    asyncio.run(upload_limit.UploadLimitMiddleware(app)(scope, receive, send))
+
+    assert called == []
+    assert sent[0]["status"] == 413
+
+
+def test_upload_without_content_length_stops_while_streaming(client, headers, upload_dir, monkeypatch):
+    monkeypatch.setattr(config, "MAX_UPLOAD_REQUEST_BYTES", 6000)
+    monkeypatch.setattr(upload_limit, "MULTIPART_OVERHEAD_BYTES", 0)
+
+    def body():
+        # chunked 傳輸，沒有 Content-Length
+        yield b'--x\r\nContent-Disposition: form-data; name="files"; filename="big.pdf"\r\n\r\n'
+        for _ in range(100):
+            yield b"x" * 1000
+
+    response = client.post("/upload", content=body(), headers={
+        **headers, "Content-Type": "multipart/form-data; boundary=x"
+    })
+    assert response.status_code == 413
+    assert "per-request" in response.json()["detail"]
+    assert not (upload_dir / "blobs").exists()
+
+
+def test_duplicate_uploads_share_one_blob(client, headers, upload_dir):
+    content = b"same bytes " * 500
+    first = client.post("/upload", files=[("files", ("v1.pdf", content))], headers=headers).json()["files"][0]
+    second = client.post("/upload", files=[("files", ("v2.pdf", content))], headers=headers).json()["files"][0]
+
+    assert first["deduplicated"] is False
+    assert second["deduplicated"] is True
+    assert first["file_url"] == second["file_url"]
+    blobs = [name for _, _, names in os.walk(upload_dir / "blobs") for name in names]
+    assert blobs == [first["sha256"]]
+
+
+def test_sweep_keeps_referenced_and_recent_blobs(client, headers, upload_dir, async_session_factory):
+    content = b"referenced " * 100
+    saved = client.post("/upload", files=[("files", ("kept.pdf", content))], headers=headers).json()["files"][0]
+    orphan = upload_store.blob_path("f" * 64, str(upload_dir))
+    os.makedirs(os.path.dirname(orphan))
+    open(orphan, "wb").write(b"orphan")
+
+    # 還在 grace period 內的 blob 不動
+    assert asyncio.run(upload_store.sweep_orphan_blobs(async_session_factory, 3600, str(upload_dir))) == 0
+    assert os.path.exists(orphan)
+
+    assert asyncio.run(upload_store.sweep_orphan_blobs(async_session_factory, -1, str(upload_dir))) == 1
+    assert not os.path.exists(orphan)
+    assert os.path.exists(upload_store.blob_path(saved["sha256"], str(upload_dir)))
+
+
+def test_sweep_keeps_blob_touched_by_concurrent_duplicate(upload_dir, async_session_factory, monkeypatch):
+    content = b"duplicate in flight"
+    sha256 = hashlib.sha256(content).hexdigest()
+    path = upload_store.blob_path(sha256, str(upload_dir))
+    os.makedirs(os.path.dirname(path))
+    open(path, "wb").write(content)
+    old = time.time() - 3600
+    os.utime(path, (old, old))
+
+    list_stale_files = upload_store._list_stale_files
+
+    def list_then_duplicate(root, older_than):
+        stale = list_stale_files(root, older_than)
+        if root.endswith("blobs"):
+            # sweep 列出 blob 之後、查 DB 之前，同樣內容又被上傳（File row 還沒 commit）
+            os.makedirs(upload_dir / "tmp", exist_ok=True)
+            tmp_path = str(upload_dir / "tmp" / "dup")
+            open(tmp_path, "wb").write(content)
+            assert upload_store._commit_blob(tmp_path, path) is False
+        return stale
+
+    monkeypatch.setattr(upload_store, "_list_stale_files", list_then_duplicate)
+    assert asyncio.run(upload_store.sweep_orphan_blobs(async_session_factory, 60, str(upload_dir))) == 0
+    assert open(path, "rb").read() == content
+
+
+def test_commit_blob_restores_blob_removed_mid_upload(tmp_path):
+    path = str(tmp_path / "blobs" / "ab" / "abc")
+    tmp = tmp_path / "upload"
+    tmp.write_bytes(b"data")
+    # sweep 已經把 blob 移走：重複上傳改用自己的暫存檔
+    assert upload_store._commit_blob(str(tmp), path) is True
+    assert open(path, "rb").read() == b"data"
+
+
+def test_shutdown_waits_for_the_sweeper(monkeypatch):
+    events = []
+
+    async def sweeper(*args):
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            await asyncio.sleep(0)  # 模擬還在收尾的 sweep
+            events.append("sweeper stopped")
+            raise
+
+    monkeypatch.setattr(main, "BLOB_GC_INTERVAL", 1)
+    monkeypatch.setattr(main, "run_blob_sweeper", sweeper)
+
+    async def run():
+        async with main.lifespan(main.app):
+            await asyncio.sleep(0)
+        events.append("shutdown done")
+
+    asyncio.run(run())
+    assert events == ["sweeper stopped", "shutdown done"]
@@ -0,0 +1,183 @@
+import asyncio
+import os
+
+import fitz
+import pytest
+
+import time
+
+from app.api.routes import file as file_routes
+from app.core import config
+from app.core.disk_cache import DiskCache
+from app.models import IngestionJob, User
+from app.services import ingestion, pdf_extract
+from app.services.llm import FakeModel
+
+
+def make_pdf(*pages: str) -> bytes:
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+
+@pytest.fixture
+def headers(register):
+    return register("ingest@example.com")
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_routes, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr("app.services.ingestion.blob_path", lambda sha: str(tmp_path / "blobs" / sha[:2] / sha))
+    monkeypatch.setattr(pdf_extract, "page_cache", DiskCache(str(tmp_path / "pages"), 1024 * 1024))
+    yield tmp_path
+    pdf_extract.shutdown()
+
+
+def upload_pdf(client, headers, content, name="spec.pdf"):
+    response = client.post(
+        "/upload", files=[("files", (name, content))], data={"ingest": "true"}, headers=headers
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_extract_pages_keeps_page_order(upload_dir):
+    path = str(upload_dir / "pages.pdf")
+    with open(path, "wb") as f:
+        f.write(make_pdf(*(f"Page {i}" for i in range(5))))
+
+    pages = asyncio.run(pdf_extract.extract_pages(path))
+    assert [page.strip() for page in pages] == [f"Page {i}" for i in range(5)]
+
+
+def test_known_document_is_not_parsed_again(upload_dir):
+    path = str(upload_dir / "cached.pdf")
+    with open(path, "wb") as f:
+        f.write(make_pdf("First", "Second", "Third"))
+
+    first = asyncio.run(pdf_extract.extract_pages(path, "c" * 64))
+    os.remove(path)
+    # 檔案已不在，只能從頁面快取取得
+    assert asyncio.run(pdf_extract.extract_pages(path, "c" * 64)) == first
+    assert pdf_extract.page_cache.stats()["hits"] == 4
+
+
+def test_only_missing_pages_are_extracted(upload_dir):
+    path = str(upload_dir / "partial.pdf")
+    with open(path, "wb") as f:
+        f.write(make_pdf(*(f"Page {i}" for i in range(6))))
+
+    full = asyncio.run(pdf_extract.extract_pages(path, "d" * 64))
+    os.remove(pdf_extract.page_cache._path(f"{'d' * 64}-2"))
+    os.remove(pdf_extract.page_cache._path(f"{'d' * 64}-3"))
+
+    assert pdf_extract._missing_ranges([2, 3], 2) == [(2, 3), (3, 4)]
+    assert asyncio.run(pdf_extract.extract_pages(path, "d" * 64)) == full
+
+
+def test_upload_pdf_creates_project_tree(client, headers, llm):
+    body = upload_pdf(client, headers, make_pdf("Rocket Launch Plan", "Second page"))
+    assert len(body["jobs"]) == 1
+
+    # TestClient 會在回傳前跑完 background task
+    job = client.get(f"/ingestion_jobs/{body['jobs'][0]['job_id']}", headers=headers).json()
+    assert job["status"] == "succeeded", job["error"]
+    assert len(job["project_ids"]) == 1
+    assert "Second page" in llm.prompts[0]
+
+    projects = client.get("/projects", headers=headers).json()
+    assert "Rocket Launch Plan" in [p["project_name"] for p in projects]
+
+    detail = client.get(f"/project_detail?project_id={job['project_ids'][0]}", headers=headers).json()
+    assert [m["milestone_name"] for m in detail["milestones"]] == ["Rocket Launch Plan"]
+
+
+def test_bad_model_reply_marks_job_failed(client, headers, llm, monkeypatch):
+    async def broken(prompt, template_version="", validate=None):
+        return "Sorry, I cannot help with that."
+
+    monkeypatch.setattr(llm, "generate", broken)
+    body = upload_pdf(client, headers, make_pdf("Broken"))
+
+    job = client.get(f"/ingestion_jobs/{body['jobs'][0]['job_id']}", headers=headers).json()
+    assert job["status"] == "failed"
+    assert "JSON" in job["error"]
+    assert job["project_ids"] == []
+
+
+def test_job_without_its_file_is_marked_failed(client, headers, db_session, async_session_factory, llm):
+    user = db_session.query(User).filter(User.email == "ingest@example.com").first()
+    # 檔案被刪掉後 file_id 會變成 NULL
+    job = IngestionJob(user_id=user.id, file_id=None)
+    db_session.add(job)
+    db_session.commit()
+
+    asyncio.run(ingestion.run_ingestion_job(job.id, async_session_factory, llm))
+
+    response = client.get(f"/ingestion_jobs/{job.id}", headers=headers).json()
+    assert response["status"] == "failed"
+    assert "no longer exists" in response["error"]
+
+
+def test_upload_without_ingest_starts_no_job(client, headers):
+    response = client.post("/upload", files=[("files", ("plain.pdf", make_pdf("x")))], headers=headers)
+    assert response.json()["jobs"] == []
+
+
+def test_job_is_private_to_its_owner(client, headers, register):
+    body = upload_pdf(client, headers, make_pdf("Private"))
+    other = register("ingest-other@example.com")
+
+    response = client.get(f"/ingestion_jobs/{body['jobs'][0]['job_id']}", headers=other)
+    assert response.status_code == 404
+
+
+def test_split_into_chunks_keeps_page_boundaries():
+    pages = ["a" * 40, "b" * 40, "c" * 40, "d" * 150]
+    chunks = ingestion.split_into_chunks(pages, 100)
+
+    assert chunks[:2] == ["a" * 40 + "b" * 40, "c" * 40]
+    # 過長的頁面再切成不超過上限的段落
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert "".join(chunks).replace("\n", "") == "".join(pages)
+
+
+def test_large_document_is_map_reduced_concurrently(monkeypatch):
+    monkeypatch.setattr(config, "LLM_CHUNK_CHARS", 100)
+    monkeypatch.setattr(config, "LLM_MAX_CONCURRENCY", 3)
+    model = FakeModel(delay=0.1)
+    pages = [f"Phase {i}\n" + "x" * 90 for i in range(6)]
+
+    started = time.perf_counter()
+    projects = asyncio.run(ingestion.generate_projects(model, pages))
+    elapsed = time.perf_counter() - started
+
+    assert len(model.prompts) == 6
+    assert model.max_in_flight == 3
+    assert elapsed < 0.5  # 6 段 × 0.1 秒，每次 3 段並行
+    assert len(projects) == 1
+    assert [m["name"] for m in projects[0]["milestones"]] == [f"Phase {i}" for i in range(6)]
+    assert projects[0]["estimated_loading"] == 36
+
+
+def test_milestones_spanning_chunks_are_merged():
+    task = {"title": "t", "due_date": "2025-07-05", "estimated_loading": 1}
+    merged = ingestion.merge_chunk_results([
+        {"project": {"name": "Apollo", "summary": "Intro"}, "milestones": [
+            {"name": "Design", "start_time": "2025-07-01", "end_time": "2025-07-10", "estimated_loading": 5, "tasks": [task]},
+        ]},
+        {"project": {"name": None}, "milestones": [
+            {"name": "Build", "start_time": "2025-07-20", "end_time": "2025-08-10", "estimated_loading": 8, "tasks": [task]},
+            {"name": "Design", "start_time": "2025-07-05", "end_time": "2025-07-15", "estimated_loading": 3, "tasks": [task]},
+        ]},
+    ])
+
+    project = merged[0]
+    assert project["name"] == "Apollo"
+    assert (project["start_time"], project["end_time"]) == ("2025-07-01", "2025-08-10")
+    design, build = project["milestones"]
+    assert design["name"] == "Design" and design["end_time"] == "2025-07-15"
+    assert len(design["tasks"]) == 2 and design["estimated_loading"] == 8
+    assert project["current_milestone"] == "Design"
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from app.core.disk_cache import DiskCache
+from app.services.ingestion import parse_projects_json
+from app.services.llm import CachedModel, FakeModel
+
+
+def test_identical_prompt_is_served_from_cache(tmp_path):
+    model = FakeModel()
+    cached = CachedModel(model, DiskCache(str(tmp_path), 1024 * 1024))
+
+    first = asyncio.run(cached.generate("以下為 PDF 內容：\nSpec", "project-1"))
+    second = asyncio.run(cached.generate("以下為 PDF 內容：\nSpec", "project-1"))
+
+    assert first == second
+    assert len(model.prompts) == 1
+    assert cached.cache.stats()["hit_rate"] == 0.5
+
+
+def test_template_version_and_input_change_the_key(tmp_path):
+    model = FakeModel()
+    cached = CachedModel(model, DiskCache(str(tmp_path), 1024 * 1024))
+
+    asyncio.run(cached.generate("prompt", "project-1"))
+    asyncio.run(cached.generate("prompt", "project-2"))
+    asyncio.run(cached.generate("prompt 2", "project-1"))
+
+    assert len(model.prompts) == 3
+
+
+def test_cache_survives_restart(tmp_path):
+    asyncio.run(CachedModel(FakeModel(), DiskCache(str(tmp_path), 1024 * 1024)).generate("prompt", "v1"))
+
+    model = FakeModel()
+    asyncio.run(CachedModel(model, DiskCache(str(tmp_path), 1024 * 1024)).generate("prompt", "v1"))
+    assert model.prompts == []
+
+
+class TruncatedModel(FakeModel):
+    """First reply is cut off mid-JSON, later replies are complete."""
+
+    async def generate(self, prompt, template_version="", validate=None):
+        reply = await super().generate(prompt, template_version)
+        return reply[:20] if len(self.prompts) == 1 else reply
+
+
+def test_reply_that_fails_validation_is_not_cached(tmp_path):
+    model = TruncatedModel()
+    cached = CachedModel(model, DiskCache(str(tmp_path), 1024 * 1024))
+    prompt = "以下為 PDF 內容：\nSpec"
+
+    with pytest.raises(ValueError):
+        asyncio.run(cached.generate(prompt, "project-1", validate=parse_projects_json))
+    # 再處理同一份文件會重新呼叫模型，而不是重播壞掉的回應
+    reply = asyncio.run(cached.generate(prompt, "project-1", validate=parse_projects_json))
+    assert parse_projects_json(reply)[0]["name"] == "Spec"
+    assert len(model.prompts) == 2
+
+    asyncio.run(cached.generate(prompt, "project-1", validate=parse_projects_json))
+    assert len(model.prompts) == 2
@@ -0,0 +1,77 @@
+import re
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import MetricsMiddleware, MetricsRegistry, RequestStats, current_request, registry
+
+
+def metric(text, name, **labels):
+    selector = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(name)}\{{{re.escape(selector)}\}} (\S+)$", text, re.M)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_metrics_group_requests_by_route_template(client):
+    response = client.post("/auth/register", json={
+        "name": "Metrics Tester",
+        "email": "metrics@example.com",
+        "password": "securepass"
+    })
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+    before = client.get("/metrics").text
+
+    for project_id in ("00000000-0000-0000-0000-000000000001", "00000000-0000-0000-0000-000000000002"):
+        client.get("/project_detail", params={"project_id": project_id}, headers=headers)
+    client.get("/projects", headers=headers)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    # 還沒有專案時 /projects 回 404
+    assert metric(text, "http_requests_total", method="GET", route="/projects", status=404) \
+        - metric(before, "http_requests_total", method="GET", route="/projects", status=404) == 1
+    # 路徑參數不進 label，同一個 route 的 request 合在一起
+    assert metric(text, "http_request_duration_seconds_count", method="GET", route="/project_detail") \
+        - metric(before, "http_request_duration_seconds_count", method="GET", route="/project_detail") == 2
+    assert metric(text, "http_request_db_statements_sum", method="GET", route="/projects") \
+        > metric(before, "http_request_db_statements_sum", method="GET", route="/projects")
+    # /metrics 本身還沒結束，算在 in-flight 裡
+    assert "http_requests_in_flight 1" in text
+
+
+def test_metrics_count_unhandled_errors():
+    app = FastAPI()
+
+    @app.get("/boom/{item_id}")
+    def boom(item_id: int):
+        raise RuntimeError("boom")
+
+    app.add_middleware(MetricsMiddleware)
+    before = registry.render()
+    with TestClient(app, raise_server_exceptions=False) as test_client:
+        assert test_client.get("/boom/1").status_code == 500
+        assert test_client.get("/missing").status_code == 404
+
+    text = registry.render()
+    assert metric(text, "http_request_errors_total", method="GET", route="/boom/{item_id}") \
+        - metric(before, "http_request_errors_total", method="GET", route="/boom/{item_id}") == 1
+    assert metric(text, "http_requests_total", method="GET", route="unmatched", status=404) \
+        - metric(before, "http_requests_total", method="GET", route="unmatched", status=404) == 1
+
+
+def test_statements_after_response_count_as_background():
+    metrics = MetricsRegistry()
+    stats = RequestStats()
+    token = current_request.set(stats)
+    try:
+        metrics.record_statement(0.01)
+        stats.done = True  # response 已送完，之後是 background task
+        metrics.record_statement(0.01)
+    finally:
+        current_request.reset(token)
+
+    assert stats.statements == 1
+    assert metrics.statements_outside_request == 1
@@ -0,0 +1,107 @@
+import datetime
+import uuid
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, func, inspect, select, text
+
+from app.crud.crud_project import projects_with_progress_query
+from app.models import Base, ChatHistory, File, Milestone, Project, Task
+
+
+@pytest.fixture(scope="module")
+def migrated_engine(tmp_path_factory):
+    db_path = tmp_path_factory.mktemp("migrations") / "migrated.db"
+    url = f"sqlite:///{db_path}"
+    config = Config("alembic.ini")
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+    engine = create_engine(url)
+    yield engine
+    engine.dispose()
+
+
+def test_migrations_match_models(migrated_engine):
+    with migrated_engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={"compare_type": False})
+        assert compare_metadata(context, Base.metadata) == []
+
+
+def test_migrations_create_hot_indexes(migrated_engine):
+    inspector = inspect(migrated_engine)
+    indexes = {
+        table: {ix["name"] for ix in inspector.get_indexes(table)}
+        for table in ("projects", "milestones", "tasks", "files", "chat_histories")
+    }
+    assert "ix_projects_user_id_start_time_end_time" in indexes["projects"]
+    assert "ix_milestones_project_id_end_time" in indexes["milestones"]
+    assert "ix_tasks_due_date_milestone_id" in indexes["tasks"]
+    assert "ix_tasks_milestone_id_is_completed" in indexes["tasks"]
+    assert "ix_files_project_id" in indexes["files"]
+    assert "ix_files_sha256" in indexes["files"]
+    assert "ix_chat_histories_project_id_user_id_timestamp_id" in indexes["chat_histories"]
+
+
+USER_ID = uuid.uuid4()
+PROJECT_ID = uuid.uuid4()
+DAY = datetime.date(2025, 6, 1)
+NOW = datetime.datetime(2025, 6, 1)
+
+# 各 route 的熱門查詢 -> 預期使用的 index
+HOT_QUERIES = {
+    "projects_by_user": (
+        select(Project.id).where(Project.user_id == USER_ID),
+        "ix_projects_user_id_start_time_end_time",
+    ),
+    "calendar_projects": (
+        select(Project.id).where(Project.user_id == USER_ID, Project.start_time <= NOW, Project.end_time >= NOW),
+        "ix_projects_user_id_start_time_end_time",
+    ),
+    "project_milestones": (
+        select(Milestone.id).where(Milestone.project_id == PROJECT_ID).order_by(Milestone.end_time),
+        "ix_milestones_project_id_end_time",
+    ),
+    "tasks_by_date": (
+        select(Task.id).where(Task.due_date == DAY),
+        "ix_tasks_due_date_milestone_id",
+    ),
+    "milestone_progress": (
+        select(func.count(Task.id)).where(Task.milestone_id == PROJECT_ID, Task.is_completed == True),
+        "ix_tasks_milestone_id_is_completed",
+    ),
+    "blob_references": (
+        select(File.sha256).where(File.sha256.in_(["0" * 64])).distinct(),
+        "ix_files_sha256",
+    ),
+    "assistant_history": (
+        select(ChatHistory.message)
+        .where(ChatHistory.project_id == PROJECT_ID, ChatHistory.user_id == USER_ID)
+        .order_by(ChatHistory.timestamp.desc(), ChatHistory.id.desc()),
+        "ix_chat_histories_project_id_user_id_timestamp_id",
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_plan_uses_index(migrated_engine, name):
+    query, index_name = HOT_QUERIES[name]
+    compiled = query.compile(migrated_engine, compile_kwargs={"literal_binds": True})
+    with migrated_engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()
+
+    details = [row[-1] for row in plan]
+    print(f"{name}: {details}")
+    assert any(index_name in detail for detail in details), details
+
+
+def test_projects_latest_milestone_is_scoped_to_user(migrated_engine):
+    # /projects 的最新里程碑子查詢只搜尋使用者自己專案的里程碑，不掃整張 milestones
+    compiled = projects_with_progress_query(USER_ID).compile(migrated_engine, compile_kwargs={"literal_binds": True})
+    with migrated_engine.connect() as conn:
+        details = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()]
+
+    assert any(detail.startswith("SEARCH milestones") for detail in details), details
+    assert not any(detail.startswith("SCAN milestones") for detail in details), details
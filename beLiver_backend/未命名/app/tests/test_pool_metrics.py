@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.core.pool_metrics import PoolMetrics, TimedQueuePool
+
+
+@pytest.fixture
+def pool_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    metrics = PoolMetrics("test").attach(engine)
+    yield engine, metrics
+    engine.dispose()
+
+
+def test_pool_metrics_counts_checkouts(pool_engine):
+    engine, metrics = pool_engine
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    data = metrics.snapshot()
+    assert data["checkouts"] == 3
+    assert data["checkins"] == 3
+    assert data["connects"] == 1
+    assert data["checked_out"] == 0
+    assert data["pool_size"] == 1
+
+
+def test_pool_metrics_records_wait_timeout(pool_engine):
+    engine, metrics = pool_engine
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    data = metrics.snapshot()
+    assert data["timeouts"] == 1
+    assert data["wait_seconds_max"] >= 0.05
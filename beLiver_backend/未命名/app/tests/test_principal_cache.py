@@ -0,0 +1,61 @@
+from app.core.cache import TTLCache
+from app.crud.crud_user import principal_cache
+from app.models import User
+
+
+def user_queries(statements):
+    return [s for s in statements if "FROM users" in s]
+
+
+def test_current_user_is_cached(client, query_counter):
+    response = client.post("/auth/register", json={
+        "name": "Cached User",
+        "email": "cached@example.com",
+        "password": "securepass"
+    })
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+    query_counter.clear()
+
+    for _ in range(3):
+        assert client.get("/user/profile", headers=headers).status_code == 200
+
+    assert len(user_queries(query_counter)) == 1
+    assert principal_cache.stats()["hits"] >= 2
+
+
+def test_user_update_invalidates_cache(client, db_session):
+    response = client.post("/auth/register", json={
+        "name": "Old Name",
+        "email": "rename@example.com",
+        "password": "securepass"
+    })
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+    assert client.get("/user/profile", headers=headers).json()["name"] == "Old Name"
+
+    user = db_session.query(User).filter(User.email == "rename@example.com").first()
+    user.name = "New Name"
+    db_session.commit()
+
+    assert client.get("/user/profile", headers=headers).json()["name"] == "New Name"
+
+    db_session.delete(user)
+    db_session.commit()
+    assert client.get("/user/profile", headers=headers).status_code == 401
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=2, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
@@ -0,0 +1,95 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from app.models import Milestone, Project, Task
+
+
+def add_projects(add_project, email, count, tasks_per_milestone=4, completed=1):
+    """``count`` projects, each with "Milestone 1" and "Milestone 2" holding the same tasks."""
+    tasks = [(f"Task {t}", date(2025, 6, 5), 1, t < completed) for t in range(tasks_per_milestone)]
+    for i in range(count):
+        add_project(email, name=f"Project {i}", current_milestone="Milestone 2", milestones=[
+            ("Milestone 1", datetime(2025, 6, 10), tasks),
+            ("Milestone 2", datetime(2025, 6, 20), tasks),
+        ])
+
+
+def test_projects_progress_uses_latest_milestone(client, register, add_project):
+    headers = register("progress@example.com")
+    add_projects(add_project, "progress@example.com", 1, tasks_per_milestone=4, completed=1)
+
+    response = client.get("/projects", headers=headers)
+    assert response.status_code == 200
+    projects = response.json()
+    assert len(projects) == 1
+    assert projects[0]["progress"] == 0.25
+    assert projects[0]["current_milestone"] == "Milestone 2"
+
+
+def test_projects_scoped_to_current_user(client, register, add_project):
+    headers = register("owner@example.com")
+    register("someone-else@example.com")
+    add_projects(add_project, "owner@example.com", 2)
+    add_projects(add_project, "someone-else@example.com", 3)
+
+    response = client.get("/projects", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_projects_query_count_is_constant(client, register, add_project, query_counter):
+    headers = register("many@example.com")
+    add_projects(add_project, "many@example.com", 1)
+    client.get("/projects", headers=headers)  # 暖機：新連線會先跑 PRAGMA
+    query_counter.clear()
+
+    client.get("/projects", headers=headers)
+    few = len(query_counter)
+    query_counter.clear()
+
+    add_projects(add_project, "many@example.com", 10)
+    response = client.get("/projects", headers=headers)
+    assert len(response.json()) == 11
+    assert len(query_counter) == few
+
+
+def test_project_detail_milestone_progress(client, register, add_project, query_counter):
+    headers = register("detail@example.com")
+    add_projects(add_project, "detail@example.com", 1, tasks_per_milestone=4, completed=3)
+    project_id = client.get("/projects", headers=headers).json()[0]["project_id"]
+    query_counter.clear()
+
+    response = client.get(f"/project_detail?project_id={project_id}", headers=headers)
+    assert response.status_code == 200
+    detail = response.json()
+    assert [ms["milestone_name"] for ms in detail["milestones"]] == ["Milestone 1", "Milestone 2"]
+    assert [ms["progress"] for ms in detail["milestones"]] == [0.75, 0.75]
+    # 專案 + 里程碑彙總（使用者已在上一個 request 快取）
+    assert len(query_counter) == 2
+
+
+def test_delete_project_query_count_does_not_grow_with_milestones(client, db_session, register, add_project):
+    headers = register("delete@example.com")
+    add_projects(add_project, "delete@example.com", 1, tasks_per_milestone=5)
+    project_id = client.get("/projects", headers=headers).json()[0]["project_id"]
+    for m in range(10):
+        milestone = Milestone(name=f"Extra {m}", start_time=datetime(2025, 6, 1), end_time=datetime(2025, 6, 5),
+                              project_id=uuid.UUID(project_id))
+        db_session.add(milestone)
+        db_session.flush()
+        db_session.add(Task(title="t", due_date=date(2025, 6, 2), is_completed=False, milestone_id=milestone.id))
+    db_session.commit()
+    task_ids = db_session.scalars(
+        select(Task.id).join(Milestone).filter(Milestone.project_id == uuid.UUID(project_id))
+    ).all()
+
+    # conftest 設定 QUERY_BUDGET_MODE=raise，超過 @query_budget 會直接失敗
+    response = client.delete("/project", params={"project_id": project_id}, headers=headers)
+    assert response.status_code == 200
+
+    db_session.expire_all()
+    assert db_session.get(Project, uuid.UUID(project_id)) is None
+    assert not db_session.scalars(select(Milestone).filter_by(project_id=uuid.UUID(project_id))).all()
+    assert not db_session.scalars(select(Task).filter(Task.id.in_(task_ids))).all()
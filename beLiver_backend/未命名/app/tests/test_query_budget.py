@@ -0,0 +1,55 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core import query_budget as query_budget_module
+from app.core.metrics import MetricsMiddleware
+from app.core.query_budget import QueryBudgetExceeded, query_budget
+
+
+@pytest.fixture
+def loop_app(async_session_factory):
+    app = FastAPI()
+
+    @app.get("/loop/{n}")
+    @query_budget(2)
+    async def loop(n: int):
+        async with async_session_factory() as db:
+            for _ in range(n):
+                await db.execute(text("SELECT 1"))
+        return {"n": n}
+
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+def test_within_budget_passes(loop_app):
+    with TestClient(loop_app) as test_client:
+        assert test_client.get("/loop/2").json() == {"n": 2}
+
+
+def test_over_budget_raises_with_call_site(loop_app):
+    with TestClient(loop_app) as test_client:
+        with pytest.raises(QueryBudgetExceeded) as excinfo:
+            test_client.get("/loop/5")
+
+    message = str(excinfo.value)
+    assert "GET /loop/{n} ran 5 SQL statements (budget 2)" in message
+    # 指向發出查詢的那一行，而不是 SQLAlchemy 內部
+    assert "5 x app/tests/test_query_budget.py" in message
+    assert "(loop)" in message
+
+
+def test_log_mode_warns_instead_of_failing(loop_app, monkeypatch, caplog):
+    monkeypatch.setattr(query_budget_module, "QUERY_BUDGET_MODE", "log")
+    # test_migrations 跑 alembic 的 fileConfig 時會停用既有的 logger
+    monkeypatch.setattr(query_budget_module.logger, "disabled", False)
+    with caplog.at_level(logging.WARNING, logger="app.core.query_budget"):
+        with TestClient(loop_app) as test_client:
+            assert test_client.get("/loop/3").status_code == 200
+
+    assert "ran 3 SQL statements (budget 2)" in caplog.text
+
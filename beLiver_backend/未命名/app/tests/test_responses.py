@@ -0,0 +1,52 @@
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, text
+
+from app.core.responses import dumps
+
+
+def test_matches_jsonable_encoder_for_common_types():
+    content = {
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "naive": datetime(2025, 6, 1, 9, 30),
+        "micro": datetime(2025, 6, 1, 9, 30, 0, 123456),
+        "aware": datetime(2025, 6, 1, 9, 30, tzinfo=timezone.utc),
+        "day": date(2025, 6, 1),
+        "none": None,
+        "nested": [{"ok": True}],
+    }
+    assert json.loads(dumps(content)) == jsonable_encoder(content)
+
+
+def test_decimal_is_a_number():
+    assert json.loads(dumps({"estimated_loading": Decimal("1.5")})) == {"estimated_loading": 1.5}
+
+
+def test_rows_serialize_as_objects():
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT 1 AS task_id, 'Write spec' AS task_title")).all()
+    assert json.loads(dumps(rows)) == [{"task_id": 1, "task_title": "Write spec"}]
+
+
+def test_row_lists_inside_objects_and_lists():
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        tasks = conn.execute(text("SELECT 1 AS task_id UNION ALL SELECT 2")).all()
+        loading = conn.execute(text("SELECT '2025-06-01' AS date, 1.5 AS loading")).all()
+    content = {"projects": tasks, "daily_loading": loading, "nested": [{"row": loading[0]}]}
+    assert json.loads(dumps(content)) == {
+        "projects": [{"task_id": 1}, {"task_id": 2}],
+        "daily_loading": [{"date": "2025-06-01", "loading": 1.5}],
+        "nested": [{"row": {"date": "2025-06-01", "loading": 1.5}}],
+    }
+
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
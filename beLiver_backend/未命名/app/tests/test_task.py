@@ -0,0 +1,152 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy.dialects import postgresql
+
+from app.api.routes.task import _project_overlaps
+from app.models import Milestone, Task
+from app.services import workload_rollup
+
+
+def test_tasks_by_date_response_shape(client, register, add_project):
+    headers = register("tasks@example.com")
+    project = add_project("tasks@example.com", [
+        ("Write spec", date(2025, 6, 5), Decimal("1.5")),
+        ("Review", date(2025, 6, 6), Decimal("2")),
+    ])
+
+    response = client.get("/tasks", params={"date": "2025-06-05"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    [task] = response.json()
+    assert set(task) == {"task_id", "task_title", "description", "estimated_loading", "isCompleted", "project_id"}
+    assert task["task_title"] == "Write spec"
+    assert task["estimated_loading"] == 1.5
+    assert task["isCompleted"] is False
+    assert task["project_id"] == str(project.id)
+
+
+def test_tasks_in_range_grouped_by_day(client, register, add_project, query_counter):
+    headers = register("tasks-range@example.com")
+    project = add_project("tasks-range@example.com", [
+        ("Write spec", date(2025, 6, 5), Decimal("1.5")),
+        ("Review", date(2025, 6, 7), Decimal("2")),
+        ("Draft", date(2025, 6, 5), Decimal("1")),
+        ("Later", date(2025, 6, 20), Decimal("3")),
+    ], name="Calendar")
+
+    query_counter.clear()
+    response = client.get("/tasks", params={"start_date": "2025-06-05", "end_date": "2025-06-07"}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["start_date"] == "2025-06-05" and body["end_date"] == "2025-06-07"
+    assert list(body["days"]) == ["2025-06-05", "2025-06-06", "2025-06-07"]
+    assert [task["task_title"] for task in body["days"]["2025-06-05"]] == ["Draft", "Write spec"]
+    assert body["days"]["2025-06-06"] == []
+    [review] = body["days"]["2025-06-07"]
+    assert review["project_id"] == str(project.id)
+    assert review["project_name"] == "Calendar"
+    assert review["milestone_name"] == "M1"
+    assert review["estimated_loading"] == 2.0
+    # 取得使用者 + 一個查詢，和任務數量無關
+    assert len(query_counter) <= 2
+
+
+def test_tasks_requires_date_or_range(client, register):
+    headers = register("tasks-params@example.com")
+    assert client.get("/tasks", headers=headers).status_code == 400
+    assert client.get("/tasks", params={"start_date": "2025-06-05"}, headers=headers).status_code == 400
+    response = client.get("/tasks", params={"start_date": "2025-06-07", "end_date": "2025-06-05"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_bulk_update_changes_only_owned_tasks(client, db_session, register, add_project, query_counter):
+    headers = register("tasks-bulk@example.com")
+    mine = add_project("tasks-bulk@example.com", [
+        ("Write spec", date(2025, 6, 5), Decimal("1.5")),
+        ("Review", date(2025, 6, 6), Decimal("2")),
+        ("Done already", date(2025, 6, 7), Decimal("1")),
+    ])
+    register("tasks-bulk-other@example.com")
+    other = add_project("tasks-bulk-other@example.com", [("Not mine", date(2025, 6, 5), Decimal("1"))])
+    tasks = {
+        task.title: task
+        for task in db_session.query(Task).join(Milestone).filter(Milestone.project_id.in_([mine.id, other.id]))
+    }
+    tasks["Done already"].is_completed = True
+    db_session.commit()
+
+    query_counter.clear()
+    response = client.patch("/tasks", json={
+        "task_ids": [str(tasks[title].id) for title in ("Write spec", "Review", "Done already", "Not mine")],
+        "isCompleted": True,
+    }, headers=headers)
+    assert response.status_code == 200
+    assert sorted(row["task_id"] for row in response.json()) == sorted(
+        str(tasks[title].id) for title in ("Write spec", "Review"))
+    assert all(row["isCompleted"] is True for row in response.json())
+    assert len(query_counter) <= 7
+    # 先鎖定要改的任務，扣掉 / 加回彙總和 UPDATE 都用這組 id
+    assert query_counter[1].startswith("SELECT tasks.id \nFROM tasks")
+
+    db_session.expire_all()
+    assert tasks["Not mine"].is_completed is False
+
+    response = client.patch("/tasks", json={"task_ids": [str(tasks["Review"].id)], "due_date": "2025-06-09"},
+                            headers=headers)
+    assert response.json() == [{"task_id": str(tasks["Review"].id), "isCompleted": True, "due_date": "2025-06-09"}]
+    assert workload_rollup.check(db_session.connection()) == []
+
+
+def test_bulk_update_requires_a_change(client, register):
+    headers = register("tasks-bulk-empty@example.com")
+    response = client.patch("/tasks", json={"task_ids": []}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_calendar_projects_with_daily_loading(client, register, add_project):
+    headers = register("calendar@example.com")
+    project = add_project("calendar@example.com", [
+        ("Write spec", date(2025, 6, 10), Decimal("1.5")),
+        ("Review", date(2025, 6, 10), Decimal("2")),
+        ("Ship", date(2025, 6, 12), Decimal("0.5")),
+        ("Later", date(2025, 6, 20), Decimal("3")),
+    ], name="Calendar", start_time=datetime(2025, 6, 1, 9, 30))
+
+    response = client.get("/calendar_projects", params={"start_date": "2025-06-10", "end_date": "2025-06-12"},
+                          headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "start_date": "2025-06-10",
+        "end_date": "2025-06-12",
+        "projects": [{
+            "project_name": "Calendar",
+            "project_id": str(project.id),
+            "start_time": "2025-06-01T09:30:00",
+            "end_time": "2025-06-30T00:00:00",
+        }],
+        "daily_loading": [3.5, 0.0, 0.5],
+    }
+
+
+def test_calendar_projects_outside_window(client, register):
+    headers = register("calendar-empty@example.com")
+    response = client.get("/calendar_projects", params={"start_date": "2025-01-01", "end_date": "2025-01-02"},
+                          headers=headers)
+    assert response.json() == {"start_date": "2025-01-01", "end_date": "2025-01-02", "projects": [],
+                               "daily_loading": [0.0, 0.0]}
+
+
+def test_calendar_projects_rejects_long_ranges(client, register):
+    headers = register("calendar-long@example.com")
+    response = client.get("/calendar_projects", params={"start_date": "2025-01-01", "end_date": "2026-06-01"},
+                          headers=headers)
+    assert response.status_code == 400
+
+
+def test_calendar_overlap_uses_range_operator_on_postgresql():
+    condition = _project_overlaps("postgresql", datetime(2025, 6, 1), datetime(2025, 6, 30))
+    sql = str(condition.compile(dialect=postgresql.dialect()))
+    assert "tsrange(least(projects.start_time, projects.end_time), greatest(projects.start_time, projects.end_time), '[]') && tsrange(" in sql
+    # 其他資料庫維持一般的區間比較（走 ix_projects_user_id_start_time_end_time）
+    assert "&&" not in str(_project_overlaps("sqlite", datetime(2025, 6, 1), datetime(2025, 6, 30)).compile())
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import DateTime
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.models import Base, UTCTimestamp
+
+ASYNCPG = asyncpg.dialect()
+
+
+def bind(column, value):
+    """The value asyncpg would receive for ``column`` (SQLite would silently drop the offset instead)."""
+    processor = column.type._cached_bind_processor(ASYNCPG)
+    return processor(value) if processor else value
+
+
+def test_every_timestamp_column_stores_naive_utc():
+    columns = [column for table in Base.metadata.tables.values() for column in table.columns
+               if isinstance(column.type, (DateTime, UTCTimestamp))]
+    assert columns
+    for column in columns:
+        assert isinstance(column.type, UTCTimestamp), f"{column.table.name}.{column.name}"
+
+
+def test_aware_datetimes_are_converted_for_asyncpg():
+    column = Base.metadata.tables["chat_histories"].c.timestamp
+    taipei = timezone(timedelta(hours=8))
+
+    value = bind(column, datetime(2025, 6, 1, 17, 30, tzinfo=taipei))
+    assert value == datetime(2025, 6, 1, 9, 30)
+    assert value.tzinfo is None
+
+    # "...Z"（ingestion、PUT /project_detail 的用戶端）
+    value = bind(column, datetime.fromisoformat("2025-06-01T09:30:00Z"))
+    assert value == datetime(2025, 6, 1, 9, 30) and value.tzinfo is None
+
+    assert bind(column, datetime(2025, 6, 1, 9, 30)) == datetime(2025, 6, 1, 9, 30)
+    assert bind(column, None) is None
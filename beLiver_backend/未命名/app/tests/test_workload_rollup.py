@@ -0,0 +1,122 @@
+from datetime import date
+from decimal import Decimal
+
+from app.models import DailyWorkload, Task, User
+from app.services import workload_rollup
+
+
+def workload(db, user_id):
+    """{day: (total, completed, count)} stored for ``user_id``, skipping days that netted to zero."""
+    db.expire_all()
+    rows = db.query(DailyWorkload).filter(DailyWorkload.user_id == user_id).all()
+    return {
+        row.day: (float(row.total_loading), float(row.completed_loading), row.task_count)
+        for row in rows
+        if row.task_count
+    }
+
+
+def assert_consistent(db, user_id):
+    assert workload_rollup.check(db.connection(), [user_id]) == []
+
+
+def test_orm_writes_keep_rollup_in_sync(db_session, add_project):
+    db_session.add(User(name="ORM", email="rollup-orm@example.com", hashed_password="x"))
+    db_session.commit()
+    project = add_project("rollup-orm@example.com", name="Rollup")
+    user, milestone = project.user, project.milestones[0]
+
+    spec = Task(title="Spec", due_date=date(2025, 6, 10), estimated_loading=Decimal("1.5"),
+                milestone_id=milestone.id, is_completed=False)
+    review = Task(title="Review", due_date=date(2025, 6, 10), estimated_loading=Decimal("2"),
+                  milestone_id=milestone.id, is_completed=False)
+    db_session.add_all([spec, review])
+    db_session.commit()
+    assert workload(db_session, user.id) == {date(2025, 6, 10): (3.5, 0.0, 2)}
+
+    spec.is_completed = True
+    review.due_date = date(2025, 6, 11)
+    review.estimated_loading = Decimal("2.5")
+    db_session.commit()
+    assert workload(db_session, user.id) == {date(2025, 6, 10): (1.5, 1.5, 1), date(2025, 6, 11): (2.5, 0.0, 1)}
+
+    db_session.delete(spec)
+    db_session.commit()
+    assert workload(db_session, user.id) == {date(2025, 6, 11): (2.5, 0.0, 1)}
+    assert_consistent(db_session, user.id)
+
+
+def test_task_routes_keep_rollup_in_sync(client, db_session, register, add_project):
+    headers = register("rollup-routes@example.com")
+    project = add_project("rollup-routes@example.com", name="Rollup")
+    user, milestone = project.user, project.milestones[0]
+
+    response = client.post("/task", json={"milestone_id": str(milestone.id), "ddl": "2025-06-05", "name": "Draft"},
+                           headers=headers)
+    assert response.status_code == 200
+    task_id = response.json()["task"]["task_id"]
+    assert workload(db_session, user.id) == {date(2025, 6, 5): (0.0, 0.0, 1)}
+
+    response = client.put("/task", json={"task_id": task_id, "changed_name": "Draft v2", "changed_ddl": "2025-06-07"},
+                          headers=headers)
+    assert response.status_code == 200
+    assert workload(db_session, user.id) == {date(2025, 6, 7): (0.0, 0.0, 1)}
+
+    response = client.patch(f"/tasks/{task_id}", json={"isCompleted": True}, headers=headers)
+    assert response.status_code == 200
+    assert_consistent(db_session, user.id)
+
+    response = client.delete("/task", params={"task_id": task_id}, headers=headers)
+    assert response.status_code == 200
+    assert workload(db_session, user.id) == {}
+
+    db_session.add(Task(title="Kept", due_date=date(2025, 6, 8), estimated_loading=Decimal("1"),
+                        milestone_id=milestone.id, is_completed=False))
+    db_session.commit()
+    response = client.delete("/project", params={"project_id": str(project.id)}, headers=headers)
+    assert response.status_code == 200
+    assert workload(db_session, user.id) == {}
+    assert_consistent(db_session, user.id)
+
+
+def test_repeated_toggle_applies_the_delta_once(client, db_session, register, add_project):
+    headers = register("rollup-toggle@example.com")
+    project = add_project("rollup-toggle@example.com", [("Spec", date(2025, 6, 10), Decimal("1.5"))], name="Rollup")
+    user, task = project.user, project.milestones[0].tasks[0]
+
+    # 同一個「完成」送兩次（例如重送）：第二次讀到鎖住後的新值，差額為 0
+    for _ in range(2):
+        response = client.patch(f"/tasks/{task.id}", json={"isCompleted": True}, headers=headers)
+        assert response.status_code == 200
+    assert workload(db_session, user.id) == {date(2025, 6, 10): (1.5, 1.5, 1)}
+
+    for _ in range(2):
+        response = client.put("/task", json={"task_id": str(task.id), "changed_name": "Spec",
+                                             "changed_ddl": "2025-06-11"}, headers=headers)
+        assert response.status_code == 200
+    assert workload(db_session, user.id) == {date(2025, 6, 11): (1.5, 1.5, 1)}
+    assert_consistent(db_session, user.id)
+
+
+def test_rebuild_repairs_drift(db_session, add_project):
+    db_session.add(User(name="Drift", email="rollup-drift@example.com", hashed_password="x"))
+    db_session.commit()
+    project = add_project("rollup-drift@example.com", name="Rollup")
+    user, milestone = project.user, project.milestones[0]
+    db_session.add(Task(title="Spec", due_date=date(2025, 6, 10), estimated_loading=Decimal("1.5"),
+                        milestone_id=milestone.id, is_completed=True))
+    db_session.commit()
+
+    row = db_session.get(DailyWorkload, (user.id, date(2025, 6, 10)))
+    row.total_loading = Decimal("9")
+    db_session.add(DailyWorkload(user_id=user.id, day=date(2025, 6, 12), total_loading=Decimal("1"),
+                                 completed_loading=Decimal("0"), task_count=1))
+    db_session.commit()
+
+    mismatches = workload_rollup.check(db_session.connection(), [user.id])
+    assert [row["day"] for row in mismatches] == [date(2025, 6, 10), date(2025, 6, 12)]
+
+    workload_rollup.rebuild(db_session.connection(), [user.id])
+    db_session.commit()
+    assert workload(db_session, user.id) == {date(2025, 6, 10): (1.5, 1.5, 1)}
+    assert_consistent(db_session, user.id)
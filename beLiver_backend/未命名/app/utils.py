@@ -1,18 +1,56 @@
 import os
+import asyncio
+import threading
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor
 from jose import jwt
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from app.core.config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT
 
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+def hash_password(password: str, rounds: int | None = None) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds or BCRYPT_ROUNDS)).decode()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    # bcrypt 格式：$2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
 def create_jwt_token(data: dict) -> str:
     return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the bcrypt queue is full; routes answer 503."""
+
+
+# bcrypt 在計算時會釋放 GIL，用 thread pool 即可平行；另外限制排隊長度
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_password_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT)
+
+async def _run_password_job(fn, *args):
+    if not _password_slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        future = _password_executor.submit(fn, *args)
+    except BaseException:
+        _password_slots.release()
+        raise
+    # request 被取消時工作仍會跑完，所以在工作結束時才釋放名額
+    future.add_done_callback(lambda _: _password_slots.release())
+    return await asyncio.wrap_future(future)
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_job(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_job(verify_password, plain_password, hashed_password)
@@ -0,0 +1,100 @@
+# 專案樹寫入速度比較：逐筆 INSERT / multi-row INSERT / COPY（rows/sec）
+#
+# 用法（在專案根目錄，需先設定好 .env 連到 PostgreSQL，且已 alembic upgrade head）：
+#   PYTHONPATH=. python benchmarks/bench_bulk_insert.py --projects 50 --milestones 5 --tasks 40
+#
+# 每種寫法各自在一個 transaction 裡寫入同一棵樹，量完就 ROLLBACK，不會留下資料。
+# per-row 是舊版 insert_mock_data 的做法（每筆一次 cur.execute）。
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "database"))
+from bulk_writer import TABLE_COLUMNS, flatten_project_tree, write_rows  # noqa: E402
+
+from app.core.db import DATABASE_URL  # noqa: E402
+
+
+def build_tree(projects: int, milestones: int, tasks: int) -> list[dict]:
+    now = datetime.now()
+    return [{
+        "name": f"Bench project {p}",
+        "summary": "Generated by bench_bulk_insert",
+        "start_time": now,
+        "end_time": now + timedelta(days=60),
+        "estimated_loading": 20,
+        "due_date": (now + timedelta(days=60)).date(),
+        "milestones": [{
+            "name": f"Milestone {m}",
+            "summary": "Phase",
+            "start_time": now + timedelta(days=m * 7),
+            "end_time": now + timedelta(days=m * 7 + 6),
+            "estimated_loading": 8,
+            "tasks": [{
+                "title": f"Task {t}",
+                "description": "Do the thing\twith a tab\nand a newline",
+                "due_date": (now + timedelta(days=m * 7 + t % 7)).date(),
+                "estimated_loading": 1.5,
+                "is_completed": t % 3 == 0,
+            } for t in range(tasks)],
+        } for m in range(milestones)],
+    } for p in range(projects)]
+
+
+def write_per_row(cur, tables):
+    for table, columns in TABLE_COLUMNS.items():
+        rows = tables.get(table) or []
+        if not rows:
+            continue
+        columns = [c for c in columns if c in rows[0]]
+        statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        for row in rows:
+            cur.execute(statement, tuple(row.get(c) for c in columns))
+
+
+def measure(conn, user_id, tree, method: str) -> dict:
+    tables = flatten_project_tree(user_id, tree, lambda table: str(uuid.uuid4()))
+    rows = sum(len(v) for v in tables.values())
+    with conn.cursor() as cur:
+        started = time.perf_counter()
+        if method == "per-row":
+            write_per_row(cur, tables)
+        else:
+            write_rows(cur, tables, method)
+        elapsed = time.perf_counter() - started
+    conn.rollback()
+    return {"method": method, "rows": rows, "seconds": round(elapsed, 3), "rows_per_sec": round(rows / elapsed)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--milestones", type=int, default=5)
+    parser.add_argument("--tasks", type=int, default=40, help="tasks per milestone")
+    parser.add_argument("--methods", default="per-row,values,copy")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(DATABASE_URL)
+    tree = build_tree(args.projects, args.milestones, args.tasks)
+    user_id = str(uuid.uuid4())
+    try:
+        for method in args.methods.split(","):
+            # 先建立使用者（同一個 transaction，量完一起 rollback）
+            with conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO users (id, name, email, hashed_password) VALUES (%s, %s, %s, %s)",
+                    (user_id, "bench", f"bench-{user_id}@example.com", "x"),
+                )
+            result = measure(conn, user_id, tree, method)
+            print(f"{result['method']:>8}: {result['rows']} rows in {result['seconds']}s -> {result['rows_per_sec']} rows/sec")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
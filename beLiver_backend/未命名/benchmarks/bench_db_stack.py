@@ -0,0 +1,91 @@
+# 同步 / 非同步 DB stack 併發吞吐量比較
+#
+# 用法（在專案根目錄，需先設定好 .env 連到 PostgreSQL）：
+#   PYTHONPATH=. python benchmarks/bench_db_stack.py --requests 2000 --concurrency 200 --sleep-ms 5
+#
+# 兩個 stack 跑同一個查詢：
+#   sync  -> def route + get_db()（Session，佔用 FastAPI threadpool）
+#   async -> async def route + get_async_db()（AsyncSession，等待 DB 時釋放 event loop）
+# --sleep-ms 會在查詢中加上 pg_sleep，用來模擬 DB / 網路延遲。
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.db import get_async_db, get_db
+from app.models import Task
+
+
+def build_app(sleep_ms: int) -> FastAPI:
+    bench_app = FastAPI()
+    delay = text("SELECT pg_sleep(:s)").bindparams(s=sleep_ms / 1000)
+    count_tasks = select(func.count(Task.id))
+
+    @bench_app.get("/sync")
+    def sync_route(db: Session = Depends(get_db)):
+        if sleep_ms:
+            db.execute(delay)
+        return {"tasks": db.execute(count_tasks).scalar()}
+
+    @bench_app.get("/async")
+    async def async_route(db: AsyncSession = Depends(get_async_db)):
+        if sleep_ms:
+            await db.execute(delay)
+        return {"tasks": (await db.execute(count_tasks)).scalar()}
+
+    return bench_app
+
+
+async def run(bench_app: FastAPI, path: str, total: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=bench_app)
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        await client.get(path)  # warm up 連線池
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "stack": path.strip("/"),
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "req_per_sec": round(total / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sync vs async DB stack throughput")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--sleep-ms", type=int, default=5)
+    args = parser.parse_args()
+
+    bench_app = build_app(args.sleep_ms)
+    for path in ("/sync", "/async"):
+        result = asyncio.run(run(bench_app, path, args.requests, args.concurrency))
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# 清單型 route 的序列化成本：舊做法（ORM 物件 → 逐列 dict → jsonable_encoder → json.dumps）
+# vs 新做法（只取欄位的 Row → 每列一個 dict（欄位名稱只取一次）→ orjson）
+#
+# 用法（在專案根目錄，不需要 PostgreSQL，使用暫存的 SQLite）：
+#   PYTHONPATH=. python benchmarks/bench_json.py --rows 1000,10000,50000 --repeat 5
+#
+# 以 /tasks 的查詢與回應格式為例；分別列出「查詢 + 組資料」與「序列化」的時間（取最快的一次）。
+import argparse
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+# app.core.db 需要完整的 DB 設定才能 import；這裡實際連的是下面的 SQLite
+for key, value in {"DB_NAME": "bench", "DB_USER": "bench", "DB_PASSWORD": "bench",
+                   "DB_HOST": "localhost", "DB_PORT": "5432", "SECRET_KEY": "bench"}.items():
+    os.environ.setdefault(key, value)
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.db import Base
+from app.core.responses import FastJSONResponse
+from app.models import Milestone, Project, Task, User
+
+DUE = date(2025, 6, 5)
+
+
+def seed(engine, rows: int) -> uuid.UUID:
+    user_id, project_id, milestone_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    with Session(engine) as db:
+        db.add(User(id=user_id, name="bench", email=f"{user_id}@example.com", hashed_password="x"))
+        db.add(Project(id=project_id, name="bench", start_time=datetime(2025, 6, 1), user_id=user_id))
+        db.add(Milestone(id=milestone_id, name="bench", start_time=datetime(2025, 6, 1),
+                         end_time=datetime(2025, 6, 30), project_id=project_id))
+        db.flush()
+        db.execute(insert(Task), [{
+            "id": uuid.uuid4(), "title": f"Task {i}", "description": "Auto-generated task",
+            "due_date": DUE, "estimated_loading": Decimal("1.5"), "milestone_id": milestone_id,
+            "is_completed": i % 3 == 0,
+        } for i in range(rows)])
+        db.commit()
+    return user_id
+
+
+def _filtered(query, user_id):
+    return (
+        query.join(Milestone, Task.milestone_id == Milestone.id)
+        .join(Project, Milestone.project_id == Project.id)
+        .filter(Project.user_id == user_id)
+        .filter(Task.due_date == DUE)
+    )
+
+
+def old_query(db, user_id):
+    result = []
+    for task, project_id in db.execute(_filtered(select(Task, Milestone.project_id), user_id)):
+        result.append({
+            "task_id": task.id,
+            "task_title": task.title,
+            "description": task.description,
+            "estimated_loading": float(task.estimated_loading),
+            "isCompleted": task.is_completed,
+            "project_id": project_id
+        })
+    return result
+
+
+def old_render(result):
+    return JSONResponse(jsonable_encoder(result)).body
+
+
+def new_query(db, user_id):
+    return db.execute(_filtered(select(
+        Task.id.label("task_id"),
+        Task.title.label("task_title"),
+        Task.description,
+        Task.estimated_loading,
+        Task.is_completed.label("isCompleted"),
+        Milestone.project_id,
+    ), user_id)).all()
+
+
+def new_render(result):
+    return FastJSONResponse(result).body
+
+
+def best_of(repeat, fn, *args):
+    best, value = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="1000,10000,50000", help="comma separated task counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for rows in map(int, args.rows.split(",")):
+        engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_json.db')}")
+        Base.metadata.create_all(engine)
+        user_id = seed(engine, rows)
+        with Session(engine) as db:
+            timings, bodies = {}, {}
+            for name, query, render in (("old", old_query, old_render), ("new", new_query, new_render)):
+                query_seconds, result = best_of(args.repeat, query, db, user_id)
+                db.expunge_all()
+                render_seconds, bodies[name] = best_of(args.repeat, render, result)
+                timings[name] = (query_seconds, render_seconds, len(bodies[name]))
+        engine.dispose()
+        assert json.loads(bodies["old"]) == json.loads(bodies["new"]), "responses differ"
+
+        for name, (query_seconds, render_seconds, size) in timings.items():
+            print(f"{rows:>7} rows {name}: query+build {query_seconds * 1000:8.1f}ms  "
+                  f"serialize {render_seconds * 1000:8.1f}ms  ({size} bytes)")
+        old_total, new_total = sum(timings["old"][:2]), sum(timings["new"][:2])
+        print(f"{rows:>7} rows speedup: {old_total / new_total:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
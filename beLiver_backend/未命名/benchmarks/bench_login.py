@@ -0,0 +1,107 @@
+# 登入吞吐量：bcrypt 走專用 executor vs 走 FastAPI 共用 threadpool
+#
+# 用法（在專案根目錄，不需要 PostgreSQL，使用暫存的 SQLite）：
+#   PYTHONPATH=. python benchmarks/bench_login.py --logins 200 --concurrency 50
+#
+# 同時對一個 sync 的 /ping route 發請求，觀察登入尖峰時其他 sync route 的延遲。
+# --mode shared 會把 bcrypt 改回丟到共用 threadpool（舊做法）做對照。
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# app.core.db 需要完整的 DB 設定才能 import；這裡實際連的是下面的 SQLite
+for key, value in {"DB_NAME": "bench", "DB_USER": "bench", "DB_PASSWORD": "bench",
+                   "DB_HOST": "localhost", "DB_PORT": "5432", "SECRET_KEY": "bench"}.items():
+    os.environ.setdefault(key, value)
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import utils
+from app.core.db import Base, get_async_db
+from app.main import app
+from app.models import User
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))] * 1000
+
+
+async def run(args):
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_login.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as db:
+        db.add(User(name="Bench", email="bench@example.com", hashed_password=utils.hash_password("benchpass")))
+        await db.commit()
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    if args.mode == "shared":
+        async def shared_threadpool(fn, *fn_args):
+            return await run_in_threadpool(fn, *fn_args)
+        utils._run_password_job = shared_threadpool
+
+    login_latencies, ping_latencies = [], []
+    remaining = args.logins
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login_worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                response = await client.post("/auth/login", json={"email": "bench@example.com", "password": "benchpass"})
+                if response.status_code == 200:
+                    login_latencies.append(time.perf_counter() - started)
+
+        async def ping_worker():
+            while remaining > 0:
+                started = time.perf_counter()
+                await client.get("/ping")
+                ping_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        started = time.perf_counter()
+        await asyncio.gather(ping_worker(), *(login_worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    await engine.dispose()
+    print({
+        "mode": args.mode,
+        "bcrypt_rounds": utils.BCRYPT_ROUNDS,
+        "logins_ok": len(login_latencies),
+        "logins_rejected": args.logins - len(login_latencies),
+        "login_per_sec": round(len(login_latencies) / elapsed, 1),
+        "login_p50_ms": round(percentile(login_latencies, 0.5), 1),
+        "login_p95_ms": round(percentile(login_latencies, 0.95), 1),
+        "ping_p50_ms": round(percentile(ping_latencies, 0.5), 2),
+        "ping_p95_ms": round(percentile(ping_latencies, 0.95), 2),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput under concurrent load")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mode", choices=["executor", "shared"], default="executor")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
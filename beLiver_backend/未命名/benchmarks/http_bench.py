@@ -0,0 +1,263 @@
+# 全部 API route 的 HTTP 壓測：依資料規模 seed → 併發打每個 route → 存成 JSON
+#
+# 用法（在專案根目錄，需先設定好 .env 連到 PostgreSQL，且已 alembic upgrade head）：
+#   PYTHONPATH=. python benchmarks/http_bench.py --scales small,medium --requests 500 --concurrency 50
+#   PYTHONPATH=. python benchmarks/http_bench.py --compare results/old.json results/new.json
+#
+# 預設在同一個 process 內透過 ASGI 呼叫 app（可算出每個 request 的 SQL 數）；
+# --base-url 可改打已啟動的伺服器（此時 queries_per_request 為 null，且需與伺服器連同一個 DB）。
+# 每個規模用新的 email prefix seed 一份資料，跑完刪掉（--keep 保留）。
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# 上傳檔案寫到暫存目錄，需在 import app 之前設定
+os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="bench-uploads-"))
+os.environ.setdefault("BLOB_GC_INTERVAL", "0")
+
+import httpx
+import psycopg2
+from sqlalchemy import event, select, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "database"))
+from bulk_writer import copy_rows  # noqa: E402
+from synthetic_data import SyntheticData  # noqa: E402
+
+from app.core.db import DATABASE_URL, async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import User  # noqa: E402
+from app.services import workload_rollup  # noqa: E402
+
+# 每個規模：使用者數、每位使用者的專案數、每個專案的里程碑數、每個里程碑的任務數、每個專案的訊息數
+SCALES = {
+    "small": dict(users=10, projects=5, milestones=4, tasks=10, messages=20),
+    "medium": dict(users=200, projects=10, milestones=5, tasks=20, messages=50),
+    "large": dict(users=2000, projects=10, milestones=5, tasks=20, messages=50),
+}
+
+ROUTES = ["tasks", "calendar_projects", "projects", "project_detail", "milestone_detail",
+          "assistant_history", "upload", "auth_login"]
+
+
+def seed(scale: str) -> SyntheticData:
+    data = SyntheticData(**SCALES[scale], email_prefix=f"bench-{scale}-{int(time.time())}-")
+    conn = psycopg2.connect(DATABASE_URL)
+    try:
+        with conn, conn.cursor() as cur:
+            for table, columns, rows in data.tables():
+                copy_rows(cur, table, rows, columns)
+    finally:
+        conn.close()
+
+    # COPY 不經過 ORM，每日負荷彙總（daily_workloads）只重建這批使用者
+    with engine.begin() as connection:
+        user_ids = connection.execute(
+            select(User.id).filter(User.email.like(f"{data.email_prefix}%"))
+        ).scalars().all()
+        workload_rollup.rebuild(connection, user_ids)
+        connection.execute(text("ANALYZE"))
+    return data
+
+
+def cleanup(data: SyntheticData):
+    conn = psycopg2.connect(DATABASE_URL)
+    pattern = f"{data.email_prefix}%"
+    try:
+        with conn, conn.cursor() as cur:
+            # tasks.milestone_id 是 ON DELETE SET NULL，要先自己刪
+            cur.execute("""
+                DELETE FROM tasks WHERE milestone_id IN (
+                    SELECT m.id FROM milestones m
+                    JOIN projects p ON p.id = m.project_id
+                    JOIN users u ON u.id = p.user_id
+                    WHERE u.email LIKE %s
+                )
+            """, (pattern,))
+            cur.execute("DELETE FROM users WHERE email LIKE %s", (pattern,))
+    finally:
+        conn.close()
+
+
+def build_requests(data: SyntheticData, token: str) -> dict:
+    """route name -> function(i) returning httpx request kwargs for user 1's data."""
+    headers = {"Authorization": f"Bearer {token}"}
+    project_uuid = str(uuid.UUID(data.key("projects", 0)))
+    milestone_uuid = str(uuid.UUID(data.key("milestones", 0)))
+    task_date = next(data.tasks_rows())[3].isoformat()
+    start, end = data.project_span(0)
+    login = {"email": f"{data.email_prefix}1@example.com", "password": data.password(0)}
+
+    return {
+        "tasks": lambda i: dict(method="GET", url="/tasks", params={"date": task_date}, headers=headers),
+        "calendar_projects": lambda i: dict(method="GET", url="/calendar_projects", headers=headers, params={
+            "start_date": start.date().isoformat(), "end_date": (start + timedelta(days=30)).date().isoformat()}),
+        "projects": lambda i: dict(method="GET", url="/projects", headers=headers),
+        "project_detail": lambda i: dict(method="GET", url="/project_detail", headers=headers,
+                                         params={"project_id": project_uuid}),
+        "milestone_detail": lambda i: dict(method="GET", url="/milestone_detail", headers=headers,
+                                           params={"project_id": project_uuid, "milestone_id": milestone_uuid}),
+        "assistant_history": lambda i: dict(method="GET", url="/assistant/history", headers=headers,
+                                            params={"projectId": project_uuid}),
+        # 每次內容不同，量的是實際寫檔而不是去重
+        "upload": lambda i: dict(method="POST", url="/upload", headers=headers,
+                                 files=[("files", (f"bench-{i}.pdf", os.urandom(64 * 1024)))]),
+        "auth_login": lambda i: dict(method="POST", url="/auth/login", json=login),
+    }
+
+
+def summarize(latencies: list[float]) -> dict:
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+    }
+
+
+async def drive(client: httpx.AsyncClient, make_request, total: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            response = await client.request(**make_request(i))
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        **summarize(latencies),
+    }
+
+
+async def bench_scale(scale: str, data: SyntheticData, args) -> list[dict]:
+    queries = 0
+
+    def count_query(*_):
+        nonlocal queries
+        queries += 1
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+        event.listen(async_engine.sync_engine, "before_cursor_execute", count_query)
+
+    results = []
+    try:
+        login = await client.post("/auth/login", json={"email": f"{data.email_prefix}1@example.com",
+                                                       "password": data.password(0)})
+        login.raise_for_status()
+        requests = build_requests(data, login.json()["token"])
+
+        for route in args.routes:
+            make_request = requests[route]
+            await client.request(**make_request(-1))  # warm up
+            queries = 0
+            result = await drive(client, make_request, args.requests, args.concurrency)
+            result.update(
+                scale=scale,
+                route=route,
+                concurrency=args.concurrency,
+                queries_per_request=None if args.base_url else round(queries / args.requests, 2),
+            )
+            print(f"[{scale}] {route:>18}: {result['throughput_rps']:>8} req/s  p50 {result['p50_ms']}ms  "
+                  f"p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms  q/req {result['queries_per_request']}"
+                  + (f"  errors {result['errors']}" if result["errors"] else ""))
+            results.append(result)
+    finally:
+        if not args.base_url:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", count_query)
+        await client.aclose()
+        # 連線綁在這次 asyncio.run 的 event loop 上，下一個規模要重新建立
+        await async_engine.dispose()
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path: str, new_path: str):
+    """Print p95 / throughput changes between two result files."""
+    with open(old_path) as f:
+        old = {(r["scale"], r["route"]): r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+
+    for result in new:
+        before = old.get((result["scale"], result["route"]))
+        if not before:
+            continue
+        p95 = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0
+        rps = (result["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] * 100
+        print(f"[{result['scale']}] {result['route']:>18}: p95 {before['p95_ms']} -> {result['p95_ms']}ms ({p95:+.1f}%)  "
+              f"throughput {before['throughput_rps']} -> {result['throughput_rps']} ({rps:+.1f}%)  "
+              f"q/req {before['queries_per_request']} -> {result['queries_per_request']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every API route at several data scales")
+    parser.add_argument("--scales", default="small", help=f"comma separated: {', '.join(SCALES)}")
+    parser.add_argument("--routes", default=",".join(ROUTES), help="comma separated route names")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--base-url", help="hit a running server instead of the in-process app")
+    parser.add_argument("--output", help="JSON file to write (default results/<commit>-<time>.json)")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded data")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    args.routes = args.routes.split(",")
+    commit = git_commit()
+    results = []
+    for scale in args.scales.split(","):
+        started = time.perf_counter()
+        data = seed(scale)
+        print(f"[{scale}] seeded {data.counts()} in {time.perf_counter() - started:.1f}s")
+        try:
+            results += asyncio.run(bench_scale(scale, data, args))
+        finally:
+            if not args.keep:
+                cleanup(data)
+
+    output = args.output or os.path.join("results", f"{commit or 'local'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "params": {"requests": args.requests, "concurrency": args.concurrency, "base_url": args.base_url,
+                       "scales": {scale: SCALES[scale] for scale in args.scales.split(",")}},
+            "results": results,
+        }, f, indent=2)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 import os
 import psycopg2
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
-import random
-import bcrypt
-import uuid
+import argparse
+import time
+from datetime import date, timedelta
+from bulk_writer import copy_rows
+from synthetic_data import SyntheticData
 
 # Load environment variables from .env file
 load_dotenv()
@@ -83,164 +84,58 @@ def main():
             db_conn.close()
             print("\nDatabase connection closed.")
 
-def generate_mock_data():
-    """Generate mock data in memory."""
-    users = []
-    projects = []
-    milestones = []
-    tasks = []
-    files = []
-    chat_histories = []
+def generate_mock_data(**params):
+    """Describe a synthetic dataset; rows are generated lazily while loading.
 
-    for u in range(3):  # 3 users
-        user_id = str(uuid.uuid4())
-        plain_password = f"password{u+1}"
-        hashed_password = bcrypt.hashpw(plain_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-        user = {
-            "id": user_id,
-            "name": f"User{u+1}",
-            "email": f"user{u+1}@example.com",
-            "hashed_password": hashed_password
-        }
-        users.append(user)
-
-        for p in range(2):  # 2 projects per user
-            project_id = str(uuid.uuid4())
-            project = {
-                "id": project_id,
-                "name": f"Project {p+1} (User{u+1})",
-                "summary": "Auto-generated project",
-                "start_time": datetime.now() - timedelta(days=15),
-                "end_time": datetime.now() + timedelta(days=30),
-                "estimated_loading": round(random.uniform(8.0, 20.0), 1),
-                "due_date": (datetime.now() + timedelta(days=40)).date(),
-                "user_id": user_id,
-                "current_milestone": None
-            }
-            projects.append(project)
-
-            for m in range(2):  # 2 milestones per project
-                milestone_id = str(uuid.uuid4())
-                milestone_name = f"Milestone {m+1} (Proj{p+1}-User{u+1})"
-                milestone = {
-                    "id": milestone_id,
-                    "name": milestone_name,
-                    "summary": "Auto-generated milestone",
-                    "start_time": datetime.now() - timedelta(days=5),
-                    "end_time": datetime.now() + timedelta(days=10),
-                    "estimated_loading": round(random.uniform(4.0, 10.0), 1),
-                    "project_id": project_id
-                }
-                milestones.append(milestone)
-
-                # For first milestone only, set as current in project
-                if m == 0:
-                    project["current_milestone"] = milestone_name
-
-                for t in range(5):  # 5 tasks per milestone
-                    task_id = str(uuid.uuid4())
-                    task = {
-                        "id": task_id,
-                        "title": f"Task {t+1}",
-                        "description": f"Auto-generated task {t+1}",
-                        "due_date": (datetime.now() + timedelta(days=random.randint(2, 12))).date(),
-                        "estimated_loading": round(random.uniform(1.0, 3.5), 1),
-                        "milestone_id": milestone_id,
-                        "is_completed": random.choice([True, False])
-                    }
-                    tasks.append(task)
-
-            # 1 file per project
-            file = {
-                "id": str(uuid.uuid4()),
-                "name": "file.pdf",
-                "url": "https://example.com/file.pdf",
-                "project_id": project_id
-            }
-            files.append(file)
-
-            # 3 messages per project
-            for sender, msg in [("user", "What's next?"), ("assistant", "Finish Task 2."), ("user", "Got it.")]:
-                message = {
-                    "id": str(uuid.uuid4()),
-                    "user_id": user_id,
-                    "project_id": project_id,
-                    "message": msg,
-                    "sender": sender
-                }
-                chat_histories.append(message)
-
-    return users, projects, milestones, tasks, files, chat_histories
+    Keyword arguments are SyntheticData fields (users, projects, milestones,
+    tasks, messages, files, start, span_days, distribution, seed, ...).
+    """
+    return SyntheticData(**params)
 
-def insert_mock_data(conn, users, projects, milestones, tasks, files, chat_histories):
+def insert_mock_data(conn, data):
+    # 每張表一次 COPY，邊產生邊寫入，整批同一個 transaction
     try:
-        with conn.cursor() as cur:
-            for user in users:
-                cur.execute("""
-                    INSERT INTO users (id, name, email, hashed_password)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (email) DO NOTHING;
-                """, (user["id"], user["name"], user["email"], user["hashed_password"]))
-
-            for project in projects:
-                cur.execute("""
-                    INSERT INTO projects (id, name, summary, start_time, end_time, estimated_loading, due_date, user_id, current_milestone)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);
-                """, (
-                    project["id"], project["name"], project["summary"],
-                    project["start_time"], project["end_time"],
-                    project["estimated_loading"], project["due_date"],
-                    project["user_id"], project["current_milestone"]
-                ))
-
-            for milestone in milestones:
-                cur.execute("""
-                    INSERT INTO milestones (id, name, summary, start_time, end_time, estimated_loading, project_id)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s);
-                """, (
-                    milestone["id"], milestone["name"], milestone["summary"],
-                    milestone["start_time"], milestone["end_time"],
-                    milestone["estimated_loading"], milestone["project_id"]
-                ))
-
-            for task in tasks:
-                cur.execute("""
-                    INSERT INTO tasks (id, title, description, due_date, estimated_loading, milestone_id, is_completed)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s);
-                """, (
-                    task["id"], task["title"], task["description"],
-                    task["due_date"], task["estimated_loading"],
-                    task["milestone_id"], task["is_completed"]
-                ))
-
-            for file in files:
-                cur.execute("""
-                    INSERT INTO files (id, name, url, project_id)
-                    VALUES (%s, %s, %s, %s);
-                """, (file["id"], file["name"], file["url"], file["project_id"]))
-
-            for msg in chat_histories:
-                cur.execute("""
-                    INSERT INTO chat_histories (id, user_id, project_id, message, sender)
-                    VALUES (%s, %s, %s, %s, %s);
-                """, (msg["id"], msg["user_id"], msg["project_id"], msg["message"], msg["sender"]))
-
-            conn.commit()
-            print("✅ 全部假資料插入完成！")
+        with conn, conn.cursor() as cur:
+            for table, columns, rows in data.tables():
+                started = time.perf_counter()
+                copy_rows(cur, table, rows, columns)
+                elapsed = time.perf_counter() - started
+                count = data.counts()[table]
+                print(f"  {table}: {count} rows in {elapsed:.1f}s ({count / max(elapsed, 1e-9):.0f} rows/sec)")
+        print("✅ 全部假資料插入完成！")
+        # COPY 不經過 app，每日負荷彙總要另外重建
+        print("   接著執行：PYTHONPATH=. python -m app.services.workload_rollup rebuild")
 
     except Exception as e:
         print(f"❌ Error inserting mock data: {e}")
-        conn.rollback()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed the database with synthetic data.")
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--projects", type=int, default=2, help="projects per user")
+    parser.add_argument("--milestones", type=int, default=2, help="milestones per project")
+    parser.add_argument("--tasks", type=int, default=5, help="tasks per milestone")
+    parser.add_argument("--messages", type=int, default=3, help="chat messages per project")
+    parser.add_argument("--files", type=int, default=1, help="files per project")
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today() - timedelta(days=90))
+    parser.add_argument("--span-days", type=int, default=180, help="project start dates fall in [start, start + span)")
+    parser.add_argument("--distribution", choices=["uniform", "recent", "normal"], default="uniform")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--password-pool", type=int, default=4, help="distinct bcrypt hashes shared by all users")
+    parser.add_argument("--email-prefix", default="user", help="emails are <prefix><n>@example.com")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    data = generate_mock_data(**{k: v for k, v in vars(args).items()})
+    print(f"Seeding {data.counts()}")
+    print(f"Users log in as {data.email_prefix}<n>@example.com / password<n % {data.password_pool} + 1>")
+
     db_conn = None
     try:
         db_conn = get_db_connection()
         if db_conn:
-            users, projects, milestones, tasks, files, chat_histories = generate_mock_data()
-            # print(users, projects, milestones, tasks, files, chat_histories)
-            insert_mock_data(db_conn, users, projects, milestones, tasks, files, chat_histories)
-            # select_all_data(db_conn)
+            insert_mock_data(db_conn, data)
 
     finally:
         if db_conn:
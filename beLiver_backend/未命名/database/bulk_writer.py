@@ -0,0 +1,139 @@
+"""Bulk writer for seed data and generated project trees.
+
+Rows are written per table with one COPY (or one multi-row INSERT when a
+conflict clause is needed) and the whole batch commits in a single
+transaction, instead of one ``cur.execute`` per row.
+"""
+import io
+from psycopg2.extras import execute_values
+
+# 專案樹攤平與 app 的 insert_project_tree 共用（純函式，放在 app 裡；需要 PYTHONPATH=.）
+from app.services.project_tree import flatten_project_tree  # noqa: F401
+
+# 依外鍵順序寫入
+TABLE_COLUMNS = {
+    "users": ["id", "name", "email", "hashed_password"],
+    "projects": ["id", "name", "summary", "start_time", "end_time", "estimated_loading", "due_date", "user_id", "current_milestone"],
+    "milestones": ["id", "name", "summary", "start_time", "end_time", "estimated_loading", "project_id"],
+    "tasks": ["id", "title", "description", "due_date", "estimated_loading", "milestone_id", "is_completed"],
+    "files": ["id", "name", "url", "project_id", "sha256", "size"],
+    "chat_histories": ["id", "user_id", "project_id", "message", "sender", "timestamp"],
+}
+
+# 需要 ON CONFLICT 的表不能用 COPY，改用 multi-row INSERT
+ON_CONFLICT = {
+    "users": "ON CONFLICT (email) DO NOTHING",
+}
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class _CopyBuffer(io.TextIOBase):
+    """File-like object that renders rows to COPY text format as psycopg2 reads it.
+
+    Rows are dicts, or tuples already in ``columns`` order.
+    """
+
+    def __init__(self, columns, rows):
+        self._lines = (
+            "\t".join(map(_copy_value, row if isinstance(row, tuple) else (row.get(c) for c in columns))) + "\n"
+            for row in rows
+        )
+        self._pending = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._pending += line
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+
+def copy_rows(cur, table, rows, columns=None):
+    """Stream ``rows`` (dicts or tuples, may be a generator) into ``table`` with a single COPY."""
+    columns = columns or TABLE_COLUMNS[table]
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN",
+        _CopyBuffer(columns, rows),
+    )
+
+
+def insert_values(cur, table, rows, columns=None, suffix="", page_size=1000):
+    """Insert ``rows`` with multi-row ``INSERT ... VALUES`` statements."""
+    columns = columns or TABLE_COLUMNS[table]
+    execute_values(
+        cur,
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s {suffix}",
+        [tuple(row.get(c) for c in columns) for row in rows],
+        page_size=page_size,
+    )
+
+
+def write_rows(cur, tables, method="copy"):
+    """Write every table in ``tables`` ({table: list of row dicts}) in foreign-key order.
+
+    Only the columns present in the first row are written, so omitted
+    columns keep their database defaults. ``method`` is ``"copy"`` or
+    ``"values"``; tables with a conflict clause always use multi-row
+    INSERT. Runs inside the caller's transaction.
+    """
+    for table, all_columns in TABLE_COLUMNS.items():
+        rows = tables.get(table)
+        if not rows:
+            continue
+        columns = [c for c in all_columns if c in rows[0]]
+        if method == "values" or table in ON_CONFLICT:
+            insert_values(cur, table, rows, columns, suffix=ON_CONFLICT.get(table, ""))
+        else:
+            copy_rows(cur, table, rows, columns)
+
+
+def write_tables(conn, tables, method="copy"):
+    """:func:`write_rows` in a single transaction; rolls back everything on error."""
+    with conn:
+        with conn.cursor() as cur:
+            write_rows(cur, tables, method)
+
+
+def count_tree(projects):
+    """Number of rows each table gets from a nested project tree."""
+    counts = {"projects": len(projects), "milestones": 0, "tasks": 0, "files": 0, "chat_histories": 0}
+    for project in projects:
+        counts["files"] += len(project.get("files", []))
+        counts["chat_histories"] += len(project.get("chat_histories", []))
+        for milestone in project.get("milestones", []):
+            counts["milestones"] += 1
+            counts["tasks"] += len(milestone.get("tasks", []))
+    return counts
+
+
+def reserve_serial_ids(cur, counts):
+    """Pre-allocate SERIAL keys so child rows can reference parents before COPY.
+
+    Returns a ``new_id(table)`` function handing out the reserved ids.
+    """
+    reserved = {}
+    for table, count in counts.items():
+        cur.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            (table, count),
+        )
+        reserved[table] = iter([row[0] for row in cur.fetchall()])
+    return lambda table: next(reserved[table])
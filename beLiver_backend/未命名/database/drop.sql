@@ -1,3 +1,5 @@
+DROP TABLE IF EXISTS ingestion_jobs CASCADE;
+DROP TABLE IF EXISTS daily_workloads CASCADE;
 DROP TABLE IF EXISTS chat_histories CASCADE;
 DROP TABLE IF EXISTS files CASCADE;
 DROP TABLE IF EXISTS tasks CASCADE;
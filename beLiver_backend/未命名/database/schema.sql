@@ -4,7 +4,8 @@ CREATE TABLE users (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     name VARCHAR(255) NOT NULL,
     email VARCHAR(255) UNIQUE NOT NULL,
-    hashed_password VARCHAR(255) NOT NULL
+    hashed_password VARCHAR(255) NOT NULL,
+    version BIGINT NOT NULL DEFAULT 1
 );
 
 -- 專案表（使用 current_milestone 為文字欄位）
@@ -17,7 +18,8 @@ CREATE TABLE projects (
     estimated_loading NUMERIC(3,1),
     due_date DATE,
     current_milestone VARCHAR(255),
-    user_id UUID REFERENCES users(id) ON DELETE CASCADE
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    version BIGINT NOT NULL DEFAULT 1
 );
 
 -- 里程碑表
@@ -47,7 +49,9 @@ CREATE TABLE files (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     name VARCHAR(255) NOT NULL,
     url TEXT NOT NULL,
-    project_id UUID REFERENCES projects(id) ON DELETE CASCADE
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    sha256 VARCHAR(64),
+    size BIGINT
 );
 
 -- AI 助理訊息表
@@ -58,4 +62,42 @@ CREATE TABLE chat_histories (
     message TEXT NOT NULL,
     sender VARCHAR(50) NOT NULL,
     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+);
+
+-- PDF 轉專案的背景工作
+CREATE TABLE ingestion_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    file_id UUID REFERENCES files(id) ON DELETE SET NULL,
+    status VARCHAR(20) NOT NULL,
+    error TEXT,
+    project_ids JSON,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- 每位使用者每天的任務負荷彙總（由 app.services.workload_rollup 維護）
+CREATE TABLE daily_workloads (
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    day DATE,
+    total_loading NUMERIC(10,1) NOT NULL,
+    completed_loading NUMERIC(10,1) NOT NULL,
+    task_count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day)
+);
+
+-- 熱門查詢 index（與 migrations 相同）
+CREATE INDEX ix_projects_user_id_start_time_end_time ON projects (user_id, start_time, end_time);
+CREATE INDEX ix_milestones_project_id_end_time ON milestones (project_id, end_time);
+CREATE INDEX ix_tasks_due_date_milestone_id ON tasks (due_date, milestone_id);
+CREATE INDEX ix_tasks_milestone_id_is_completed ON tasks (milestone_id, is_completed);
+CREATE INDEX ix_files_project_id ON files (project_id);
+CREATE INDEX ix_files_sha256 ON files (sha256);
+CREATE INDEX ix_chat_histories_project_id_user_id_timestamp_id ON chat_histories (project_id, user_id, timestamp, id);
+CREATE INDEX ix_ingestion_jobs_user_id ON ingestion_jobs (user_id);
+
+-- /calendar_projects 區間重疊查詢（GiST；uuid 欄位需要 btree_gist）
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+CREATE INDEX ix_projects_user_id_span ON projects USING gist
+    (user_id, tsrange(LEAST(start_time, end_time), GREATEST(start_time, end_time), '[]'))
+    WHERE end_time IS NOT NULL;
@@ -0,0 +1,164 @@
+"""Parameterized synthetic data for seeding load-test databases.
+
+Each table is produced by its own generator, in foreign-key order, so rows
+can be streamed straight into COPY without holding the dataset in memory.
+Keys are derived from (run, table, ordinal) and dates from a per-project
+seeded RNG, which lets every generator recompute its parents' ids and
+dates instead of remembering them.
+"""
+import math
+import random
+import secrets
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+import bcrypt
+
+MESSAGES = [
+    ("user", "What's next?"),
+    ("assistant", "Finish the next task on your list."),
+    ("user", "Got it."),
+    ("assistant", "I moved the deadline by two days."),
+]
+
+_TABLE_NO = {"users": 1, "projects": 2, "milestones": 3, "tasks": 4, "files": 5, "chat_histories": 6}
+
+
+@dataclass
+class SyntheticData:
+    users: int = 3
+    projects: int = 2          # 每位使用者
+    milestones: int = 2        # 每個專案
+    tasks: int = 5             # 每個里程碑
+    messages: int = 3          # 每個專案
+    files: int = 1             # 每個專案
+    start: date = field(default_factory=lambda: date.today() - timedelta(days=90))
+    span_days: int = 180
+    distribution: str = "uniform"  # uniform | recent | normal：專案開始日期的分布
+    seed: int = 0
+    password_pool: int = 4
+    password_rounds: int = 12
+    email_prefix: str = "user"
+    run: str = field(default_factory=lambda: secrets.token_hex(8))  # 16 hex，讓 id 在多次 seed 之間不重複
+
+    def key(self, table: str, n: int) -> str:
+        # uuid 輸入可不含 '-'：run(16) + table(2) + ordinal(14)
+        return f"{self.run}{_TABLE_NO[table]:02x}{n:014x}"
+
+    def password(self, user_no: int) -> str:
+        return f"password{user_no % self.password_pool + 1}"
+
+    def password_hashes(self) -> list[str]:
+        # bcrypt 很慢，只算一小組，使用者輪流共用
+        return [
+            bcrypt.hashpw(f"password{i + 1}".encode(), bcrypt.gensalt(rounds=self.password_rounds)).decode()
+            for i in range(self.password_pool)
+        ]
+
+    def _start_offset(self, rng: random.Random) -> float:
+        if self.distribution == "recent":
+            # 越接近區間尾端（最近）的專案越多
+            return self.span_days * math.sqrt(rng.random())
+        if self.distribution == "normal":
+            return min(max(rng.gauss(self.span_days / 2, self.span_days / 6), 0), self.span_days)
+        return rng.uniform(0, self.span_days)
+
+    def project_span(self, project_no: int) -> tuple[datetime, datetime]:
+        rng = random.Random(self.seed * 1_000_003 + project_no)
+        start = datetime.combine(self.start, datetime.min.time()) + timedelta(days=int(self._start_offset(rng)))
+        return start, start + timedelta(days=rng.randint(14, 90))
+
+    def milestone_span(self, project_span, m: int) -> tuple[datetime, datetime]:
+        start, end = project_span
+        step = (end - start) / self.milestones
+        return start + step * m, start + step * (m + 1)
+
+    # 以下每個 generator 產生一張表的 tuple，欄位順序同 COLUMNS
+    COLUMNS = {
+        "users": ["id", "name", "email", "hashed_password"],
+        "projects": ["id", "name", "summary", "start_time", "end_time", "estimated_loading", "due_date", "user_id", "current_milestone"],
+        "milestones": ["id", "name", "summary", "start_time", "end_time", "estimated_loading", "project_id"],
+        "tasks": ["id", "title", "description", "due_date", "estimated_loading", "milestone_id", "is_completed"],
+        "files": ["id", "name", "url", "project_id"],
+        "chat_histories": ["id", "user_id", "project_id", "message", "sender", "timestamp"],
+    }
+
+    def users_rows(self):
+        hashes = self.password_hashes()
+        for u in range(self.users):
+            yield (self.key("users", u), f"User{u + 1}", f"{self.email_prefix}{u + 1}@example.com", hashes[u % len(hashes)])
+
+    def _project_numbers(self):
+        for u in range(self.users):
+            for p in range(self.projects):
+                yield u, p, u * self.projects + p
+
+    def projects_rows(self):
+        for u, p, project_no in self._project_numbers():
+            start, end = self.project_span(project_no)
+            yield (
+                self.key("projects", project_no), f"Project {p + 1} (User{u + 1})", "Auto-generated project",
+                start, end, round(2 + project_no % 18, 1), (end + timedelta(days=7)).date(),
+                self.key("users", u), "Milestone 1" if self.milestones else None,
+            )
+
+    def milestones_rows(self):
+        for _, _, project_no in self._project_numbers():
+            span = self.project_span(project_no)
+            for m in range(self.milestones):
+                start, end = self.milestone_span(span, m)
+                yield (
+                    self.key("milestones", project_no * self.milestones + m), f"Milestone {m + 1}",
+                    "Auto-generated milestone", start, end, round(1 + m % 9, 1), self.key("projects", project_no),
+                )
+
+    def tasks_rows(self):
+        rng = random.Random(self.seed)
+        for _, _, project_no in self._project_numbers():
+            span = self.project_span(project_no)
+            for m in range(self.milestones):
+                milestone_no = project_no * self.milestones + m
+                start, end = self.milestone_span(span, m)
+                days = max((end - start).days, 1)
+                milestone_id = self.key("milestones", milestone_no)
+                for t in range(self.tasks):
+                    yield (
+                        self.key("tasks", milestone_no * self.tasks + t), f"Task {t + 1}", f"Auto-generated task {t + 1}",
+                        (start + timedelta(days=rng.randrange(days))).date(), round(rng.uniform(0.5, 3.5), 1),
+                        milestone_id, rng.random() < 0.4,
+                    )
+
+    def files_rows(self):
+        for _, _, project_no in self._project_numbers():
+            for f in range(self.files):
+                yield (
+                    self.key("files", project_no * self.files + f), f"file{f + 1}.pdf",
+                    f"https://example.com/file{f + 1}.pdf", self.key("projects", project_no),
+                )
+
+    def chat_histories_rows(self):
+        for u, _, project_no in self._project_numbers():
+            start, end = self.project_span(project_no)
+            step = (end - start) / max(self.messages, 1)
+            for i in range(self.messages):
+                sender, message = MESSAGES[i % len(MESSAGES)]
+                yield (
+                    self.key("chat_histories", project_no * self.messages + i), self.key("users", u),
+                    self.key("projects", project_no), message, sender, start + step * i,
+                )
+
+    def tables(self):
+        """(table, columns, row iterator) in foreign-key order."""
+        for table, columns in self.COLUMNS.items():
+            yield table, columns, getattr(self, f"{table}_rows")()
+
+    def counts(self) -> dict:
+        projects = self.users * self.projects
+        return {
+            "users": self.users,
+            "projects": projects,
+            "milestones": projects * self.milestones,
+            "tasks": projects * self.milestones * self.tasks,
+            "files": projects * self.files,
+            "chat_histories": projects * self.messages,
+        }
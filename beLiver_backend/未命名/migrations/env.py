@@ -0,0 +1,59 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.core.db import Base
+from app import models  # noqa: F401  讓 Base.metadata 註冊所有資料表
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# 沒有指定 sqlalchemy.url（例如測試）時，使用 .env 的 PostgreSQL 連線
+if not config.get_main_option("sqlalchemy.url"):
+    from app.core.db import DATABASE_URL
+    config.set_main_option("sqlalchemy.url", DATABASE_URL)
+
+target_metadata = Base.metadata
+
+# 只在 migration 裡建立的 PostgreSQL 專用 index（GiST / 運算式），models 裡沒有，autogenerate 時略過
+MIGRATION_ONLY_INDEXES = {"ix_projects_user_id_span"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (type_ == "index" and reflected and name in MIGRATION_ONLY_INDEXES)
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
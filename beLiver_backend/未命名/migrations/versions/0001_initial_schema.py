@@ -0,0 +1,84 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-06-14
+
+既有資料庫（用 schema.sql 或 create_all 建的）請先執行 alembic stamp 0001 再 upgrade。
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False, unique=True),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+    )
+    op.create_table(
+        "projects",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("summary", sa.Text()),
+        sa.Column("start_time", sa.TIMESTAMP(), nullable=False),
+        sa.Column("end_time", sa.TIMESTAMP()),
+        sa.Column("estimated_loading", sa.Numeric(3, 1)),
+        sa.Column("due_date", sa.Date()),
+        sa.Column("current_milestone", sa.String(255)),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE")),
+    )
+    op.create_table(
+        "milestones",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("summary", sa.Text()),
+        sa.Column("start_time", sa.TIMESTAMP(), nullable=False),
+        sa.Column("end_time", sa.TIMESTAMP()),
+        sa.Column("estimated_loading", sa.Numeric(3, 1)),
+        sa.Column("project_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("projects.id", ondelete="CASCADE")),
+    )
+    op.create_table(
+        "tasks",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("due_date", sa.Date()),
+        sa.Column("estimated_loading", sa.Numeric(3, 1)),
+        sa.Column("milestone_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("milestones.id", ondelete="SET NULL")),
+        sa.Column("is_completed", sa.Boolean()),
+    )
+    op.create_table(
+        "files",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("url", sa.Text(), nullable=False),
+        sa.Column("project_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("projects.id", ondelete="CASCADE")),
+    )
+    op.create_table(
+        "chat_histories",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE")),
+        sa.Column("project_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("projects.id", ondelete="CASCADE")),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("sender", sa.String(50), nullable=False),
+        sa.Column("timestamp", sa.TIMESTAMP()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("chat_histories")
+    op.drop_table("files")
+    op.drop_table("tasks")
+    op.drop_table("milestones")
+    op.drop_table("projects")
+    op.drop_table("users")
@@ -0,0 +1,37 @@
+"""indexes for hot route queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-06-14
+
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # /projects、/calendar_projects
+    op.create_index("ix_projects_user_id_start_time_end_time", "projects", ["user_id", "start_time", "end_time"])
+    # 專案詳情、最新里程碑
+    op.create_index("ix_milestones_project_id_end_time", "milestones", ["project_id", "end_time"])
+    # /tasks?date=
+    op.create_index("ix_tasks_due_date_milestone_id", "tasks", ["due_date", "milestone_id"])
+    # 里程碑進度彙總
+    op.create_index("ix_tasks_milestone_id_is_completed", "tasks", ["milestone_id", "is_completed"])
+    op.create_index("ix_files_project_id", "files", ["project_id"])
+    # /assistant/history
+    op.create_index("ix_chat_histories_project_id_user_id_timestamp", "chat_histories", ["project_id", "user_id", "timestamp"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_histories_project_id_user_id_timestamp", table_name="chat_histories")
+    op.drop_index("ix_files_project_id", table_name="files")
+    op.drop_index("ix_tasks_milestone_id_is_completed", table_name="tasks")
+    op.drop_index("ix_tasks_due_date_milestone_id", table_name="tasks")
+    op.drop_index("ix_milestones_project_id_end_time", table_name="milestones")
+    op.drop_index("ix_projects_user_id_start_time_end_time", table_name="projects")
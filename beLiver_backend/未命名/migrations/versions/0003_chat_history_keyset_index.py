@@ -0,0 +1,32 @@
+"""chat history index covers the (timestamp, id) keyset
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-06-16
+
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_chat_histories_project_id_user_id_timestamp", table_name="chat_histories")
+    op.create_index(
+        "ix_chat_histories_project_id_user_id_timestamp_id",
+        "chat_histories",
+        ["project_id", "user_id", "timestamp", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_histories_project_id_user_id_timestamp_id", table_name="chat_histories")
+    op.create_index(
+        "ix_chat_histories_project_id_user_id_timestamp",
+        "chat_histories",
+        ["project_id", "user_id", "timestamp"],
+    )
@@ -0,0 +1,28 @@
+"""files point at content-addressed upload blobs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-06-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("files", sa.Column("sha256", sa.String(length=64), nullable=True))
+    op.add_column("files", sa.Column("size", sa.BigInteger(), nullable=True))
+    # blob 引用數與孤兒清理
+    op.create_index("ix_files_sha256", "files", ["sha256"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_files_sha256", table_name="files")
+    op.drop_column("files", "size")
+    op.drop_column("files", "sha256")
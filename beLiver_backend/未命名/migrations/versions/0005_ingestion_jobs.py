@@ -0,0 +1,36 @@
+"""ingestion jobs for PDF-to-project uploads
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-06-20
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingestion_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("file_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("files.id", ondelete="SET NULL")),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("error", sa.Text()),
+        sa.Column("project_ids", sa.JSON()),
+        sa.Column("created_at", sa.TIMESTAMP()),
+        sa.Column("finished_at", sa.TIMESTAMP()),
+    )
+    op.create_index("ix_ingestion_jobs_user_id", "ingestion_jobs", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ingestion_jobs_user_id", table_name="ingestion_jobs")
+    op.drop_table("ingestion_jobs")
@@ -0,0 +1,34 @@
+"""GiST range index for calendar overlap queries
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-06-24
+
+"""
+from alembic import op
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 只有 PostgreSQL 有 tsrange / GiST；其他資料庫沿用 ix_projects_user_id_start_time_end_time
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # uuid 欄位放進 GiST index 需要 btree_gist
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    # 運算式需和 /calendar_projects 的查詢（_project_overlaps）一致才會用到這個 index
+    op.execute(
+        "CREATE INDEX ix_projects_user_id_span ON projects USING gist "
+        "(user_id, tsrange(LEAST(start_time, end_time), GREATEST(start_time, end_time), '[]')) "
+        "WHERE end_time IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_projects_user_id_span")
@@ -0,0 +1,44 @@
+"""per-user daily workload rollup
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-06-26
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_workloads",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("total_loading", sa.Numeric(10, 1), nullable=False),
+        sa.Column("completed_loading", sa.Numeric(10, 1), nullable=False),
+        sa.Column("task_count", sa.Integer(), nullable=False),
+    )
+    # 由現有任務算出初始值（之後由 app.services.workload_rollup 增量更新）
+    op.execute("""
+        INSERT INTO daily_workloads (user_id, day, total_loading, completed_loading, task_count)
+        SELECT projects.user_id, tasks.due_date,
+               COALESCE(SUM(tasks.estimated_loading), 0),
+               COALESCE(SUM(CASE WHEN tasks.is_completed THEN tasks.estimated_loading ELSE 0 END), 0),
+               COUNT(*)
+        FROM tasks
+        JOIN milestones ON milestones.id = tasks.milestone_id
+        JOIN projects ON projects.id = milestones.project_id
+        WHERE tasks.due_date IS NOT NULL AND projects.user_id IS NOT NULL
+        GROUP BY projects.user_id, tasks.due_date
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("daily_workloads")
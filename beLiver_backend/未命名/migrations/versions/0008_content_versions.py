@@ -0,0 +1,25 @@
+"""version counters on users and projects for ETags
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-06-27
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("version", sa.BigInteger(), nullable=False, server_default="1"))
+    op.add_column("projects", sa.Column("version", sa.BigInteger(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    op.drop_column("projects", "version")
+    op.drop_column("users", "version")
@@ -271,7 +271,7 @@ export default function Calendar() {
         const data = await res.json();
         console.log("Fetched projects for range:", rangeKey, data);
 
-        const newProjects = data.map((p: any) => ({
+        const newProjects = data.projects.map((p: any) => ({
           id: p.project_id,
           title: p.project_name,
           dateRange: `${p.start_time.slice(0, 10)} ~ ${p.end_time?.slice(0, 10) ?? ""}`,